@@ -0,0 +1,197 @@
+"""Figure construction benchmark: plotly.express against the figure factory.
+
+Builds each of the hot charts from the same precomputed survey aggregates two
+ways: with the plotly.express calls the app used before utils/figures.py, and
+with the factory. It times figure construction and JSON serialization (what
+st.plotly_chart does per rerun) and reports the payload size.
+
+    python scripts/benchmark_figures.py --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from utils.aggregates import rank_roles, select_salary_columns, salary_aggregates
+from utils.ai_metrics import compute_ai_metrics
+from utils.cleaning import experience_bucket
+from utils.data_loader import get_dataset_version, load_survey
+from utils.figures import bar_chart, histogram_chart, pie_chart
+from utils.multiselect import cohort_counts, load_multiselect_matrix
+from utils.visualizations import extract_tech_data
+
+def chart_inputs(df, dataset_version):
+    """The aggregates each benchmarked chart is drawn from, computed once up front"""
+    salary_col, currency_col = select_salary_columns(df.columns)
+    salary = salary_aggregates(df, df, dataset_version, salary_col, currency_col) if salary_col else None
+    return {
+        'roles': rank_roles(cohort_counts(*load_multiselect_matrix(df, dataset_version, 'DevType'))) if 'DevType' in df.columns else None,
+        'languages': extract_tech_data(df, 'LanguageHaveWorkedWith').head(15),
+        'countries': df['Country'].value_counts().head(10) if 'Country' in df.columns else None,
+        'experience': experience_bucket(df['YearsCodeNum']).value_counts().sort_index() if 'YearsCodeNum' in df.columns else None,
+        'age': df['Age'].value_counts() if 'Age' in df.columns else None,
+        'sentiment': compute_ai_metrics(df, dataset_version)['sentiment'],
+        'salaries': salary['salaries'] if salary else None,
+        'salary_by_role': salary['by_role'].head(10) if salary else None,
+    }
+
+def chart_builders(inputs):
+    """(plotly.express, factory) builders per chart, both drawing the same data"""
+    roles, languages, countries = inputs['roles'], inputs['languages'], inputs['countries']
+    experience, age, sentiment = inputs['experience'], inputs['age'], inputs['sentiment']
+    salaries, by_role = inputs['salaries'], inputs['salary_by_role']
+    builders = {}
+
+    if roles is not None and len(roles) > 0:
+        builders['role_bars'] = (
+            lambda: px.bar(
+                x=roles.values, y=roles.index, orientation='h', title="Developer Role Distribution",
+                labels={'x': 'Count', 'y': 'Role'}, color=roles.values, color_continuous_scale='oranges'
+            ).update_layout(height=400),
+            lambda: bar_chart(roles.values, roles.index, "Developer Role Distribution", 'Count', 'Role', orientation='h', colorscale='oranges'),
+        )
+    if len(languages) > 0:
+        builders['tech_usage'] = (
+            lambda: px.bar(
+                x=languages.values, y=languages.index, orientation='h', title='Languages',
+                labels={'x': '% of Developers', 'y': 'Technology'}, text=[f"{p}%" for p in languages],
+                color_discrete_sequence=['#F48024']
+            ).update_layout(height=500, yaxis={'categoryorder': 'total ascending'}, showlegend=False),
+            lambda: bar_chart(
+                languages.values, languages.index, 'Languages', '% of Developers', 'Technology',
+                orientation='h', text=[f"{p}%" for p in languages], height=500
+            ),
+        )
+    if countries is not None:
+        builders['country_bars'] = (
+            lambda: px.bar(
+                countries, x=countries.values, y=countries.index, orientation='h', title='Top 10 Countries',
+                labels={'x': 'Number of Developers', 'y': 'Country'}, color=countries.values, color_continuous_scale='viridis'
+            ).update_layout(height=500, showlegend=False),
+            lambda: bar_chart(
+                countries.values, countries.index, 'Top 10 Countries', 'Number of Developers', 'Country',
+                orientation='h', colorscale='viridis', height=500
+            ),
+        )
+    if experience is not None:
+        builders['experience_bars'] = (
+            lambda: px.bar(
+                x=experience.index, y=experience.values, title='Years of Coding Experience',
+                labels={'x': 'Experience Range', 'y': 'Number of Developers'}, text=experience.values
+            ).update_traces(marker_color='#F48024', textposition='outside').update_layout(height=500, xaxis_tickangle=-45),
+            lambda: bar_chart(
+                experience.index, experience.values, 'Years of Coding Experience', 'Experience Range', 'Number of Developers',
+                text=experience.values, textposition='outside', xaxis={'tickangle': -45}
+            ),
+        )
+    if age is not None:
+        builders['age_pie'] = (
+            lambda: px.pie(values=age.values, names=age.index, title='Age Distribution of Developers', hole=0.3)
+            .update_traces(textposition='inside', textinfo='percent+label'),
+            lambda: pie_chart(age.values, age.index, 'Age Distribution of Developers', hole=0.3),
+        )
+    if len(sentiment) > 0:
+        builders['sentiment_pie'] = (
+            lambda: px.pie(
+                values=sentiment.values, names=sentiment.index, title='Sentiment Toward AI Tools', hole=0.4,
+                category_orders={'names': list(sentiment.index)}, color_discrete_sequence=px.colors.diverging.RdYlGn[::-1]
+            ).update_traces(textposition='inside', textinfo='percent+label', sort=False),
+            lambda: pie_chart(
+                sentiment.values, sentiment.index, 'Sentiment Toward AI Tools', hole=0.4,
+                colors=px.colors.diverging.RdYlGn[::-1], sort=False
+            ),
+        )
+    if salaries is not None and len(salaries) > 0:
+        mean, median = salaries.mean(), salaries.median()
+
+        def px_histogram():
+            fig = px.histogram(
+                x=salaries, nbins=30, title="Salary Distribution (Converted to USD)",
+                labels={'x': 'Annual Salary (USD)', 'y': 'Number of Developers'}, color_discrete_sequence=['#F48024']
+            ).update_layout(height=400, showlegend=False, bargap=0.1)
+            fig.add_vline(x=mean, line_dash="dash", line_color="red", annotation_text="Mean", annotation_position="top right")
+            fig.add_vline(x=median, line_dash="dash", line_color="green", annotation_text="Median", annotation_position="top left")
+            return fig
+
+        builders['salary_histogram'] = (
+            px_histogram,
+            lambda: histogram_chart(
+                salaries, "Salary Distribution (Converted to USD)", 'Annual Salary (USD)', 'Number of Developers',
+                vlines=[(mean, "red", "Mean", "top right"), (median, "green", "Median", "top left")], height=400
+            ),
+        )
+    if by_role is not None and len(by_role) > 0:
+        error = (by_role['CI High'] - by_role['Avg Salary (USD)'], by_role['Avg Salary (USD)'] - by_role['CI Low'])
+        builders['salary_by_role'] = (
+            lambda: px.bar(
+                by_role, x='Avg Salary (USD)', y='Role', orientation='h', error_x=error[0], error_x_minus=error[1],
+                hover_data={'Count': True, 'CI Low': ':,.0f', 'CI High': ':,.0f'}, title="Average Salary by Role",
+                color='Avg Salary (USD)', color_continuous_scale='viridis'
+            ).update_layout(height=400, yaxis={'categoryorder': 'category ascending'}),
+            lambda: bar_chart(
+                by_role['Avg Salary (USD)'], by_role['Role'], "Average Salary by Role", 'Average Salary (USD)', '',
+                orientation='h', colorscale='viridis', error=error,
+                hover={'Count': (by_role['Count'], ''), 'CI Low': (by_role['CI Low'], ',.0f'), 'CI High': (by_role['CI High'], ',.0f')},
+                yaxis={'categoryorder': 'category ascending'}
+            ),
+        )
+    return builders
+
+def time_builder(build, repeat):
+    """Median build and serialization time in ms, and the serialized size in KB"""
+    build()
+    build_times, json_times = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fig = build()
+        built = time.perf_counter()
+        spec = pio.to_json(fig, validate=False)
+        build_times.append(built - started)
+        json_times.append(time.perf_counter() - built)
+    return np.median(build_times) * 1000, np.median(json_times) * 1000, len(spec) / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=30, help='Timed builds per chart and path')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    df = load_survey()
+    if df.empty:
+        sys.exit('No data to benchmark')
+    builders = chart_builders(chart_inputs(df, get_dataset_version()))
+
+    rows = []
+    for chart, (px_build, factory_build) in builders.items():
+        px_ms, px_json_ms, px_kb = time_builder(px_build, args.repeat)
+        factory_ms, factory_json_ms, factory_kb = time_builder(factory_build, args.repeat)
+        rows.append({
+            'chart': chart,
+            'px_build_ms': px_ms, 'factory_build_ms': factory_ms,
+            'px_json_ms': px_json_ms, 'factory_json_ms': factory_json_ms,
+            'px_kb': px_kb, 'factory_kb': factory_kb,
+            'speedup': (px_ms + px_json_ms) / (factory_ms + factory_json_ms),
+        })
+
+    results = pd.DataFrame(rows).set_index('chart')
+    results.loc['TOTAL'] = results.sum()
+    results.loc['TOTAL', 'speedup'] = (
+        (results.loc['TOTAL', 'px_build_ms'] + results.loc['TOTAL', 'px_json_ms'])
+        / (results.loc['TOTAL', 'factory_build_ms'] + results.loc['TOTAL', 'factory_json_ms'])
+    )
+    print(f'{len(df):,} rows, median of {args.repeat} builds\n')
+    print(results.round(2).to_string())
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results.reset_index().to_dict(orient='records'), f, indent=2, default=float)
+
+if __name__ == '__main__':
+    main()
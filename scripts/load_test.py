@@ -0,0 +1,238 @@
+"""Concurrent-session load test for the survey app.
+
+Drives simulated sessions with Streamlit's AppTest, all inside one process, the
+way one container serves every browser tab. Each session opens a page and keeps
+changing random sidebar filters and sliders. The script reports throughput,
+per-page p50/p95/p99 rerun latency and the peak RSS seen while each level ran.
+It needs no network.
+
+    python scripts/load_test.py --sessions 1 2 4 8 --duration 60
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+DEFAULT_PAGES = ['Dashboard.py'] + sorted(
+    os.path.relpath(path, SRC_DIR) for path in glob.glob(os.path.join(SRC_DIR, 'pages', '*.py'))
+)
+
+def serialize_script_compiles():
+    """Compile page scripts one at a time across AppTest instances.
+
+    Every AppTest has its own ScriptCache, so concurrent sessions parse pages on several threads
+    at once, and CPython 3.11's AST constructor then fails with "AST constructor recursion depth
+    mismatch" (gh-106905). Only the page compile done by ScriptCache is locked; the app's own code
+    runs as it would in a server.
+    """
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+def keep_test_runtime():
+    """Keep a mock Runtime installed while other sessions run.
+
+    AppTest installs a fresh mock Runtime for each run and clears the singleton when that run
+    ends, so a concurrent session can fail with "Runtime hasn't been created!". Fall back to the
+    last mock installed instead.
+    """
+    installed = [None]
+
+    def instance(cls):
+        if cls._instance is not None:
+            installed[0] = cls._instance
+        if installed[0] is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return installed[0]
+
+    Runtime.instance = classmethod(instance)
+
+def rss_mb():
+    """Current resident set size from /proc, or None where there's no /proc"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return None
+
+def peak_rss_so_far_mb():
+    """Peak resident set size of the whole process so far (ru_maxrss is in KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def sample_peak_rss(stop, peak, interval=0.1):
+    """Poll the current RSS until stop is set, keeping the largest value in peak[0]"""
+    while not stop.wait(interval):
+        current = rss_mb()
+        if current is not None:
+            peak[0] = max(peak[0], current)
+
+def slider_value(slider, rng):
+    """A random on-step value (or range) for a numeric slider"""
+    low, high, step = slider.min, slider.max, slider.step or 1
+    steps = int(round((high - low) / step))
+    pick = lambda: low + step * rng.randint(0, steps)
+    if isinstance(slider.value, (tuple, list)):
+        return tuple(sorted((pick(), pick())))
+    return pick()
+
+def interact(at, rng):
+    """Change one random selectbox, radio, multiselect or slider and rerun; False if there is nothing to change"""
+    widgets = [w for w in [*at.selectbox, *at.radio, *at.multiselect, *at.slider] if not w.disabled]
+    widgets = [w for w in widgets if getattr(w, 'options', None) or w.type == 'slider']
+    if not widgets:
+        return False
+
+    widget = rng.choice(widgets)
+    if widget.type == 'selectbox':
+        widget.select_index(rng.randrange(len(widget.options)))
+    elif widget.type == 'radio':
+        widget.set_value(rng.choice(widget.options))
+    elif widget.type == 'multiselect':
+        limit = widget.max_selections or 3
+        widget.set_value(rng.sample(list(widget.options), rng.randint(1, min(limit, 3, len(widget.options)))))
+    elif isinstance(widget.min, (int, float)):
+        widget.set_value(slider_value(widget, rng))
+    else:
+        return False
+
+    at.run()
+    return True
+
+def run_session(session_id, pages, deadline, timeout, results, lock):
+    """One simulated user: open a random page, then keep changing its filters until the deadline"""
+    rng = random.Random(session_id)
+    while time.monotonic() < deadline:
+        page = rng.choice(pages)
+        at = AppTest.from_file(os.path.join(SRC_DIR, page), default_timeout=timeout)
+        for step in range(rng.randint(3, 8)):
+            if time.monotonic() >= deadline:
+                break
+            started = time.perf_counter()
+            error = None
+            try:
+                if step == 0:
+                    at.run()
+                elif not interact(at, rng):
+                    break
+                if at.exception:
+                    error = at.exception[0].value
+            except Exception as exc:
+                error = repr(exc)
+            elapsed = time.perf_counter() - started
+            with lock:
+                results.append({'session': session_id, 'page': page, 'first_run': step == 0, 'seconds': elapsed, 'error': error})
+            if error:
+                break
+
+def run_load(sessions, pages, duration, timeout):
+    """Run N concurrent sessions for a fixed time and collect every rerun, plus the peak RSS while they ran"""
+    results, lock = [], threading.Lock()
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    threads = [
+        threading.Thread(target=run_session, args=(i, pages, deadline, timeout, results, lock), daemon=True)
+        for i in range(sessions)
+    ]
+    stop, peak = threading.Event(), [rss_mb() or 0.0]
+    sampler = threading.Thread(target=sample_peak_rss, args=(stop, peak), daemon=True)
+    sampler.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    sampler.join()
+    # Without /proc (macOS) only the process-wide peak is known, which includes earlier levels
+    level_peak = peak[0] if rss_mb() is not None else None
+    return pd.DataFrame(results), time.monotonic() - started, level_peak
+
+def summarize(runs, wall_seconds):
+    """Reruns, throughput, latency percentiles and errors per page and overall"""
+    def row(group):
+        seconds = group['seconds'].to_numpy()
+        p50, p95, p99 = np.percentile(seconds, [50, 95, 99]) if len(seconds) else (np.nan,) * 3
+        return pd.Series({
+            'reruns': len(group),
+            'reruns_per_s': len(group) / wall_seconds,
+            'p50_ms': p50 * 1000,
+            'p95_ms': p95 * 1000,
+            'p99_ms': p99 * 1000,
+            'errors': int(group['error'].notna().sum()),
+        })
+
+    per_page = runs.groupby('page').apply(row)
+    per_page.loc['ALL'] = row(runs)
+    return per_page
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8], help='Concurrent session counts to try, in order')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run each session count')
+    parser.add_argument('--pages', nargs='+', default=DEFAULT_PAGES, help='Scripts to drive, relative to src/')
+    parser.add_argument('--timeout', type=float, default=120, help='Per-rerun AppTest timeout in seconds')
+    parser.add_argument('--target-p95', type=float, default=1.0, help='Latency target in seconds for the capacity verdict')
+    parser.add_argument('--include-first-run', action='store_true', help='Count the initial page load in the latency percentiles')
+    parser.add_argument('--json', help='Also write the summaries to this file')
+    args = parser.parse_args()
+
+    # Pages import utils.* relative to src/
+    sys.path.insert(0, SRC_DIR)
+    os.chdir(SRC_DIR)
+    serialize_script_compiles()
+    keep_test_runtime()
+
+    # Load the data and build the shared caches once, so the first level isn't measuring cold start
+    print('Warming up...', flush=True)
+    for page in args.pages:
+        AppTest.from_file(os.path.join(SRC_DIR, page), default_timeout=args.timeout).run()
+
+    report, supported = {}, 0
+    for sessions in args.sessions:
+        runs, wall_seconds, level_rss = run_load(sessions, args.pages, args.duration, args.timeout)
+        if runs.empty:
+            print(f'\n{sessions} sessions: no reruns completed')
+            continue
+        measured = runs if args.include_first_run else runs[~runs['first_run']]
+        summary = summarize(measured if not measured.empty else runs, wall_seconds)
+        # Failed first page loads count even when their latency is left out of the percentiles
+        errors = int(runs['error'].notna().sum())
+        if level_rss is not None:
+            rss = {'peak_rss_mb': level_rss}
+            rss_text = f'peak RSS {level_rss:.0f} MB'
+        else:
+            rss = {'peak_rss_so_far_mb': peak_rss_so_far_mb()}
+            rss_text = f'peak RSS so far {rss["peak_rss_so_far_mb"]:.0f} MB'
+        report[sessions] = {'summary': summary.reset_index().to_dict(orient='records'), 'errors': errors, **rss}
+
+        print(f'\n=== {sessions} concurrent sessions, {wall_seconds:.0f}s, {rss_text}, {errors} errors ===')
+        print(summary.round(1).to_string())
+        for (page, error), count in runs.dropna(subset=['error']).groupby(['page', 'error']).size().items():
+            print(f'  {count}x {page}: {error[:200]}')
+
+        if summary.loc['ALL', 'p95_ms'] <= args.target_p95 * 1000 and errors == 0:
+            supported = sessions
+
+    print(f'\nLargest session count with p95 <= {args.target_p95:.2f}s and no errors: {supported or "none"}')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'supported_sessions': supported, 'levels': report}, f, indent=2, default=float)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""Static snapshot renderer for the survey dashboard.
+
+Pre-renders the dashboard for every country x experience x role combination
+that has respondents. Each combination's figures, drawn with the chart
+functions in utils/visualizations.py, go into one JSON file together with its
+aggregates. A small index.html and index.json let the snapshots be browsed
+without a Python server. Combinations are rendered on a process pool. On a
+re-run, a combination whose rows and rendering code are unchanged is skipped.
+
+    python scripts/render_snapshots.py --out snapshots
+    python -m http.server --directory snapshots
+"""
+import argparse
+import dataclasses
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import plotly
+from plotly.offline import get_plotlyjs_version
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from utils.aggregates import ALL_COUNTRIES, ALL_EXPERIENCE, ALL_ROLES, dashboard_tasks, select_salary_columns, split_roles
+from utils.ai_metrics import compute_ai_metrics
+from utils.cleaning import EXPERIENCE_BUCKETS
+from utils.crosstab import crosstab_counts, load_category_codes, normalize_crosstab
+from utils.data_loader import get_dataset_version, load_survey
+from utils.visualizations import (
+    plot_age_distribution,
+    plot_ai_adoption_by_experience,
+    plot_ai_agent_impact,
+    plot_ai_sentiment,
+    plot_ai_workflow_integration,
+    plot_country_distribution,
+    plot_education_distribution,
+    plot_experience_distribution,
+    plot_have_vs_want,
+    plot_remote_work_by_orgsize
+)
+
+INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Stack Overflow Survey 2025</title>
+<script src="https://cdn.plot.ly/plotly-{plotly_js}.min.js"></script>
+<style>
+  body {{ background: #0E1117; color: #FAFAFA; font-family: sans-serif; margin: 2rem; }}
+  select {{ margin-right: 1rem; padding: 0.3rem; }}
+  #kpis {{ color: #9CA3AF; margin: 1rem 0; }}
+  .figure {{ margin-bottom: 2rem; }}
+</style>
+</head>
+<body>
+<h1>📊 Stack Overflow Survey 2025</h1>
+<div><select id="country"></select><select id="experience"></select><select id="role"></select></div>
+<div id="kpis"></div>
+<div id="figures"></div>
+<script>
+const fields = ['country', 'experience', 'role'];
+const percent = value => value == null ? 'N/A' : value.toFixed(1) + '%';
+fetch('index.json').then(response => response.json()).then(index => {{
+  const files = {{}};
+  index.snapshots.forEach(s => files[[s.country, s.experience, s.role].join('|')] = s.file);
+  fields.forEach(field => {{
+    const select = document.getElementById(field);
+    index.filters[field].forEach(option => select.add(new Option(option, option)));
+    select.onchange = show;
+  }});
+  function show() {{
+    const key = fields.map(field => document.getElementById(field).value).join('|');
+    const kpis = document.getElementById('kpis'), figures = document.getElementById('figures');
+    figures.innerHTML = '';
+    if (!(key in files)) {{
+      kpis.textContent = 'Fewer than ' + index.min_respondents + ' respondents match these filters.';
+      return;
+    }}
+    fetch(files[key]).then(response => response.json()).then(snapshot => {{
+      const k = snapshot.aggregates.kpis;
+      kpis.textContent = k.respondents + ' responses • AI usage ' + percent(k.ai_percentage) +
+        ' • remote ' + percent(k.remote_percentage) + ' • top language ' + (k.top_language || 'N/A');
+      Object.values(snapshot.figures).forEach(figure => {{
+        const div = document.createElement('div');
+        div.className = 'figure';
+        figures.appendChild(div);
+        Plotly.newPlot(div, figure.data, figure.layout, {{responsive: true}});
+      }});
+    }});
+  }}
+  show();
+}});
+</script>
+</body>
+</html>
+"""
+
+def code_fingerprint():
+    """Hash of the code that renders a snapshot, so changing a chart re-renders everything"""
+    digest = hashlib.sha1(plotly.__version__.encode('utf-8'))
+    for path in sorted(glob.glob(os.path.join(SRC_DIR, 'utils', '*.py'))) + [os.path.abspath(__file__)]:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def filter_combinations(df, min_respondents):
+    """Row positions of every filter combination with at least min_respondents, by (country, experience, role)"""
+    everyone = np.arange(len(df))
+    countries = [(ALL_COUNTRIES, everyone)]
+    if 'Country' in df.columns:
+        countries += sorted(df.groupby('Country', observed=True).indices.items())
+
+    experience = df['ExpBucket'].astype(object).to_numpy() if 'ExpBucket' in df.columns else None
+    buckets = [ALL_EXPERIENCE] + (EXPERIENCE_BUCKETS if experience is not None else [])
+
+    # Same substring match as the Dashboard's role filter
+    role_masks = {}
+    if 'DevType' in df.columns:
+        devtype = df['DevType'].astype(str)
+        for role in sorted(r for r in split_roles(df['DevType']).unique() if r and r.lower() != 'other'):
+            role_masks[role] = devtype.str.contains(role, regex=False).to_numpy()
+
+    combinations = {}
+    for country, country_positions in countries:
+        for bucket in buckets:
+            positions = country_positions if bucket == ALL_EXPERIENCE else country_positions[experience[country_positions] == bucket]
+            if len(positions) < min_respondents:
+                continue
+            combinations[(country, bucket, ALL_ROLES)] = positions
+            for role, mask in role_masks.items():
+                role_positions = positions[mask[positions]]
+                if len(role_positions) >= min_respondents:
+                    combinations[(country, bucket, role)] = role_positions
+    return combinations
+
+def snapshot_hash(fingerprint, combination, row_hashes, positions):
+    """Content hash of one snapshot: the rendering code, the filters and the hash of every row in the cohort"""
+    digest = hashlib.sha1(fingerprint.encode('utf-8'))
+    digest.update(repr(combination).encode('utf-8'))
+    digest.update(row_hashes[positions].tobytes())
+    return digest.hexdigest()
+
+def snapshot_file(combination):
+    """Stable relative path of a combination's snapshot"""
+    return f"snapshots/{hashlib.sha1(repr(combination).encode('utf-8')).hexdigest()[:16]}.json"
+
+def _json_table(table):
+    """A Series or DataFrame as plain JSON values (NaN becomes null)"""
+    if isinstance(table, pd.DataFrame):
+        return json.loads(table.reset_index().to_json(orient='records'))
+    return json.loads(table.to_json())
+
+def _json_value(value):
+    """A scalar as a plain JSON value (NaN becomes null)"""
+    if isinstance(value, (np.generic, float)):
+        value = value.item() if isinstance(value, np.generic) else value
+        return None if isinstance(value, float) and np.isnan(value) else value
+    return value
+
+def snapshot_aggregates(sections):
+    """The Dashboard sections of a cohort in JSON form"""
+    aggregates = {'kpis': {name: _json_value(value) for name, value in dataclasses.asdict(sections['kpis']).items()}}
+    if 'role_counts' in sections:
+        aggregates['role_counts'] = _json_table(sections['role_counts'])
+    if 'language_ranks' in sections:
+        aggregates['language_ranks'] = _json_table(sections['language_ranks'].head(15))
+    if 'salary' in sections:
+        salary = sections['salary']
+        aggregates['salary'] = {
+            'median': _json_value(salary['salaries'].median()) if len(salary['salaries']) > 0 else None,
+            'intervals': _json_table(salary['intervals']),
+            'by_role': _json_table(salary['by_role']),
+            'by_country': _json_table(salary['by_country']),
+        }
+    return aggregates
+
+def snapshot_figures(df, df_filtered, dataset_version, positions, sections, country):
+    """Every chart of a cohort, by name, skipping the ones its data can't draw"""
+    ai_metrics = compute_ai_metrics(df, dataset_version, positions)
+    figures = {
+        'languages': plot_have_vs_want(sections.get('language_ranks'), 'Programming Languages'),
+        'countries': plot_country_distribution(df_filtered) if country == ALL_COUNTRIES and 'Country' in df.columns else None,
+        'age': plot_age_distribution(df_filtered),
+        'experience': plot_experience_distribution(df_filtered),
+        'education': plot_education_distribution(df_filtered) if 'EdLevel' in df.columns else None,
+        'ai_adoption': plot_ai_adoption_by_experience(ai_metrics),
+        'ai_sentiment': plot_ai_sentiment(ai_metrics),
+        'ai_workflow': plot_ai_workflow_integration(ai_metrics),
+        'ai_agent_impact': plot_ai_agent_impact(ai_metrics),
+    }
+    if 'OrgSize' in df.columns and 'RemoteWork' in df.columns:
+        work_by_orgsize = crosstab_counts(
+            *load_category_codes(df, dataset_version, 'OrgSize'),
+            *load_category_codes(df, dataset_version, 'RemoteWork'),
+            positions
+        )
+        work_by_orgsize = work_by_orgsize.loc[work_by_orgsize.sum(axis=1) > 0, work_by_orgsize.sum(axis=0) > 0]
+        figures['remote_by_orgsize'] = plot_remote_work_by_orgsize(normalize_crosstab(work_by_orgsize, 'row'))
+    return {name: json.loads(fig.to_json()) for name, fig in figures.items() if fig is not None}
+
+_worker = {}
+
+def init_worker():
+    """Load the dataset once per worker process (free with fork: the parent's cached frame is inherited)"""
+    df = load_survey()
+    _worker.update(df=df, dataset_version=get_dataset_version(), salary_columns=select_salary_columns(df.columns))
+
+def render_batch(batch, out_dir):
+    """Render and write a batch of snapshots in a worker, returning their index entries"""
+    df, dataset_version = _worker['df'], _worker['dataset_version']
+    salary_col, currency_col = _worker['salary_columns']
+    entries = []
+    for (country, bucket, role), positions, content_hash in batch:
+        df_filtered = df if len(positions) == len(df) else df.iloc[positions]
+        tasks = dashboard_tasks(df, df_filtered, dataset_version, positions, salary_col, currency_col)
+        sections = {name: task() for name, task in tasks.items()}
+        snapshot = {
+            'filters': {'country': country, 'experience': bucket, 'role': role},
+            'aggregates': snapshot_aggregates(sections),
+            'figures': snapshot_figures(df, df_filtered, dataset_version, positions, sections, country),
+        }
+
+        # Write beside the target and rename, so a browser never fetches half a file
+        entry = {'country': country, 'experience': bucket, 'role': role, 'respondents': len(positions),
+                 'hash': content_hash, 'file': snapshot_file((country, bucket, role))}
+        path = os.path.join(out_dir, entry['file'])
+        with open(f'{path}.partial', 'w') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(f'{path}.partial', path)
+        entries.append(entry)
+    return entries
+
+def previous_entries(out_dir):
+    """Index entries of the last run, by combination"""
+    try:
+        with open(os.path.join(out_dir, 'index.json')) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {(s['country'], s['experience'], s['role']): s for s in index.get('snapshots', [])}
+
+def write_index(out_dir, entries, min_respondents):
+    """index.json listing every snapshot and the filter options, plus the static viewer page"""
+    index = {
+        'generated': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'min_respondents': min_respondents,
+        'filters': {
+            'country': [ALL_COUNTRIES] + sorted({e['country'] for e in entries} - {ALL_COUNTRIES}),
+            'experience': [ALL_EXPERIENCE] + [b for b in EXPERIENCE_BUCKETS if any(e['experience'] == b for e in entries)],
+            'role': [ALL_ROLES] + sorted({e['role'] for e in entries} - {ALL_ROLES}),
+        },
+        'snapshots': entries,
+    }
+    with open(os.path.join(out_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(INDEX_HTML.format(plotly_js=get_plotlyjs_version()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default='snapshots', help='Output directory')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--min-respondents', type=int, default=10, help='Skip combinations with fewer respondents than this')
+    parser.add_argument('--batch-size', type=int, default=16, help='Combinations rendered per worker task')
+    parser.add_argument('--force', action='store_true', help='Re-render every combination, even unchanged ones')
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    df = load_survey()
+    if df.empty:
+        sys.exit('No data to render')
+    os.makedirs(os.path.join(args.out, 'snapshots'), exist_ok=True)
+
+    combinations = filter_combinations(df, args.min_respondents)
+    fingerprint = code_fingerprint()
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    previous = {} if args.force else previous_entries(args.out)
+
+    entries, pending = [], []
+    for combination, positions in combinations.items():
+        content_hash = snapshot_hash(fingerprint, combination, row_hashes, positions)
+        entry = previous.get(combination)
+        if entry and entry['hash'] == content_hash and os.path.exists(os.path.join(args.out, entry['file'])):
+            entries.append(entry)
+        else:
+            pending.append((combination, positions, content_hash))
+    print(f'{len(combinations)} combinations: {len(entries)} unchanged, {len(pending)} to render', flush=True)
+
+    batches = [pending[i:i + args.batch_size] for i in range(0, len(pending), args.batch_size)]
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool:
+        futures = [pool.submit(render_batch, batch, args.out) for batch in batches]
+        for done, future in enumerate(as_completed(futures), 1):
+            entries.extend(future.result())
+            print(f'  {done}/{len(batches)} batches', flush=True)
+
+    # Drop snapshots of combinations that no longer exist or fell under the respondent floor
+    kept = {os.path.normpath(os.path.join(args.out, e['file'])) for e in entries}
+    for path in glob.glob(os.path.join(args.out, 'snapshots', '*.json')):
+        if os.path.normpath(path) not in kept:
+            os.remove(path)
+
+    entries.sort(key=lambda e: (e['country'] != ALL_COUNTRIES, e['country'], e['experience'], e['role']))
+    write_index(args.out, entries, args.min_respondents)
+    print(f'Wrote {len(pending)} snapshots to {args.out} in {time.monotonic() - started:.1f}s')
+
+if __name__ == '__main__':
+    main()
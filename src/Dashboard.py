@@ -1,11 +1,26 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
+import html
 from datetime import datetime
-from utils.data_loader import load_data, load_schema, preprocess_data, get_language_data, get_tech_stack_data
+from utils.data_loader import load_survey, load_schema, get_dataset_version
+from utils.cleaning import EXPERIENCE_BUCKETS
+from utils.multiselect import cohort_positions, load_multiselect_matrix
+from utils.salary import load_usd_salaries
+from utils.memory import frame_footprint, cache_footprint
+from utils.tech_rankings import trending_technologies
+from utils.data_browser import load_sort_index, browse_page, page_count, PAGE_SIZES
+from utils.filter_cache import get_filter_cache, filter_key
+from utils.aggregates import cohort_frame, role_options, select_salary_columns, dashboard_tasks, preview_sections, preview_margins
+from utils.scheduler import submit_concurrently
+from utils.sampling import load_stratified_sample, sample_version, PREVIEW_ENABLED, PREVIEW_MIN_ROWS
+from utils.warmup import start_warmup
+from utils.export import export_rows, export_table, EXPORT_FORMATS
+from utils.figures import bar_chart, histogram_chart
+from utils.filter_expressions import compile_filter, FilterExpressionError, FILTER_SYNTAX, get_term_mask_cache
+from utils.partials import filter_state, fill_from_partials
+from utils.metrics import start_rerun, finish_rerun, timed_section, start_metrics_server, METRICS_HOST, METRICS_PORT
 import numpy as np
-import re
 
 st.set_page_config(
     page_title="Stack Overflow Survey 2025",
@@ -13,6 +28,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+rerun = start_rerun('dashboard')
 
 st.markdown("""
 <style>
@@ -147,249 +163,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-CURRENCY_RATES = {
-    'USD': 1.0,
-    'EUR': 1.08,      # European Euro
-    'UAH': 0.026,     # Ukrainian hryvnia
-    'INR': 0.012,     # Indian rupee
-    'AUD': 0.65,      # Australian dollar
-    'BDT': 0.0091,    # Bangladeshi taka
-    'BRL': 0.20,      # Brazilian real
-    'GBP': 1.25,      # Pound sterling
-    'SEK': 0.095,     # Swedish krona
-    'CZK': 0.044,     # Czech koruna
-    'PLN': 0.25,      # Polish zloty
-    'HUF': 0.0028,    # Hungarian forint
-    'MYR': 0.21,      # Malaysian ringgit
-    'CHF': 1.12,      # Swiss franc
-    'EGP': 0.032,     # Egyptian pound
-    'LKR': 0.0033,    # Sri Lankan rupee
-    'RUB': 0.011,     # Russian ruble
-    'RSD': 0.0095,    # Serbian dinar
-    'JPY': 0.0067,    # Japanese yen
-    'RON': 0.22,      # Romanian leu
-    'CAD': 0.73,      # Canadian dollar
-    'UYU': 0.026,     # Uruguayan peso
-    'AED': 0.27,      # United Arab Emirates dirham
-    'ARS': 0.0012,    # Argentine peso (hyperinflation adjusted)
-    'NOK': 0.095,     # Norwegian krone
-    'CRC': 0.0019,    # Costa Rican colon
-    'PHP': 0.018,     # Philippine peso
-    'CNY': 0.14,      # Chinese Yuan Renminbi
-    'ILS': 0.27,      # Israeli new shekel
-    'BGN': 0.55,      # Bulgarian lev
-    'MAD': 0.10,      # Moroccan dirham
-    'MXN': 0.058,     # Mexican peso
-    'TRY': 0.033,     # Turkish lira
-    'BOB': 0.14,      # Bolivian boliviano
-    'NPR': 0.0075,    # Nepalese rupee
-    'ZAR': 0.053,     # South African rand
-    'TND': 0.32,      # Tunisian dinar
-    'PKR': 0.0036,    # Pakistani rupee
-    'SGD': 0.74,      # Singapore dollar
-    'PYG': 0.00014,   # Paraguayan guarani
-    'AZN': 0.59,      # Azerbaijan manat
-    'DKK': 0.14,      # Danish krone
-    'NGN': 0.00066,   # Nigerian naira
-    'IRR': 0.000024,  # Iranian rial
-    'HKD': 0.13,      # Hong Kong dollar
-    'TWD': 0.031,     # New Taiwan dollar
-    'VND': 0.000041,  # Vietnamese dong
-    'CLP': 0.0011,    # Chilean peso
-    'KRW': 0.00075,   # South Korean won
-    'COP': 0.00026,   # Colombian peso
-    'UGX': 0.00027,   # Ugandan shilling
-    'JOD': 1.41,      # Jordanian dinar
-    'IDR': 0.000064,  # Indonesian rupiah
-    'ANG': 0.56,      # Netherlands Antillean guilder
-    'MGA': 0.00022,   # Malagasy ariary
-    'DOP': 0.018,     # Dominican peso
-    'GTQ': 0.13,      # Guatemalan quetzal
-    'QAR': 0.27,      # Qatari riyal
-    'THB': 0.028,     # Thai baht
-    'BAM': 0.55,      # Bosnia and Herzegovina convertible mark
-    'AMD': 0.0025,    # Armenian dram
-    'MZN': 0.016,     # Mozambican metical
-    'KZT': 0.0021,    # Kazakhstani tenge
-    'HNL': 0.040,     # Honduran lempira
-    'GEL': 0.37,      # Georgian lari
-    'KGS': 0.011,     # Kyrgyzstani som
-    'MDL': 0.056,     # Moldovan leu
-    'GHS': 0.081,     # Ghanaian cedi
-    'DZD': 0.0074,    # Algerian dinar
-    'KES': 0.0074,    # Kenyan shilling
-    'NZD': 0.61,      # New Zealand dollar
-    'IMP': 1.25,      # Manx pound (same as GBP)
-    'XPF': 0.0094,    # CFP franc
-    'FJD': 0.45,      # Fijian dollar
-    'XCD': 0.37,      # East Caribbean dollar
-    'PEN': 0.27,      # Peruvian sol
-    'HTG': 0.0078,    # Haitian gourde
-    'BHD': 2.65,      # Bahraini dinar
-    'IQD': 0.00068,   # Iraqi dinar
-    'KHR': 0.00025,   # Cambodian riel
-    'UZS': 0.000081,  # Uzbekistani som
-    'TJS': 0.091,     # Tajikistani somoni
-    'ZMW': 0.040,     # Zambian kwacha
-    'YER': 0.0040,    # Yemeni rial
-    'ALL': 0.010,     # Albanian lek
-    'MUR': 0.022,     # Mauritian rupee
-    'LBP': 0.00066,   # Lebanese pound
-    'BYN': 0.31,      # Belarusian ruble
-    'TTD': 0.15,      # Trinidad and Tobago dollar
-    'XOF': 0.0016,    # West African CFA franc
-    'MVR': 0.065,     # Maldivian rufiyaa
-    'BWP': 0.074,     # Botswana pula
-    'RWF': 0.00081,   # Rwandan franc
-    'XAF': 0.0016,    # Central African CFA franc
-    'SAR': 0.27,      # Saudi Arabian riyal
-    'MMK': 0.00048,   # Myanmar kyat
-    'NAD': 0.053,     # Namibian dollar (same as ZAR)
-    'AFN': 0.014,     # Afghan afghani
-    'VES': 0.000036,  # Venezuelan bolivar (hyperinflation)
-    'LYD': 0.21,      # Libyan dinar
-    'CDF': 0.00037,   # Congolese franc
-    'ETB': 0.018,     # Ethiopian birr
-    'OMR': 2.60,      # Omani rial
-    'BTN': 0.012,     # Bhutanese ngultrum (same as INR)
-    'MRU': 0.027,     # Mauritanian ouguiya
-    'SYP': 0.00040,   # Syrian pound
-    'GYD': 0.0048,    # Guyanese dollar
-    'KWD': 3.25,      # Kuwaiti dinar
-    'GIP': 1.25,      # Gibraltar pound (same as GBP)
-    'MOP': 0.12,      # Macanese pataca
-    'ISK': 0.0072,    # Icelandic krona
-    'JMD': 0.0064,    # Jamaican dollar
-    'MKD': 0.018,     # Macedonian denar
-    'CUP': 0.042,     # Cuban peso
-    'LAK': 0.000048,  # Lao kip
-    'TMT': 0.29,      # Turkmen manat
-    'SZL': 0.053,     # Swazi lilangeni (same as ZAR)
-    'BBD': 0.50,      # Barbadian dollar
-    'MNT': 0.00029,   # Mongolian tugrik
-    'TZS': 0.00039,   # Tanzanian shilling
-    'BND': 0.74,      # Brunei dollar (same as SGD)
-    'SRD': 0.029,     # Surinamese dollar
-    'KPW': 0.0011,    # North Korean won
-    'BSD': 1.0,       # Bahamian dollar (same as USD)
-    'NIO': 0.027,     # Nicaraguan cordoba
-    'GMD': 0.018,     # Gambian dalasi
-    'MWK': 0.00059,   # Malawian kwacha
-    'LSL': 0.053,     # Lesotho loti (same as ZAR)
-    'AOA': 0.0012,    # Angolan kwanza
-    'SDG': 0.0017,    # Sudanese pound
-    'WST': 0.37,      # Samoan tala
-    'KYD': 1.20,      # Cayman Islands dollar
-    'PGK': 0.27,      # Papua New Guinean kina
-    'DJF': 0.0056,    # Djiboutian franc
-    'BIF': 0.00035,   # Burundi franc
-    'BZD': 0.50,      # Belize dollar
-    'HRK': 0.14,      # Croatian kuna
-    'SLL': 0.000048,  # Sierra Leonean leone
-    'CVE': 0.0098,    # Cape Verdean escudo
-    'GNF': 0.00012,   # Guinean franc
-    'Unknown': 1.0,   # Unknown currency (assume USD)
-    'none': 1.0,      # No currency specified (assume USD)
-}
-
-def extract_currency_code(currency_text):
-    """Extract 3-letter currency code from currency description"""
-    if pd.isna(currency_text) or currency_text is None:
-        return 'Unknown'
-    
-    currency_text = str(currency_text).strip()
-    
-    if currency_text == 'Unknown' or currency_text == 'none':
-        return 'Unknown'
-    
-    currency_text = currency_text.replace('\t', ' ')
-    
-    match = re.match(r'^([A-Z]{3})\b', currency_text)
-    if match:
-        code = match.group(1)
-        if code in CURRENCY_RATES:
-            return code
-    
-    for code in CURRENCY_RATES.keys():
-        if code in currency_text and code != 'Unknown' and code != 'none':
-            return code
-    
-    if 'dollar' in currency_text.lower():
-        if 'US' in currency_text or 'United States' in currency_text:
-            return 'USD'
-        elif 'Canada' in currency_text or 'Canadian' in currency_text:
-            return 'CAD'
-        elif 'Australia' in currency_text or 'Australian' in currency_text:
-            return 'AUD'
-        elif 'New Zealand' in currency_text:
-            return 'NZD'
-        elif 'Singapore' in currency_text:
-            return 'SGD'
-        else:
-            return 'USD' 
-    
-    elif 'euro' in currency_text.lower():
-        return 'EUR'
-    elif 'pound' in currency_text.lower() or 'sterling' in currency_text.lower():
-        return 'GBP'
-    elif 'yen' in currency_text.lower():
-        return 'JPY'
-    elif 'rupee' in currency_text.lower():
-        if 'India' in currency_text or 'Indian' in currency_text:
-            return 'INR'
-        elif 'Pakistan' in currency_text:
-            return 'PKR'
-        elif 'Sri Lanka' in currency_text:
-            return 'LKR'
-        elif 'Nepal' in currency_text:
-            return 'NPR'
-        else:
-            return 'INR' 
-    
-    return 'Unknown'
-
-def clean_salary_value(salary):
-    """Clean salary value by converting to float and handling edge cases"""
-    if pd.isna(salary) or salary is None:
-        return None
-    
-    salary_str = str(salary).strip()
-    
-    salary_str = re.sub(r'[^\d.-]', '', salary_str)
-    
-    if salary_str == '' or salary_str == '.' or salary_str == '-':
-        return None
-    
-    try:
-        salary_float = float(salary_str)
-        
-        if salary_float < 1000 or salary_float > 10000000:
-            return None
-        
-        return salary_float
-    except (ValueError, TypeError):
-        return None
-
-def convert_to_usd(amount, currency_text):
-    """Convert amount from any currency to USD"""
-    if pd.isna(amount) or pd.isna(currency_text):
-        return None
-    
-    amount_clean = clean_salary_value(amount)
-    if amount_clean is None:
-        return None
-    
-    currency_code = extract_currency_code(currency_text)
-    
-    conversion_rate = CURRENCY_RATES.get(currency_code, 1.0)
-    
-    usd_amount = amount_clean * conversion_rate
-    
-    if usd_amount < 1000 or usd_amount > 10000000:
-        return None
-    
-    return usd_amount
-
 def format_currency(value):
     """Format currency values with K, M, B suffixes"""
     if pd.isna(value) or value is None or value == 0:
@@ -429,66 +202,22 @@ def format_number(num):
     else:
         return f"{int(num):,}"
 
-def convert_all_salaries_to_usd(df, salary_col, currency_col):
-    """Convert all salaries in dataframe to USD"""
-    usd_salaries = []
-    currency_codes = []
-    
-    for idx, row in df.iterrows():
-        salary = row[salary_col] if salary_col in row else None
-        currency = row[currency_col] if currency_col in row else None
-        
-        if pd.notna(salary) and pd.notna(currency):
-            usd_amount = convert_to_usd(salary, currency)
-            currency_code = extract_currency_code(currency)
-            usd_salaries.append(usd_amount)
-            currency_codes.append(currency_code)
-        else:
-            usd_salaries.append(None)
-            currency_codes.append(None)
-    
-    df_usd = df.copy()
-    df_usd['Salary_USD'] = usd_salaries
-    df_usd['Currency_Code'] = currency_codes
-    
-    df_usd = df_usd.dropna(subset=['Salary_USD'])
-    
-    if len(df_usd) > 10:
-        mean_salary = df_usd['Salary_USD'].mean()
-        std_salary = df_usd['Salary_USD'].std()
-        lower_bound = max(1000, mean_salary - 3 * std_salary)
-        upper_bound = min(1000000, mean_salary + 3 * std_salary)
-        df_usd = df_usd[(df_usd['Salary_USD'] >= lower_bound) & (df_usd['Salary_USD'] <= upper_bound)]
-    
-    return df_usd
-
-def clean_language_data(languages_series):
-    """Clean language data by removing unknowns and empty strings"""
-    if languages_series.empty:
-        return pd.Series(dtype='int64')
-    
-    languages = languages_series.dropna().astype(str).str.split(';').explode()
-    languages = languages.str.strip()
-    exclude_terms = ['unknown', 'none', 'nan', '', 'null', 'na', 'n/a', 'other']
-    languages = languages[~languages.str.lower().isin(exclude_terms)]
-    languages = languages[languages != '']
-    
-    return languages.value_counts()
-
-@st.cache_data
 def load_all_data():
     with st.spinner("📊 Loading dataset..."):
-        df_raw = load_data()
+        df = load_survey()
         schema = load_schema()
-        df = preprocess_data(df_raw)
-    return df, schema, df_raw
+    return df, schema
 
-df, schema, df_raw = load_all_data()
+df, schema = load_all_data()
+dataset_version = get_dataset_version()
 
 if df.empty:
     st.error("Failed to load data. Please check if data files exist.")
     st.stop()
 
+# Precompute popular filter states in the background so their first visitor doesn't pay for them
+warmup = start_warmup(df, dataset_version)
+
 st.sidebar.markdown(
     "<h4 style='margin: 0; padding: 0;'>🎯 Dashboard Controls</h4>",
     unsafe_allow_html=True
@@ -502,45 +231,95 @@ if 'Country' in df.columns:
 else:
     selected_country = 'All Countries'
 
-if selected_country != 'All Countries' and 'Country' in df.columns:
-    df_filtered = df[df['Country'] == selected_country]
-else:
-    df_filtered = df
-
 st.sidebar.subheader("📅 Filter by Experience")
-exp_ranges = ['All Experience', '0-2 years', '3-5 years', '6-10 years', '11-20 years', '20+ years']
+exp_ranges = ['All Experience'] + EXPERIENCE_BUCKETS
 selected_exp = st.sidebar.selectbox("Years of Experience", exp_ranges, key='exp_filter')
 
-if selected_exp != 'All Experience' and 'YearsCodeNum' in df_filtered.columns:
-    if selected_exp == '0-2 years':
-        df_filtered = df_filtered[df_filtered['YearsCodeNum'] <= 2]
-    elif selected_exp == '3-5 years':
-        df_filtered = df_filtered[(df_filtered['YearsCodeNum'] >= 3) & (df_filtered['YearsCodeNum'] <= 5)]
-    elif selected_exp == '6-10 years':
-        df_filtered = df_filtered[(df_filtered['YearsCodeNum'] >= 6) & (df_filtered['YearsCodeNum'] <= 10)]
-    elif selected_exp == '11-20 years':
-        df_filtered = df_filtered[(df_filtered['YearsCodeNum'] >= 11) & (df_filtered['YearsCodeNum'] <= 20)]
-    elif selected_exp == '20+ years':
-        df_filtered = df_filtered[df_filtered['YearsCodeNum'] > 20]
+# Filtered rows and their aggregates are shared across sessions, keyed by the filter state
+filter_cache = get_filter_cache()
 
 st.sidebar.subheader("👨‍💻 Filter by Role")
-if 'DevType' in df_filtered.columns:
-    roles = df_filtered['DevType'].dropna().astype(str).str.split(';').explode()
-    roles = roles.str.strip()
-    unique_roles = ['All Roles'] + sorted([r for r in roles.unique() if r and r.lower() != 'other'])
-    selected_role = st.sidebar.selectbox("Select Developer Role", unique_roles[:20], key='role_filter')
-    
-    if selected_role != 'All Roles':
-        # Use regex=False to avoid warning
-        df_filtered = df_filtered[df_filtered['DevType'].astype(str).str.contains(selected_role, na=False, regex=False)]
+if 'DevType' in df.columns:
+    base_key = filter_key(dataset_version, selected_country, selected_exp, 'All Roles')
+    unique_roles = filter_cache.get_or_compute(
+        base_key, 'role_options',
+        lambda: role_options(cohort_frame(df, filter_cache, base_key, selected_country, selected_exp, 'All Roles'))
+    )
+    selected_role = st.sidebar.selectbox("Select Developer Role", unique_roles, key='role_filter')
 else:
     selected_role = 'All Roles'
 
+st.sidebar.subheader("🧮 Advanced Filter")
+filter_text = st.sidebar.text_input(
+    "Filter expression", key='filter_expression', help=FILTER_SYNTAX,
+    placeholder="Country in (Germany, Poland) AND LanguageHaveWorkedWith has Rust"
+)
+try:
+    filter_expression = compile_filter(df, dataset_version, filter_text)
+except FilterExpressionError as error:
+    st.sidebar.error(str(error))
+    filter_expression = None
+
+cache_key = filter_key(dataset_version, selected_country, selected_exp, selected_role, filter_expression)
+# After a change along one filter, the cohort and its count-based sections come from that filter's cached partials
+current_state = filter_state(selected_country, selected_exp, selected_role)
+partials_dimension = fill_from_partials(
+    df, dataset_version, filter_cache, current_state, st.session_state.get('filter_state'), filter_expression
+)
+st.session_state['filter_state'] = current_state
+# Pages that follow the sidebar cohort recompile the expression; the widget's own state is dropped on other pages
+st.session_state['cohort_expression'] = filter_text if filter_expression is not None else ''
+df_filtered = cohort_frame(df, filter_cache, cache_key, selected_country, selected_exp, selected_role, filter_expression)
+salary_col, currency_col = select_salary_columns(df_filtered.columns)
+
+# The role, language and salary sections don't depend on each other, so compute them side by side
+section_tasks = dashboard_tasks(df, df_filtered, dataset_version, cohort_positions(df, df_filtered), salary_col, currency_col)
+pending_sections = [name for name in section_tasks if not filter_cache.contains(cache_key, name)]
+section_futures = submit_concurrently({
+    name: (lambda name=name, task=task: filter_cache.get_or_compute(cache_key, name, timed_section(name, task, len(df_filtered))))
+    for name, task in section_tasks.items()
+})
+
+# Large uncached cohorts paint from the stratified sample first and rerun once the exact sections are in;
+# the rerun itself never previews again, even if the exact sections were evicted in between
+exact_rerun = st.session_state.pop('preview_rerun', None) == (cache_key, 'exact')
+preview = PREVIEW_ENABLED and bool(pending_sections) and len(df_filtered) >= PREVIEW_MIN_ROWS and not exact_rerun
+margins = {}
+if preview:
+    df_sample = load_stratified_sample(df, dataset_version)
+    preview_version = sample_version(dataset_version)
+    # Answers validated against the full dataset may be missing from the sample, so don't re-check them
+    sample_expression = compile_filter(df_sample, preview_version, filter_expression.node, validate=False) if filter_expression else None
+    sample_key = filter_key(preview_version, selected_country, selected_exp, selected_role, sample_expression)
+    df_sample_filtered = cohort_frame(df_sample, filter_cache, sample_key, selected_country, selected_exp, selected_role, sample_expression)
+    sections = preview_sections(
+        df_sample, df_sample_filtered, preview_version, filter_cache, sample_key,
+        salary_col, currency_col, len(df_filtered)
+    )
+else:
+    sections = {name: future.result() for name, future in section_futures.items()}
+kpis = sections['kpis']
+
+salaries = sections['salary']['salaries'] if 'salary' in sections else pd.Series(dtype='float64')
+salary_median = salaries.median() if len(salaries) > 0 else None
+if preview:
+    margins = preview_margins(kpis, df_sample_filtered, len(df_filtered))
+
+def with_margin(text, name):
+    """Append the preview's margin of error to a formatted value"""
+    margin = margins.get(name)
+    if margin is None or pd.isna(margin):
+        return text
+    unit = '%' if name.endswith('percentage') else ''
+    return f'{text}<span style="font-size: 0.5em; color: #9CA3AF;"> ±{margin:.1f}{unit}</span>'
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📊 Active Filters")
 st.sidebar.markdown(f'<div class="filter-pill">{selected_role}</div>', unsafe_allow_html=True)
 st.sidebar.markdown(f'<div class="filter-pill">{selected_country}</div>', unsafe_allow_html=True)
 st.sidebar.markdown(f'<div class="filter-pill">{selected_exp}</div>', unsafe_allow_html=True)
+if filter_expression:
+    st.sidebar.markdown(f'<div class="filter-pill">{html.escape(str(filter_expression))}</div>', unsafe_allow_html=True)
 st.sidebar.markdown(f'<div style="margin-top: 1rem; color: #9CA3AF; font-size: 0.9rem;">Responses: <strong>{format_number(len(df_filtered))}</strong></div>', unsafe_allow_html=True)
 
 col_logo, col_title = st.columns([1, 6])
@@ -598,6 +377,9 @@ with col_title:
 
 st.markdown("<div style='height: 3rem;'></div>", unsafe_allow_html=True)
 
+if preview:
+    st.info(f"⏳ Preview from a stratified sample of {format_number(len(df_sample_filtered))} responses (± 95% margins). Exact figures are loading...")
+
 # Row 1: Key Metrics
 st.markdown("### 📈 Global Overview")
 col1, col2, col3, col4 = st.columns(4)
@@ -608,18 +390,17 @@ with col1:
     st.markdown(f'<div class="metric-value">{format_number(len(df_filtered))}</div>', unsafe_allow_html=True)
     
     # Country count
-    if 'Country' in df_filtered.columns:
-        country_count = df_filtered['Country'].nunique()
-        st.markdown(f'<div style="color: #9CA3AF; font-size: 0.9rem;">Across {country_count} countries</div>', unsafe_allow_html=True)
+    if kpis.countries is not None:
+        st.markdown(f'<div style="color: #9CA3AF; font-size: 0.9rem;">Across {kpis.countries} countries</div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 with col2:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
     st.markdown('<div class="metric-title">Avg Experience</div>', unsafe_allow_html=True)
     if 'YearsCodeNum' in df_filtered.columns:
-        avg_exp = df_filtered['YearsCodeNum'].mean()
-        if pd.notna(avg_exp):
-            st.markdown(f'<div class="metric-value">{avg_exp:.1f} years</div>', unsafe_allow_html=True)
+        avg_exp = kpis.avg_experience
+        if avg_exp is not None:
+            st.markdown(f'<div class="metric-value">{with_margin(f"{avg_exp:.1f} years", "avg_experience")}</div>', unsafe_allow_html=True)
             
             # Experience distribution indicator
             if avg_exp > 10:
@@ -642,10 +423,9 @@ with col2:
 with col3:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
     st.markdown('<div class="metric-title">AI Adoption Rate</div>', unsafe_allow_html=True)
-    if 'AISelect' in df_filtered.columns:
-        ai_users = df_filtered['AISelect'].astype(str).str.contains('Yes', case=False, na=False).sum()
-        ai_percentage = (ai_users / len(df_filtered)) * 100 if len(df_filtered) > 0 else 0
-        st.markdown(f'<div class="metric-value">{ai_percentage:.1f}%</div>', unsafe_allow_html=True)
+    ai_percentage = kpis.ai_percentage
+    if ai_percentage is not None:
+        st.markdown(f'<div class="metric-value">{with_margin(f"{ai_percentage:.1f}%", "ai_percentage")}</div>', unsafe_allow_html=True)
         
         # Trend indicator
         if ai_percentage > 50:
@@ -663,16 +443,11 @@ with col3:
 with col4:
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
     st.markdown('<div class="metric-title">Remote Work %</div>', unsafe_allow_html=True)
-    if 'RemoteWork' in df_filtered.columns:
-        remote_count = df_filtered['RemoteWork'].astype(str).str.contains('Remote', case=False, na=False).sum()
-        remote_percentage = (remote_count / len(df_filtered)) * 100 if len(df_filtered) > 0 else 0
-        st.markdown(f'<div class="metric-value">{remote_percentage:.1f}%</div>', unsafe_allow_html=True)
+    if kpis.remote_percentage is not None:
+        st.markdown(f'<div class="metric-value">{with_margin(f"{kpis.remote_percentage:.1f}%", "remote_percentage")}</div>', unsafe_allow_html=True)
         
         # Additional stats
-        hybrid_count = df_filtered['RemoteWork'].astype(str).str.contains('Hybrid', case=False, na=False).sum()
-        hybrid_percentage = (hybrid_count / len(df_filtered)) * 100 if len(df_filtered) > 0 else 0
-        
-        st.markdown(f'<div style="color: #9CA3AF; font-size: 0.9rem;">Hybrid: {hybrid_percentage:.1f}%</div>', unsafe_allow_html=True)
+        st.markdown(f'<div style="color: #9CA3AF; font-size: 0.9rem;">Hybrid: {kpis.hybrid_percentage:.1f}%</div>', unsafe_allow_html=True)
     else:
         st.markdown('<div class="metric-value">N/A</div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
@@ -687,11 +462,7 @@ with col1:
     st.markdown("##### 🎯 Top Developer Roles")
     
     if 'DevType' in df_filtered.columns:
-        roles = df_filtered['DevType'].dropna().astype(str).str.split(';').explode()
-        roles = roles.str.strip()
-        # Filter out irrelevant roles
-        roles = roles[~roles.str.contains('Other', case=False, na=False)]
-        role_counts = roles.value_counts().head(8)
+        role_counts = sections['role_counts']
         
         # Display as pills
         role_html = ""
@@ -704,16 +475,10 @@ with col1:
         # Detailed breakdown in expander
         with st.expander("View Detailed Role Analysis"):
             if len(role_counts) > 0:
-                fig_roles = px.bar(
-                    x=role_counts.values,
-                    y=role_counts.index,
-                    orientation='h',
-                    title="Developer Role Distribution",
-                    labels={'x': 'Count', 'y': 'Role'},
-                    color=role_counts.values,
-                    color_continuous_scale='oranges'
+                fig_roles = bar_chart(
+                    role_counts.values, role_counts.index, "Developer Role Distribution", 'Count', 'Role',
+                    orientation='h', colorscale='oranges', sort=False
                 )
-                fig_roles.update_layout(height=400)
                 st.plotly_chart(fig_roles, use_container_width=True)
     else:
         st.info("Role data not available")
@@ -722,7 +487,8 @@ with col2:
     st.markdown("##### 💻 Top Programming Languages")
     
     if 'LanguageHaveWorkedWith' in df_filtered.columns:
-        language_counts = clean_language_data(df_filtered['LanguageHaveWorkedWith']).head(10)
+        language_ranks = sections['language_ranks']
+        language_counts = language_ranks['have_count'].head(10) if not language_ranks.empty else pd.Series(dtype='int64')
         
         # Display as pills
         lang_html = ""
@@ -733,15 +499,7 @@ with col2:
         st.markdown(lang_html, unsafe_allow_html=True)
         
         if 'LanguageWantToWorkWith' in df_filtered.columns:
-            wanted_langs = clean_language_data(df_filtered['LanguageWantToWorkWith'])
-            
-            trending_langs = []
-            for lang in wanted_langs.head(10).index:
-                if lang in language_counts.index:
-                    have_rank = list(language_counts.index).index(lang) + 1
-                    want_rank = list(wanted_langs.index).index(lang) + 1
-                    if want_rank < have_rank:  # Higher in wanted list
-                        trending_langs.append(lang)
+            trending_langs = trending_technologies(language_ranks).index.tolist()
             
             if trending_langs:
                 st.markdown("##### 📈 Trending Languages")
@@ -754,43 +512,46 @@ st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 st.markdown('<div class="sub-header">💰 Global Salary Analysis (Converted to USD)</div>', unsafe_allow_html=True)
 
-salary_col = None
-currency_col = None
+def salary_error(group_df):
+    """Upper and lower error bar lengths from the bootstrap confidence intervals"""
+    return (
+        group_df['CI High'] - group_df['Avg Salary (USD)'],
+        group_df['Avg Salary (USD)'] - group_df['CI Low'],
+    )
+
+def salary_hover(group_df):
+    """Response count and confidence interval lines for a salary bar's hover label"""
+    return {
+        'Count': (group_df['Count'], ''),
+        'CI Low': (group_df['CI Low'], ',.0f'),
+        'CI High': (group_df['CI High'], ',.0f'),
+    }
 
-if 'CompTotal' in df_filtered.columns and 'Currency' in df_filtered.columns:
-    salary_col = 'CompTotal'
-    currency_col = 'Currency'
-elif 'ConvertedCompYearly' in df_filtered.columns:
-    salary_col = 'ConvertedCompYearly'
-elif 'Compensation' in df_filtered.columns:
-    salary_col = 'Compensation'
+def salary_interval(stat):
+    """95% confidence interval line for a salary stat box"""
+    intervals = salary_stats['intervals']
+    if intervals.empty:
+        return "USD per year"
+    low, high = intervals[f'{stat}_low'].iloc[0], intervals[f'{stat}_high'].iloc[0]
+    return f"95% CI {format_currency(low)} – {format_currency(high)}"
 
 if salary_col:
+    # Salaries are converted to USD and trimmed per country once per dataset version
+    salary_stats = sections['salary']
+    usd_salary_series = salaries
+
     if currency_col and salary_col == 'CompTotal':
-        
-        # Convert all salaries to USD
-        df_usd = convert_all_salaries_to_usd(df_filtered, salary_col, currency_col)
-        usd_salary_series = df_usd['Salary_USD']
-        
-        if 'Currency_Code' in df_usd.columns:
+        if len(salary_stats['currencies']) > 0:
             
-            top_currencies = df_usd['Currency_Code'].value_counts().head(10)
+            top_currencies = salary_stats['currencies']
             
             with st.expander("🌍 View Currency Distribution"):
-                fig_currency = px.bar(
-                    x=top_currencies.values,
-                    y=top_currencies.index,
-                    orientation='h',
-                    title="Top 10 Currencies in Dataset",
-                    labels={'x': 'Number of Responses', 'y': 'Currency Code'},
-                    color_discrete_sequence=['#10B981']
+                fig_currency = bar_chart(
+                    top_currencies.values, top_currencies.index, "Top 10 Currencies in Dataset",
+                    'Number of Responses', 'Currency Code', orientation='h', color='#10B981', height=300,
+                    sort=False
                 )
-                fig_currency.update_layout(height=300)
                 st.plotly_chart(fig_currency, use_container_width=True)
-    else:
-        usd_salary_series = df_filtered[salary_col].apply(clean_salary_value)
-        usd_salary_series = usd_salary_series.dropna()
-        df_usd = pd.DataFrame({'Salary_USD': usd_salary_series})
     
     if len(usd_salary_series) > 0:        
         # Salary metrics
@@ -801,15 +562,15 @@ if salary_col:
             st.markdown('<div class="stat-box">', unsafe_allow_html=True)
             st.markdown('<div style="font-size: 0.9rem; color: #9CA3AF;">Average Salary</div>', unsafe_allow_html=True)
             st.markdown(f'<div style="font-size: 1.8rem; font-weight: 700; color: white;">{format_currency(avg_salary)}</div>', unsafe_allow_html=True)
-            st.markdown(f'<div style="font-size: 0.8rem; color: #6B7280;">USD per year</div>', unsafe_allow_html=True)
+            st.markdown(f'<div style="font-size: 0.8rem; color: #6B7280;">{salary_interval("mean")}</div>', unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col_s2:
-            median_salary = usd_salary_series.median()
+            median_salary = salary_median
             st.markdown('<div class="stat-box">', unsafe_allow_html=True)
             st.markdown('<div style="font-size: 0.9rem; color: #9CA3AF;">Median Salary</div>', unsafe_allow_html=True)
             st.markdown(f'<div style="font-size: 1.8rem; font-weight: 700; color: white;">{format_currency(median_salary)}</div>', unsafe_allow_html=True)
-            st.markdown(f'<div style="font-size: 0.8rem; color: #6B7280;">USD per year</div>', unsafe_allow_html=True)
+            st.markdown(f'<div style="font-size: 0.8rem; color: #6B7280;">{salary_interval("median")}</div>', unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col_s3:
@@ -829,35 +590,17 @@ if salary_col:
             st.markdown('</div>', unsafe_allow_html=True)
         
         # Salary distribution chart
-        fig_salary = px.histogram(
-            x=usd_salary_series,
-            nbins=30,
-            title="Salary Distribution (Converted to USD)",
-            labels={'x': 'Annual Salary (USD)', 'y': 'Number of Developers'},
-            color_discrete_sequence=['#F48024']
-        )
-        
-        fig_salary.update_layout(
-            height=400,
-            showlegend=False,
-            xaxis_title="Annual Salary (USD)",
-            yaxis_title="Number of Developers",
-            bargap=0.1
-        )
-        
-        fig_salary.add_vline(
-            x=avg_salary,
-            line_dash="dash",
-            line_color="red",
-            annotation_text=f"Mean: {format_currency(avg_salary)}",
-            annotation_position="top right"
-        )
-        fig_salary.add_vline(
-            x=median_salary,
-            line_dash="dash",
-            line_color="green",
-            annotation_text=f"Median: {format_currency(median_salary)}",
-            annotation_position="top left"
+        # Binned here, so only 30 bars rather than every salary are sent to the browser
+        fig_salary = histogram_chart(
+            usd_salary_series,
+            "Salary Distribution (Converted to USD)",
+            'Annual Salary (USD)',
+            'Number of Developers',
+            vlines=[
+                (avg_salary, "red", f"Mean: {format_currency(avg_salary)}", "top right"),
+                (median_salary, "green", f"Median: {format_currency(median_salary)}", "top left")
+            ],
+            height=400
         )
         
         st.plotly_chart(fig_salary, use_container_width=True)
@@ -865,81 +608,30 @@ if salary_col:
         tab1, tab2 = st.tabs(["📊 Salary by Role", "🌍 Salary by Country"])
         
         with tab1:
-            if 'DevType' in df_usd.columns:
-                role_salary_data = []
-                roles = df_usd['DevType'].dropna().astype(str).str.split(';').explode()
-                top_roles = roles.value_counts().head(15).index
-                
-                for role in top_roles:
-                    role_mask = df_usd['DevType'].astype(str).str.contains(role, na=False, regex=False)
-                    role_salaries = df_usd[role_mask]['Salary_USD']
-                    
-                    if len(role_salaries) > 5:
-                        avg_salary_role = role_salaries.mean()
-                        role_salary_data.append({
-                            'Role': role[:30] + ('...' if len(role) > 30 else ''),
-                            'Avg Salary (USD)': avg_salary_role,
-                            'Count': len(role_salaries)
-                        })
-                
-                if role_salary_data:
-                    role_df = pd.DataFrame(role_salary_data).sort_values('Avg Salary (USD)', ascending=False)
-                    
-                    fig_role_salary = px.bar(
-                        role_df.head(10),
-                        x='Avg Salary (USD)',
-                        y='Role',
-                        orientation='h',
-                        title="Average Salary by Role (USD, Top 10)",
-                        color='Avg Salary (USD)',
-                        color_continuous_scale='viridis',
-                        labels={'Avg Salary (USD)': 'Average Salary (USD)', 'Role': ''}
-                    )
-                    fig_role_salary.update_layout(
-                        height=400,
-                        xaxis_title="Average Salary (USD)",
-                        yaxis={'categoryorder': 'category ascending'}
-                    )
-                    st.plotly_chart(fig_role_salary, use_container_width=True)
+            role_df = salary_stats['by_role']
+            if len(role_df) > 0:
+                top_roles = role_df.head(10)
+                fig_role_salary = bar_chart(
+                    top_roles['Avg Salary (USD)'], top_roles['Role'], "Average Salary by Role (USD, Top 10)",
+                    'Average Salary (USD)', '', orientation='h', colorscale='viridis',
+                    error=salary_error(top_roles), hover=salary_hover(top_roles),
+                    yaxis={'categoryorder': 'category ascending'}
+                )
+                st.plotly_chart(fig_role_salary, use_container_width=True)
         
         with tab2:
-            if 'Country' in df_usd.columns:
-                country_salary_data = []
-                country_groups = df_usd.groupby('Country')
-                
-                for country, group in country_groups:
-                    country_salaries = group['Salary_USD']
-                    
-                    if len(country_salaries) >= 3:  # At least 3 responses
-                        avg_salary_country = country_salaries.mean()
-                        country_salary_data.append({
-                            'Country': country,
-                            'Avg Salary (USD)': avg_salary_country,
-                            'Count': len(country_salaries)
-                        })
+            country_df = salary_stats['by_country']
+            if len(country_df) > 0:
+                # Top 10 countries
+                top_countries = country_df.head(10)
                 
-                if country_salary_data:
-                    country_df = pd.DataFrame(country_salary_data).sort_values('Avg Salary (USD)', ascending=False)
-                    
-                    # Top 10 countries
-                    top_countries = country_df.head(10)
-                    
-                    fig_country = px.bar(
-                        top_countries,
-                        x='Avg Salary (USD)',
-                        y='Country',
-                        orientation='h',
-                        title="Top 10 Countries by Average Salary (USD)",
-                        color='Avg Salary (USD)',
-                        color_continuous_scale='plasma',
-                        labels={'Avg Salary (USD)': 'Average Salary (USD)', 'Country': ''}
-                    )
-                    fig_country.update_layout(
-                        height=400,
-                        xaxis_title="Average Salary (USD)",
-                        yaxis={'categoryorder': 'category ascending'}
-                    )
-                    st.plotly_chart(fig_country, use_container_width=True)
+                fig_country = bar_chart(
+                    top_countries['Avg Salary (USD)'], top_countries['Country'], "Top 10 Countries by Average Salary (USD)",
+                    'Average Salary (USD)', '', orientation='h', colorscale='plasma',
+                    error=salary_error(top_countries), hover=salary_hover(top_countries),
+                    yaxis={'categoryorder': 'category ascending'}
+                )
+                st.plotly_chart(fig_country, use_container_width=True)
                     
                     
     else:
@@ -974,9 +666,8 @@ with col_i1:
         country_count_filtered = len(df_filtered)
         insights.append(f"• {country_count_filtered} responses from {selected_country}")
     
-    if 'YearsCodeNum' in df_filtered.columns:
-        avg_exp_filtered = df_filtered['YearsCodeNum'].mean()
-        insights.append(f"• {avg_exp_filtered:.1f} years average experience")
+    if kpis.avg_experience is not None:
+        insights.append(f"• {kpis.avg_experience:.1f} years average experience")
     
     if 'DevType' in df_filtered.columns and selected_role != 'All Roles':
         role_count = len(df_filtered)
@@ -993,24 +684,17 @@ with col_i2:
     
     trends = []
     
-    if 'AISelect' in df_filtered.columns:
-        ai_users = df_filtered['AISelect'].astype(str).str.contains('Yes', case=False, na=False).sum()
-        ai_percentage = (ai_users / len(df_filtered)) * 100 if len(df_filtered) > 0 else 0
-        trends.append(f"• AI adoption: {ai_percentage:.1f}%")
+    if kpis.ai_percentage is not None:
+        trends.append(f"• AI adoption: {kpis.ai_percentage:.1f}%")
     
-    if 'RemoteWork' in df_filtered.columns:
-        remote_percentage = (df_filtered['RemoteWork'].astype(str).str.contains('Remote', case=False, na=False).sum() / len(df_filtered)) * 100 if len(df_filtered) > 0 else 0
-        trends.append(f"• Remote work: {remote_percentage:.1f}%")
+    if kpis.remote_percentage is not None:
+        trends.append(f"• Remote work: {kpis.remote_percentage:.1f}%")
     
-    if 'usd_salary_series' in locals() and len(usd_salary_series) > 0:
-        salary_median = usd_salary_series.median()
+    if salary_median is not None:
         trends.append(f"• Median salary: {format_currency(salary_median)}")
     
-    if 'LanguageHaveWorkedWith' in df_filtered.columns:
-        top_lang = clean_language_data(df_filtered['LanguageHaveWorkedWith'])
-        if not top_lang.empty:
-            top_lang_name = top_lang.index[0]
-            trends.append(f"• Top language: {top_lang_name}")
+    if kpis.top_language is not None:
+        trends.append(f"• Top language: {kpis.top_language}")
     
     for trend in trends[:4]:  # Limit to 4 trends
         st.markdown(f'<div style="color: #E5E7EB; margin: 0.5rem 0;">{trend}</div>', unsafe_allow_html=True)
@@ -1023,13 +707,11 @@ with col_i3:
     
     recommendations = []
     
-    if 'AISelect' in df_filtered.columns:
-        ai_percentage = (df_filtered['AISelect'].astype(str).str.contains('Yes', case=False, na=False).sum() / len(df_filtered)) * 100 if len(df_filtered) > 0 else 0
-        if ai_percentage < 50:
+    if kpis.ai_percentage is not None:
+        if kpis.ai_percentage < 50:
             recommendations.append("• Consider AI skill development")
     
-    if 'usd_salary_series' in locals() and len(usd_salary_series) > 0:
-        salary_median = usd_salary_series.median()
+    if salary_median is not None:
         if salary_median < 50000:
             recommendations.append("• Entry-level market opportunity")
         elif salary_median > 150000:
@@ -1037,8 +719,8 @@ with col_i3:
         else:
             recommendations.append("• Competitive market segment")
     
-    if 'YearsCodeNum' in df_filtered.columns:
-        avg_exp = df_filtered['YearsCodeNum'].mean()
+    if kpis.avg_experience is not None:
+        avg_exp = kpis.avg_experience
         if avg_exp < 3:
             recommendations.append("• Focus on foundational skills")
         elif avg_exp < 7:
@@ -1062,10 +744,7 @@ with col_i3:
 # Footer
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
-avg_exp_value = None
-if 'YearsCodeNum' in df_filtered.columns:
-    avg_exp_value = df_filtered['YearsCodeNum'].mean()
-avg_exp_text = f"{avg_exp_value:.1f}" if avg_exp_value is not None and pd.notna(avg_exp_value) else "N/A"
+avg_exp_text = f"{kpis.avg_experience:.1f}" if kpis.avg_experience is not None else "N/A"
 
 st.markdown(f"""
 <div style="text-align: center; color: #6B7280; padding: 2rem 1rem; font-size: 0.9rem;">
@@ -1073,12 +752,62 @@ st.markdown(f"""
     <p>Data Source: Stack Overflow • Last Updated: {datetime.now().strftime("%Y-%m-%d %H:%M")}</p>
     <p style="margin-top: 0.5rem; font-size: 0.8rem; color: #4B5563;">
         Filtered Data: {format_number(len(df_filtered))} responses • 
-        {df_filtered['Country'].nunique() if 'Country' in df_filtered.columns else 'N/A'} countries • 
+        {kpis.countries if kpis.countries is not None else 'N/A'} countries • 
         {avg_exp_text} years avg experience
     </p>
 </div>
 """, unsafe_allow_html=True)
 
+# Export section
+with st.expander("📥 Export Data"):
+    export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key='export_format')
+    export_mime = EXPORT_FORMATS[export_format]['mime']
+    export_extension = EXPORT_FORMATS[export_format]['extension']
+
+    st.write("### Filtered Responses")
+    export_default = [col for col in ['Country', 'YearsCodeNum', 'DevType', 'RemoteWork', salary_col] if col in df.columns]
+    export_columns = st.multiselect("Columns", df.columns.tolist(), default=export_default, key='export_columns')
+    export_parts = (*cache_key, tuple(export_columns), export_format)
+
+    # Rows are encoded chunk by chunk to disk, so only the compressed file is ever held for the download
+    if len(df_filtered) == 0:
+        st.caption("No responses match the current filters")
+    elif export_columns and st.button(f"Prepare {format_number(len(df_filtered))} responses", key='export_prepare'):
+        with st.spinner("Writing export..."):
+            st.session_state['export_path'] = (export_parts, export_rows(df, cohort_positions(df, df_filtered), export_columns, export_format, export_parts))
+    prepared = st.session_state.get('export_path')
+    if prepared and prepared[0] == export_parts:
+        try:
+            with open(prepared[1], 'rb') as export_file:
+                st.download_button(
+                    "Download responses", export_file, file_name=f"survey_responses.{export_extension}",
+                    mime=export_mime, key='export_rows_download'
+                )
+        except FileNotFoundError:
+            # Pruned by another session since it was prepared
+            st.session_state.pop('export_path', None)
+
+    st.write("### Aggregates")
+    if preview:
+        st.caption("Aggregate exports are available once the exact figures have loaded")
+    else:
+        export_tables = {}
+        if 'role_counts' in sections:
+            export_tables['Role counts'] = sections['role_counts'].rename_axis('Role').reset_index(name='Count')
+        if 'language_ranks' in sections:
+            export_tables['Language ranks'] = sections['language_ranks'].rename_axis('Language').reset_index()
+        if 'salary' in sections:
+            export_tables['Salary by role'] = sections['salary']['by_role']
+            export_tables['Salary by country'] = sections['salary']['by_country']
+        export_tables = {name: table for name, table in export_tables.items() if not table.empty}
+
+        for name, table in export_tables.items():
+            st.download_button(
+                f"{name} ({len(table)} rows)", export_table(table, export_format),
+                file_name=f"{name.lower().replace(' ', '_')}.{export_extension}",
+                mime=export_mime, key=f"export_{name}"
+            )
+
 # Debug section
 with st.expander("🔧 Debug Information"):
     st.write("### Available Columns")
@@ -1102,5 +831,77 @@ with st.expander("🔧 Debug Information"):
         st.write("### Currency Distribution")
         st.write(df_filtered[currency_col].value_counts().head(10))
     
-    st.write("### Sample Data (First 5 rows)")
-    st.dataframe(df.head())
\ No newline at end of file
+    st.write("### Browse Responses")
+    browser_positions = cohort_positions(df, df_filtered)
+    default_columns = [col for col in ['Country', 'YearsCodeNum', 'DevType', 'RemoteWork', salary_col] if col in df.columns]
+    browser_columns = st.multiselect("Columns", df.columns.tolist(), default=default_columns, key='browser_columns')
+    
+    col_b1, col_b2, col_b3, col_b4 = st.columns(4)
+    with col_b1:
+        sort_column = st.selectbox("Sort by", ['(none)'] + df.columns.tolist(), key='browser_sort')
+    with col_b2:
+        sort_ascending = st.radio("Order", ['Ascending', 'Descending'], horizontal=True, key='browser_order') == 'Ascending'
+    with col_b3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key='browser_page_size')
+    with col_b4:
+        total_pages = page_count(len(browser_positions), page_size)
+        page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1, key='browser_page')
+    
+    sort_index = load_sort_index(df, dataset_version, sort_column) if sort_column != '(none)' else None
+    if browser_columns:
+        st.dataframe(browse_page(df, browser_positions, browser_columns, page, page_size, sort_index, sort_ascending))
+    st.caption(f"{format_number(len(browser_positions))} responses in the current filter")
+    
+    st.write("### Memory Footprint")
+    footprint_caches = {'Survey frame': df, 'Filter cache': filter_cache.bytes, 'Filter term masks': get_term_mask_cache().bytes}
+    for column in ['LanguageHaveWorkedWith', 'LanguageWantToWorkWith']:
+        if column in df.columns:
+            footprint_caches[f"{column} matrix"] = load_multiselect_matrix(df, dataset_version, column)
+    if salary_col == 'CompTotal' and currency_col:
+        footprint_caches['USD salaries'] = load_usd_salaries(df, dataset_version, salary_col, currency_col)
+    st.dataframe(cache_footprint(footprint_caches), use_container_width=True)
+    
+    if st.checkbox("Show per-column footprint", key='footprint_columns'):
+        st.dataframe(frame_footprint(df), use_container_width=True)
+    
+    st.write("### Filter Cache")
+    cache_stats = filter_cache.stats()
+    st.write(
+        f"{cache_stats['entries']} filter states • {cache_stats['bytes'] / 1024 / 1024:.1f} / "
+        f"{cache_stats['max_bytes'] / 1024 / 1024:.0f} MB • hits {cache_stats['hits']} • misses {cache_stats['misses']} • "
+        f"evictions {cache_stats['evictions']} • hit rate {cache_stats['hit_rate']:.0%}"
+    )
+    if partials_dimension:
+        st.write(f"Sections read from the cached {partials_dimension} partials")
+
+    st.markdown("**Cache Warm-up**")
+    if warmup is None:
+        st.write("Disabled")
+    else:
+        warmup_progress = warmup.progress()
+        st.progress(warmup_progress['fraction'])
+        st.write(
+            f"{warmup_progress['status']} • {warmup_progress['completed']} warmed, {warmup_progress['skipped']} skipped "
+            f"of {warmup_progress['total']} filter states • "
+            f"{warmup_progress['elapsed_seconds']:.1f}s"
+        )
+        if warmup_progress['error']:
+            st.write(f"Error: {warmup_progress['error']}")
+
+    st.markdown("**Metrics Endpoint**")
+    if start_metrics_server() is None:
+        st.write("Disabled, or the port is taken")
+    else:
+        st.write(f"Prometheus text format at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+# Swap the preview for exact figures: wait for the full computation, then rerun from the filter cache
+if preview:
+    failed = [name for name, future in section_futures.items() if future.exception() is not None]
+    if failed:
+        st.error(f"Exact figures couldn't be computed ({', '.join(failed)}); the estimates above are from a sample.")
+    else:
+        st.session_state['preview_rerun'] = (cache_key, 'exact')
+        finish_rerun(rerun)
+        st.rerun()
+
+finish_rerun(rerun)
@@ -1,48 +1,69 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_data, preprocess_data
+import numpy as np
+from utils.data_loader import load_survey, get_dataset_version
+from utils.ai_metrics import compute_ai_metrics
+from utils.filter_cache import get_filter_cache
+from utils.aggregates import sidebar_cohort
+from utils.partials import filter_state
+from utils.text_search import find_text_columns, load_text_index, cohort_documents, search_text, top_terms, paginate, SEARCH_MODES
 from utils.visualizations import (
     plot_ai_adoption_by_experience,
     plot_ai_sentiment,
     plot_ai_agent_impact,
     plot_ai_workflow_integration
 )
+from utils.metrics import start_rerun, finish_rerun
 
 st.set_page_config(page_title="AI Trends", page_icon="🤖")
+rerun = start_rerun('ai_trends')
 
 st.title("🤖 AI in Development")
 st.markdown("---")
 
 # Load data
-df_raw = load_data()
-df = preprocess_data(df_raw)
+df = load_survey()
 
 if df.empty:
     st.error("No data available")
     st.stop()
 
+dataset_version = get_dataset_version()
+
+# The page follows the Dashboard's sidebar cohort; metrics are shared across sessions per filter state.
+# The Dashboard's AI adoption share comes from its KPI kernel, built on the same AI encoding
+cohort_key, cohort, cohort_caption = sidebar_cohort(
+    df, dataset_version, get_filter_cache(),
+    st.session_state.get('filter_state') or filter_state(), st.session_state.get('cohort_expression', '')
+)
+st.caption(cohort_caption)
+ai_metrics = get_filter_cache().get_or_compute(
+    cohort_key, 'ai_metrics', lambda: compute_ai_metrics(df, dataset_version, cohort)
+)
+
 # AI Adoption Overview
 st.header("📈 AI Adoption Trends")
 col1, col2 = st.columns(2)
 
 with col1:
     # AI usage metric
-    ai_users = df['AISelect'].str.contains('Yes').sum()
-    ai_percentage = (ai_users / len(df)) * 100
-    st.metric("Developers Using AI Tools", f"{ai_percentage:.1f}%")
+    if ai_metrics['ai_percentage'] is not None:
+        st.metric("Developers Using AI Tools", f"{ai_metrics['ai_percentage']:.1f}%")
 
 with col2:
     # AI agent usage
-    agent_users = df['AIAgents'].str.contains('Yes').sum()
-    agent_percentage = (agent_users / len(df)) * 100
-    st.metric("Using AI Agents", f"{agent_percentage:.1f}%")
+    if ai_metrics['agent_percentage'] is not None:
+        st.metric("Using AI Agents", f"{ai_metrics['agent_percentage']:.1f}%")
 
 st.markdown("---")
 
 # Experience vs AI Usage
 st.header("🎯 AI Adoption by Experience Level")
-fig1 = plot_ai_adoption_by_experience(df)
-st.plotly_chart(fig1, use_container_width=True)
+fig1 = plot_ai_adoption_by_experience(ai_metrics)
+if fig1:
+    st.plotly_chart(fig1, use_container_width=True)
+else:
+    st.info("AI adoption data not available")
 
 col1, col2 = st.columns(2)
 with col1:
@@ -55,16 +76,18 @@ with col1:
 
 with col2:
     # Trust metrics
-    high_trust = df['AIAcc'].str.contains('Highly trust|Somewhat trust').sum()
-    trust_percentage = (high_trust / len(df)) * 100
-    st.metric("Trust AI Accuracy", f"{trust_percentage:.1f}%")
+    if ai_metrics['trust_percentage'] is not None:
+        st.metric("Trust AI Accuracy", f"{ai_metrics['trust_percentage']:.1f}%")
 
 st.markdown("---")
 
 # AI Sentiment
 st.header("😊 Developer Sentiment")
-fig2 = plot_ai_sentiment(df)
-st.plotly_chart(fig2, use_container_width=True)
+fig2 = plot_ai_sentiment(ai_metrics)
+if fig2:
+    st.plotly_chart(fig2, use_container_width=True)
+else:
+    st.info("AI sentiment data not available")
 
 st.markdown("""
 **Sentiment Analysis:**
@@ -77,7 +100,7 @@ st.markdown("---")
 
 # AI Workflow Integration
 st.header("⚙️ AI in Development Workflow")
-fig3 = plot_ai_workflow_integration(df)
+fig3 = plot_ai_workflow_integration(ai_metrics)
 if fig3:
     st.plotly_chart(fig3, use_container_width=True)
 else:
@@ -94,7 +117,7 @@ st.markdown("---")
 
 # AI Agent Impact
 st.header("🚀 AI Agent Impact")
-fig4 = plot_ai_agent_impact(df)
+fig4 = plot_ai_agent_impact(ai_metrics)
 if fig4:
     st.plotly_chart(fig4, use_container_width=True)
     
@@ -113,13 +136,39 @@ st.markdown("---")
 st.header("🔮 Future Skills")
 st.markdown("### What skills remain valuable with AI advancement?")
 
-if 'AIOpen' in df.columns:
-    # Sample some responses
-    ai_responses = df['AIOpen'].dropna().head(10).tolist()
+text_columns = find_text_columns(df.columns)
+
+if text_columns:
+    text_column = st.selectbox("Free-text question", text_columns) if len(text_columns) > 1 else text_columns[0]
+    text_index = load_text_index(df, dataset_version, text_column)
+    documents = cohort_documents(text_index, cohort)
+    st.caption(f"Searching {len(documents):,} answers from the sidebar cohort: {cohort_caption}")
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        query = st.text_input("Search developer responses", placeholder="e.g. system design")
+        mode = st.radio("Search mode", SEARCH_MODES, horizontal=True, help="Ranked: TF-IDF relevance. Keyword: every word must appear.")
     
-    with st.expander("View Developer Responses"):
-        for i, response in enumerate(ai_responses, 1):
-            if response and len(response) > 10:  # Filter very short responses
-                st.markdown(f"{i}. {response}")
+    with col2:
+        terms = top_terms(text_index, cohort, n=15)
+        if len(terms) > 0:
+            st.markdown("**Most distinctive terms**")
+            st.bar_chart(terms)
+    
+    if query:
+        documents, scores = search_text(text_index, query, mode, cohort)
+        st.caption(f"{len(documents)} matching responses")
+        
+        if len(documents) > 0:
+            page_size = 10
+            page_count = (len(documents) - 1) // page_size + 1
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+            st.dataframe(paginate(text_index, documents, scores, page, page_size), use_container_width=True)
+    else:
+        with st.expander("View Developer Responses"):
+            st.dataframe(paginate(text_index, documents, np.ones(len(documents)), 1, 10)[['Response']], use_container_width=True)
 else:
-    st.info("Future skills data not available in this dataset")
\ No newline at end of file
+    st.info("Future skills data not available in this dataset")
+
+finish_rerun(rerun)
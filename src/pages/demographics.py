@@ -1,21 +1,27 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_data, preprocess_data
+from utils.data_loader import load_survey, get_dataset_version
+from utils.aggregates import sidebar_cohort
+from utils.crosstab import compute_crosstab, normalize_crosstab, NORMALIZATIONS
+from utils.filter_cache import get_filter_cache
+from utils.partials import filter_state
 from utils.visualizations import (
     plot_country_distribution, 
     plot_age_distribution,
     plot_experience_distribution,
-    plot_education_distribution
+    plot_education_distribution,
+    plot_crosstab_heatmap
 )
+from utils.metrics import start_rerun, finish_rerun
 
 st.set_page_config(page_title="Demographics", page_icon="📊")
+rerun = start_rerun('demographics')
 
 st.title("👥 Developer Demographics")
 st.markdown("---")
 
 # Load data
-df_raw = load_data()
-df = preprocess_data(df_raw)
+df = load_survey()
 
 if df.empty:
     st.error("No data available")
@@ -95,4 +101,29 @@ with col2:
     # Additional metric
     bachelors_plus = df['EdLevel'].str.contains("Bachelor|Master|Professional").sum()
     percentage = (bachelors_plus / len(df)) * 100
-    st.metric("Developers with Bachelor's+", f"{percentage:.1f}%")
\ No newline at end of file
+    st.metric("Developers with Bachelor's+", f"{percentage:.1f}%")
+
+st.markdown("---")
+
+# Education by age, for the Dashboard's sidebar cohort
+st.header("Education by Age")
+dataset_version = get_dataset_version()
+cohort_key, cohort, cohort_caption = sidebar_cohort(
+    df, dataset_version, get_filter_cache(),
+    st.session_state.get('filter_state') or filter_state(), st.session_state.get('cohort_expression', '')
+)
+st.caption(cohort_caption)
+normalization = st.radio("Show", NORMALIZATIONS, index=1, horizontal=True, key="age_edu_normalization",
+                         help="Row: % of each age group. Column: % of each education level. Overall: % of all answers.")
+age_by_education = compute_crosstab(df, dataset_version, 'Age', 'EdLevel', cohort_key, cohort)
+fig5 = plot_crosstab_heatmap(
+    normalize_crosstab(age_by_education, normalization),
+    'Education Level by Age Group',
+    'developers' if normalization == 'count' else '%'
+)
+if fig5:
+    st.plotly_chart(fig5, use_container_width=True)
+else:
+    st.info("Age or education data not available")
+
+finish_rerun(rerun)
@@ -0,0 +1,88 @@
+import streamlit as st
+from utils.data_loader import load_survey, get_dataset_version
+from utils.cleaning import EXPERIENCE_BUCKETS
+from utils.salary import load_usd_salaries
+from utils.similarity import load_profile_index, find_similar_developers, summarize_neighbours
+from utils.metrics import start_rerun, finish_rerun
+
+st.set_page_config(page_title="Developers Like Me", page_icon="🧑‍🤝‍🧑")
+rerun = start_rerun('developers_like_me')
+
+st.title("🧑‍🤝‍🧑 Developers Like Me")
+st.markdown("---")
+
+# Load data
+df = load_survey()
+
+if df.empty:
+    st.error("No data available")
+    st.stop()
+
+dataset_version = get_dataset_version()
+index = load_profile_index(df, dataset_version)
+
+# Profile
+st.header("🧰 Your Profile")
+stack = st.multiselect(
+    "Your tech stack",
+    sorted(index['labels']),
+    help="Languages, databases, platforms and web frameworks you work with"
+)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    countries = ['Any Country'] + sorted(df['Country'].dropna().unique().tolist()) if 'Country' in df.columns else ['Any Country']
+    country = st.selectbox("Country", countries)
+with col2:
+    experience = st.selectbox("Experience", ['Any Experience'] + EXPERIENCE_BUCKETS)
+with col3:
+    k = st.slider("Similar developers", 10, 500, 100, step=10)
+
+if not stack:
+    st.info("Pick a few technologies to find developers with a similar stack")
+    st.stop()
+
+neighbours = find_similar_developers(
+    df, index, stack,
+    country=None if country == 'Any Country' else country,
+    experience=None if experience == 'Any Experience' else experience,
+    k=k
+)
+
+if neighbours.empty:
+    st.warning("No matching developers for these filters")
+    st.stop()
+
+salaries = None
+if 'CompTotal' in df.columns and 'Currency' in df.columns:
+    salaries = load_usd_salaries(df, dataset_version, 'CompTotal', 'Currency')['Salary_USD']
+
+summary = summarize_neighbours(neighbours, salaries)
+
+st.markdown("---")
+
+# Results
+st.header("📊 What They Look Like")
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Matched Developers", f"{summary['count']}")
+    st.metric("Avg Similarity", f"{neighbours['Similarity'].mean():.2f}")
+with col2:
+    if len(summary['salary']):
+        st.metric("Median Salary (USD)", f"${summary['salary'].loc[0.5]:,.0f}")
+        st.caption(f"IQR ${summary['salary'].loc[0.25]:,.0f} – ${summary['salary'].loc[0.75]:,.0f} from {summary['salary_count']} salaries")
+    else:
+        st.metric("Median Salary (USD)", "N/A")
+with col3:
+    if 'YearsCodeNum' in neighbours.columns:
+        st.metric("Avg Experience", f"{neighbours['YearsCodeNum'].mean():.1f} years")
+
+if len(summary['ai_usage']):
+    st.subheader("🤖 AI Tool Usage")
+    st.bar_chart(summary['ai_usage'].sort_values(ascending=False))
+
+with st.expander("View Matched Developers"):
+    columns = [col for col in ['Similarity', 'Country', 'YearsCodeNum', 'DevType', 'LanguageHaveWorkedWith', 'AISelect'] if col in neighbours.columns]
+    st.dataframe(neighbours[columns].head(50), use_container_width=True)
+
+finish_rerun(rerun)
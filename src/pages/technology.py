@@ -1,25 +1,43 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_data, preprocess_data
+from utils.data_loader import load_survey, get_dataset_version
+from utils.aggregates import sidebar_cohort
+from utils.filter_cache import get_filter_cache
+from utils.partials import filter_state
+from utils.tech_rankings import compute_all_tech_rankings, trending_technologies
+from utils.cooccurrence import compute_cooccurrence, top_pairs, NORMALIZATIONS
+from utils.crosstab import compute_crosstab, compute_category_counts, normalize_crosstab, share_matching
 from utils.visualizations import (
     plot_tech_usage,
     plot_have_vs_want,
-    plot_remote_work_by_orgsize
+    plot_remote_work_by_orgsize,
+    plot_cooccurrence_heatmap
 )
+from utils.metrics import start_rerun, finish_rerun
 
 st.set_page_config(page_title="Technology", page_icon="💻")
+rerun = start_rerun('technology')
 
 st.title("💻 Technology Stack Analysis")
 st.markdown("---")
 
 # Load data
-df_raw = load_data()
-df = preprocess_data(df_raw)
+df = load_survey()
 
 if df.empty:
     st.error("No data available")
     st.stop()
 
+dataset_version = get_dataset_version()
+rankings = compute_all_tech_rankings(df, dataset_version)
+
+def show_trend_pills(category):
+    """Show the technologies climbing from the used list to the wanted list"""
+    trending = trending_technologies(rankings.get(category, pd.DataFrame()))
+    if not trending.empty:
+        pills = " ".join(f"`↑ {tech} (+{delta})`" for tech, delta in trending['rank_delta'].head(5).items())
+        st.markdown(f"**Trending:** {pills}")
+
 # Programming Languages
 st.header("🚀 Programming Languages")
 col1, col2 = st.columns([3, 1])
@@ -48,8 +66,10 @@ st.header("🔄 Technology Adoption Trends")
 tab1, tab2, tab3, tab4 = st.tabs(["Languages", "Databases", "Platforms", "Frameworks"])
 
 with tab1:
-    fig2 = plot_have_vs_want(df, "Language", "Programming Languages")
-    st.plotly_chart(fig2, use_container_width=True)
+    fig2 = plot_have_vs_want(rankings.get("Language"), "Programming Languages")
+    if fig2:
+        st.plotly_chart(fig2, use_container_width=True)
+    show_trend_pills("Language")
     
     st.markdown("""
     **Language Adoption:**
@@ -59,8 +79,10 @@ with tab1:
     """)
 
 with tab2:
-    fig3 = plot_have_vs_want(df, "Database", "Databases")
-    st.plotly_chart(fig3, use_container_width=True)
+    fig3 = plot_have_vs_want(rankings.get("Database"), "Databases")
+    if fig3:
+        st.plotly_chart(fig3, use_container_width=True)
+    show_trend_pills("Database")
     
     st.markdown("""
     **Database Trends:**
@@ -70,8 +92,10 @@ with tab2:
     """)
 
 with tab3:
-    fig4 = plot_have_vs_want(df, "Platform", "Platforms")
-    st.plotly_chart(fig4, use_container_width=True)
+    fig4 = plot_have_vs_want(rankings.get("Platform"), "Platforms")
+    if fig4:
+        st.plotly_chart(fig4, use_container_width=True)
+    show_trend_pills("Platform")
     
     st.markdown("""
     **Platform Preferences:**
@@ -81,8 +105,10 @@ with tab3:
     """)
 
 with tab4:
-    fig5 = plot_have_vs_want(df, "Webframe", "Web Frameworks")
-    st.plotly_chart(fig5, use_container_width=True)
+    fig5 = plot_have_vs_want(rankings.get("Webframe"), "Web Frameworks")
+    if fig5:
+        st.plotly_chart(fig5, use_container_width=True)
+    show_trend_pills("Webframe")
     
     st.markdown("""
     **Framework Trends:**
@@ -93,27 +119,73 @@ with tab4:
 
 st.markdown("---")
 
+# Co-occurrence
+st.header("🔗 Technologies Used Together")
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    cooc_category = st.selectbox("Category", list(rankings.keys()), key="cooc_category")
+with col2:
+    cooc_measure = st.radio("Measure", NORMALIZATIONS, index=1, horizontal=True, key="cooc_measure")
+with col3:
+    cooc_top_n = st.slider("Technologies", 5, 30, 15, key="cooc_slider")
+
+# The heatmap and the work environment section follow the Dashboard's sidebar cohort, cached per filter state
+cohort_key, cohort, cohort_caption = sidebar_cohort(
+    df, dataset_version, get_filter_cache(),
+    st.session_state.get('filter_state') or filter_state(), st.session_state.get('cohort_expression', '')
+)
+respondents = len(df) if cohort is None else len(cohort)
+st.caption(cohort_caption)
+
+if cooc_category:
+    cooc = compute_cooccurrence(
+        df, dataset_version, f"{cooc_category}HaveWorkedWith", cohort_key, cohort, top_n=cooc_top_n
+    )
+    fig_cooc = plot_cooccurrence_heatmap(cooc[cooc_measure], f"{cooc_category} Co-occurrence ({cooc_measure})")
+    if fig_cooc:
+        st.plotly_chart(fig_cooc, use_container_width=True)
+        
+        with st.expander("Strongest Pairs"):
+            st.dataframe(top_pairs(cooc[cooc_measure]), use_container_width=True)
+
+st.markdown("""
+**Reading the heatmap:**
+- Count: respondents using both technologies
+- Lift: how much more often a pair appears than if choices were independent (1 = no relation)
+- Jaccard: overlap of the two user groups (0 to 1)
+""")
+
+st.markdown("---")
+
 # Work Preferences
 st.header("🏢 Work Environment Analysis")
-fig6 = plot_remote_work_by_orgsize(df)
-st.plotly_chart(fig6, use_container_width=True)
+st.caption(cohort_caption)
+work_by_orgsize = compute_crosstab(df, dataset_version, 'OrgSize', 'RemoteWork', cohort_key, cohort)
+fig6 = plot_remote_work_by_orgsize(normalize_crosstab(work_by_orgsize, 'row'))
+if fig6:
+    st.plotly_chart(fig6, use_container_width=True)
+else:
+    st.info("Organization size data not available")
+
+# One pass over the encoded column serves all three metrics
+work_counts = compute_category_counts(df, dataset_version, 'RemoteWork', cohort_key, cohort)
 
 col1, col2, col3 = st.columns(3)
 with col1:
-    remote_percentage = (df['RemoteWork'].str.contains('Remote').sum() / len(df)) * 100
-    st.metric("Fully Remote", f"{remote_percentage:.1f}%")
+    st.metric("Fully Remote", f"{share_matching(work_counts, 'Remote', respondents):.1f}%")
 
 with col2:
-    hybrid_percentage = (df['RemoteWork'].str.contains('Hybrid').sum() / len(df)) * 100
-    st.metric("Hybrid Work", f"{hybrid_percentage:.1f}%")
+    st.metric("Hybrid Work", f"{share_matching(work_counts, 'Hybrid', respondents):.1f}%")
 
 with col3:
-    in_person = (df['RemoteWork'].str.contains('In-person').sum() / len(df)) * 100
-    st.metric("In-Person", f"{in_person:.1f}%")
+    st.metric("In-Person", f"{share_matching(work_counts, 'In-person', respondents):.1f}%")
 
 st.markdown("""
 **Work Preference Insights:**
 - Smaller companies more likely to offer remote work
 - Larger enterprises prefer hybrid models
 - Remote work remains popular post-pandemic
-""")
\ No newline at end of file
+""")
+
+finish_rerun(rerun)
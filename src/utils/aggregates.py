@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+from utils.cleaning import clean_salary
+from utils.salary import load_usd_salaries
+from utils.tech_rankings import compute_tech_rankings
+from utils.multiselect import cohort_positions, load_multiselect_matrix, cohort_counts
+from utils.kpis import compute_kpis
+from utils.sampling import scale_counts, proportion_margin, mean_margin
+from utils.bootstrap import bootstrap_intervals
+from utils.metrics import count_rows_scanned
+from utils.filter_cache import filter_key
+from utils.filter_expressions import compile_filter, FilterExpressionError
+
+ALL_COUNTRIES = 'All Countries'
+ALL_EXPERIENCE = 'All Experience'
+ALL_ROLES = 'All Roles'
+
+def filter_positions(df, country=ALL_COUNTRIES, experience=ALL_EXPERIENCE, role=ALL_ROLES):
+    """Row positions of the respondents matching the sidebar filters"""
+    mask = np.ones(len(df), dtype=bool)
+
+    if country != ALL_COUNTRIES and 'Country' in df.columns:
+        mask &= (df['Country'] == country).to_numpy()
+
+    if experience != ALL_EXPERIENCE and 'ExpBucket' in df.columns:
+        mask &= (df['ExpBucket'] == experience).to_numpy()
+
+    if role != ALL_ROLES and 'DevType' in df.columns:
+        mask &= df['DevType'].astype(str).str.contains(role, na=False, regex=False).to_numpy()
+
+    if (country, experience, role) != (ALL_COUNTRIES, ALL_EXPERIENCE, ALL_ROLES):
+        count_rows_scanned(len(df), 'filter')
+    return np.flatnonzero(mask)
+
+def cached_positions(df, filter_cache, key, country=ALL_COUNTRIES, experience=ALL_EXPERIENCE, role=ALL_ROLES, expression=None):
+    """Row positions of a filter state, cached under its key"""
+    def compute():
+        positions = filter_positions(df, country, experience, role)
+        if expression is None:
+            return positions
+        # Without narrowing sidebar filters the expression runs on the whole dataset, where its term masks are cached
+        return expression.positions(positions if len(positions) < len(df) else None)
+
+    return filter_cache.get_or_compute(key, 'positions', compute)
+
+def sidebar_cohort(df, dataset_version, filter_cache, state, expression_text=''):
+    """Cache key, row positions (None for everyone) and caption of the Dashboard's sidebar cohort, for the other pages"""
+    try:
+        expression = compile_filter(df, dataset_version, expression_text)
+    except FilterExpressionError:
+        expression = None
+    key = filter_key(dataset_version, expression=expression, **state)
+    positions = cached_positions(df, filter_cache, key, expression=expression, **state)
+    label = " • ".join([*state.values(), *([str(expression)] if expression is not None else [])])
+    caption = f"{label} ({len(positions):,} responses, set in the Dashboard sidebar)"
+    return key, None if len(positions) == len(df) else positions, caption
+
+def cohort_frame(df, filter_cache, key, country=ALL_COUNTRIES, experience=ALL_EXPERIENCE, role=ALL_ROLES, expression=None):
+    """Rows of the dataset for a filter state, reusing cached row positions"""
+    positions = cached_positions(df, filter_cache, key, country, experience, role, expression)
+    return df if len(positions) == len(df) else df.iloc[positions]
+
+def split_roles(devtype):
+    """One row per (respondent, role) from the semicolon-separated DevType column"""
+    roles = devtype.dropna().astype(str).str.split(';').explode()
+    return roles.str.strip()
+
+def offered_roles(roles, limit=20):
+    """Sidebar role choices, "All Roles" first, from a cohort's split roles"""
+    return ([ALL_ROLES] + sorted([r for r in roles.unique() if r and r.lower() != 'other']))[:limit]
+
+def role_options(df_filtered, limit=20):
+    """Role choices offered in the sidebar for the current country and experience"""
+    if 'DevType' not in df_filtered.columns:
+        return [ALL_ROLES]
+    return offered_roles(split_roles(df_filtered['DevType']), limit)
+
+def rank_roles(role_counts, top_n=8):
+    """Most common developer roles from per-role respondent counts"""
+    role_counts = role_counts[(role_counts > 0) & ~role_counts.index.str.contains('Other', case=False)]
+    return role_counts.sort_values(ascending=False, kind='stable').head(top_n)
+
+def salary_frame(df, df_filtered, dataset_version, salary_col, currency_col):
+    """USD salaries of the cohort with the columns the salary tabs group by"""
+    columns = [col for col in ['DevType', 'Country'] if col in df_filtered.columns]
+    salaries = load_usd_salaries(df, dataset_version, salary_col, currency_col)
+    return df_filtered[columns].join(salaries, how='inner')
+
+def salary_table(label, names, stats):
+    """Average salary per group with its bootstrap confidence interval, highest first"""
+    return pd.DataFrame({
+        label: names,
+        'Avg Salary (USD)': stats['mean'].to_numpy(),
+        'Count': stats['count'].to_numpy().astype('int64'),
+        'CI Low': stats['mean_low'].to_numpy(),
+        'CI High': stats['mean_high'].to_numpy()
+    }).sort_values('Avg Salary (USD)', ascending=False)
+
+def salary_by_role(df_usd, top_n=15, min_count=6):
+    """Average salary for the most common roles in the cohort"""
+    roles = df_usd['DevType'].dropna().astype(str).str.split(';').explode()
+    top_roles = roles.value_counts().head(top_n).index
+
+    role_salaries = pd.DataFrame({'Role': roles, 'Salary_USD': df_usd['Salary_USD'].reindex(roles.index)})
+    role_salaries = role_salaries[role_salaries['Role'].isin(top_roles)]
+    stats = bootstrap_intervals(role_salaries['Salary_USD'], role_salaries['Role'], statistics=['mean'])
+    stats = stats[stats['count'] >= min_count]
+
+    return salary_table('Role', [role[:30] + ('...' if len(role) > 30 else '') for role in stats.index], stats)
+
+def salary_by_country(df_usd, min_count=3):
+    """Average salary per country with at least min_count responses"""
+    stats = bootstrap_intervals(df_usd['Salary_USD'], df_usd['Country'], statistics=['mean'])
+    stats = stats[stats['count'] >= min_count]
+
+    return salary_table('Country', stats.index.astype(str), stats)
+
+def select_salary_columns(columns):
+    """Salary column and, when amounts are in local currency, the currency column"""
+    if 'CompTotal' in columns and 'Currency' in columns:
+        return 'CompTotal', 'Currency'
+    if 'ConvertedCompYearly' in columns:
+        return 'ConvertedCompYearly', None
+    if 'Compensation' in columns:
+        return 'Compensation', None
+    return None, None
+
+def salary_aggregates(df, df_filtered, dataset_version, salary_col, currency_col):
+    """Everything the salary section renders, from one cohort"""
+    if currency_col and salary_col == 'CompTotal':
+        df_usd = salary_frame(df, df_filtered, dataset_version, salary_col, currency_col)
+        currencies = df_usd['Currency_Code'].value_counts().head(10)
+    else:
+        group_cols = [col for col in ['DevType', 'Country'] if col in df_filtered.columns]
+        df_usd = df_filtered[group_cols].assign(Salary_USD=clean_salary(df_filtered[salary_col])).dropna(subset=['Salary_USD'])
+        currencies = pd.Series(dtype='int64')
+
+    return {
+        'salaries': df_usd['Salary_USD'],
+        'intervals': bootstrap_intervals(df_usd['Salary_USD']),
+        'currencies': currencies,
+        'by_role': salary_by_role(df_usd) if 'DevType' in df_usd.columns else pd.DataFrame(),
+        'by_country': salary_by_country(df_usd) if 'Country' in df_usd.columns else pd.DataFrame(),
+    }
+
+def dashboard_tasks(df, df_filtered, dataset_version, positions, salary_col, currency_col):
+    """Independent Dashboard section computations for one cohort, by cache name"""
+    tasks = {}
+    if 'DevType' in df_filtered.columns:
+        tasks['role_counts'] = lambda: rank_roles(cohort_counts(*load_multiselect_matrix(df, dataset_version, 'DevType'), positions))
+    if 'LanguageHaveWorkedWith' in df_filtered.columns:
+        tasks['language_ranks'] = lambda: compute_tech_rankings(df, dataset_version, 'Language', positions)
+    tasks['kpis'] = lambda: compute_kpis(df, dataset_version, positions)
+    if salary_col:
+        tasks['salary'] = lambda: salary_aggregates(df, df_filtered, dataset_version, salary_col, currency_col)
+    return tasks
+
+def preview_sections(df_sample, df_sample_filtered, sample_version, filter_cache, sample_key, salary_col, currency_col, cohort_size):
+    """Dashboard sections estimated from the cohort's rows in the stratified sample, counts scaled to the cohort"""
+    tasks = dashboard_tasks(
+        df_sample, df_sample_filtered, sample_version,
+        cohort_positions(df_sample, df_sample_filtered), salary_col, currency_col
+    )
+    sections = {name: filter_cache.get_or_compute(sample_key, name, task) for name, task in tasks.items()}
+
+    sample_size = len(df_sample_filtered)
+    if 'role_counts' in sections:
+        sections['role_counts'] = scale_counts(sections['role_counts'], sample_size, cohort_size)
+    if 'language_ranks' in sections and not sections['language_ranks'].empty:
+        ranks = sections['language_ranks'].copy()
+        ranks[['have_count', 'want_count']] = scale_counts(ranks[['have_count', 'want_count']], sample_size, cohort_size)
+        sections['language_ranks'] = ranks
+    return sections
+
+def preview_margins(kpis, df_sample_filtered, cohort_size):
+    """95% margins of error of the headline estimates drawn from the sample"""
+    sample_size = len(df_sample_filtered)
+    return {
+        'avg_experience': mean_margin(df_sample_filtered['YearsCodeNum'], cohort_size) if 'YearsCodeNum' in df_sample_filtered.columns else None,
+        'ai_percentage': proportion_margin(kpis.ai_percentage, sample_size, cohort_size),
+        'remote_percentage': proportion_margin(kpis.remote_percentage, sample_size, cohort_size),
+        'hybrid_percentage': proportion_margin(kpis.hybrid_percentage, sample_size, cohort_size),
+    }
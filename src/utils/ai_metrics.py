@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.cleaning import EXPERIENCE_BUCKETS
+from utils.multiselect import load_multiselect_matrix, cohort_counts
+
+# Single-choice AI questions and the answers that count as a "yes" for each
+AI_COLUMNS = ['AISelect', 'AIAgents', 'AIAcc', 'AISent']
+POSITIVE_ANSWERS = {
+    'AISelect': r'^Yes',
+    'AIAgents': r'^Yes',
+    'AIAcc': r'Highly trust|Somewhat trust',
+    'AISent': r'^(?:Very )?favorable',
+}
+
+SENTIMENT_ORDER = ['Very favorable', 'Favorable', 'Indifferent', 'Unfavorable', 'Very unfavorable', 'Unsure']
+
+# Matrix questions stored as one multi-select column per answer level (AIToolCurrently Using, ...)
+WORKFLOW_PREFIX = 'AITool'
+AGENT_IMPACT_PREFIX = 'AIAgentImpact'
+
+def encode_ai_columns(df):
+    """Factorize the AI questions and the experience bucket of every respondent into small integer codes"""
+    columns = [col for col in AI_COLUMNS if col in df.columns]
+    categories = {}
+    codes = np.empty((len(df), len(columns)), dtype=np.int32)
+
+    # Each column gets its own block of bins, with one extra bin for no answer
+    offset = 0
+    offsets = {}
+    for j, col in enumerate(columns):
+        column_codes, uniques = pd.factorize(df[col].astype(object), sort=True)
+        column_codes[column_codes < 0] = len(uniques)
+        codes[:, j] = column_codes + offset
+        categories[col] = pd.Index(uniques.astype(str))
+        offsets[col] = offset
+        offset += len(uniques) + 1
+
+    if 'ExpBucket' in df.columns:
+        experience = pd.Categorical(df['ExpBucket'].astype(object), categories=EXPERIENCE_BUCKETS).codes.astype(np.int32)
+    else:
+        experience = np.full(len(df), -1, dtype=np.int32)
+    experience[experience < 0] = len(EXPERIENCE_BUCKETS)
+
+    return {
+        'columns': columns,
+        'codes': codes,
+        'experience': experience,
+        'categories': categories,
+        'offsets': offsets,
+        'bins': offset,
+    }
+
+@st.cache_resource
+def load_ai_encoding(_df, dataset_version):
+    """Encode the AI questions of the full dataset once per dataset version"""
+    return encode_ai_columns(_df)
+
+def ai_crosstabs(encoding, positions=None):
+    """Experience bucket x answer counts for every AI question, and the bucket sizes, with a single bincount"""
+    codes, experience = encoding['codes'], encoding['experience']
+    if positions is not None:
+        codes, experience = codes[positions], experience[positions]
+
+    bins = encoding['bins']
+    flat = experience[:, None].astype(np.int64) * bins + codes
+    counts = np.bincount(flat.ravel(), minlength=(len(EXPERIENCE_BUCKETS) + 1) * bins)
+    counts = counts.reshape(len(EXPERIENCE_BUCKETS) + 1, bins)
+
+    # Every respondent lands in exactly one bin of each column's block (answers plus no answer)
+    bucket_sizes = pd.Series(counts.sum(axis=1) // max(len(encoding['columns']), 1), index=EXPERIENCE_BUCKETS + ['Unknown'])
+
+    crosstabs = {}
+    for col in encoding['columns']:
+        start = encoding['offsets'][col]
+        labels = encoding['categories'][col]
+        crosstabs[col] = pd.DataFrame(
+            counts[:, start:start + len(labels)],
+            index=EXPERIENCE_BUCKETS + ['Unknown'],
+            columns=labels
+        )
+    return crosstabs, bucket_sizes
+
+def matrix_question_counts(df, dataset_version, prefix, positions=None):
+    """Answer level x item counts for a matrix question spread over several multi-select columns"""
+    columns = [col for col in df.columns if col.startswith(prefix)]
+    if not columns:
+        return pd.DataFrame()
+
+    counts = {}
+    for col in columns:
+        level = col[len(prefix):].strip() or 'Selected'
+        counts[level] = cohort_counts(*load_multiselect_matrix(df, dataset_version, col), positions)
+    return pd.DataFrame(counts).fillna(0).astype('int64')
+
+def compute_ai_metrics(df, dataset_version, positions=None):
+    """Adoption, trust, sentiment and agent metrics for a cohort, from the cached encoding"""
+    respondents = len(df) if positions is None else len(positions)
+    crosstabs, bucket_sizes = ai_crosstabs(load_ai_encoding(df, dataset_version), positions)
+
+    shares, by_experience = {}, {}
+    for col, table in crosstabs.items():
+        positive = table.columns.str.contains(POSITIVE_ANSWERS[col], case=False, regex=True)
+        positive_counts = table.loc[:, positive].sum(axis=1)
+        shares[col] = positive_counts.sum() / respondents * 100 if respondents else 0.0
+        by_experience[col] = (positive_counts / bucket_sizes.replace(0, np.nan) * 100).drop('Unknown')
+
+    sentiment = crosstabs['AISent'].sum() if 'AISent' in crosstabs else pd.Series(dtype='int64')
+    sentiment = sentiment.reindex([s for s in SENTIMENT_ORDER if s in sentiment.index] +
+                                  [s for s in sentiment.index if s not in SENTIMENT_ORDER])
+
+    return {
+        'respondents': respondents,
+        'crosstabs': crosstabs,
+        'ai_percentage': shares.get('AISelect'),
+        'agent_percentage': shares.get('AIAgents'),
+        'trust_percentage': shares.get('AIAcc'),
+        'favorable_percentage': shares.get('AISent'),
+        'by_experience': pd.DataFrame(by_experience),
+        'sentiment': sentiment,
+        'workflow': matrix_question_counts(df, dataset_version, WORKFLOW_PREFIX, positions),
+        'agent_impact': matrix_question_counts(df, dataset_version, AGENT_IMPACT_PREFIX, positions),
+    }
@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import pandas as pd
+
+BOOTSTRAP_RESAMPLES = int(os.environ.get('BOOTSTRAP_RESAMPLES', 500))
+CONFIDENCE = 0.95
+
+# Rows resampled per group; larger groups are bootstrapped on a subsample and the interval rescaled
+MAX_GROUP_ROWS = 500
+
+# Upper bound on the resamples x rows index matrix drawn per numpy call
+MAX_BATCH_ELEMENTS = 2_000_000
+
+STATISTICS = ['mean', 'median']
+
+def _segment_statistic(samples, starts, lengths, statistic):
+    """Per-group statistic of every resample, for resamples laid out group by group along axis 1"""
+    if statistic == 'mean':
+        return np.add.reduceat(samples, starts, axis=1) / lengths
+    return np.column_stack([
+        np.median(samples[:, start:start + length], axis=1)
+        for start, length in zip(starts, lengths)
+    ])
+
+def bootstrap_intervals(values, groups=None, statistics=STATISTICS, resamples=BOOTSTRAP_RESAMPLES,
+                        confidence=CONFIDENCE, max_rows=MAX_GROUP_ROWS, seed=0):
+    """Point estimates and percentile bootstrap intervals of each statistic for every group at once"""
+    values = np.asarray(values, dtype='float64')
+    if groups is None:
+        codes, labels = np.zeros(len(values), dtype=np.int64), pd.Index(['All'])
+    else:
+        codes, labels = pd.factorize(pd.Series(groups).to_numpy(), sort=False)
+        labels = pd.Index(labels)
+    valid = (codes >= 0) & ~np.isnan(values)
+    values, codes = values[valid], codes[valid]
+
+    columns = ['count'] + [f'{stat}{suffix}' for stat in statistics for suffix in ['', '_low', '_high']]
+    if len(values) == 0:
+        return pd.DataFrame(columns=columns, dtype='float64')
+
+    order = np.argsort(codes, kind='stable')
+    values, codes = values[order], codes[order]
+    sizes = np.bincount(codes, minlength=len(labels))
+    present = np.flatnonzero(sizes)
+    group_starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])[present]
+    sizes = sizes[present]
+
+    # Groups over max_rows are resampled from a fixed random subsample of max_rows values
+    rng = np.random.default_rng(seed)
+    drawn = np.minimum(sizes, max_rows)
+    pools = [
+        values[start:start + size] if size <= max_rows else rng.choice(values[start:start + size], max_rows, replace=False)
+        for start, size in zip(group_starts, sizes)
+    ]
+    pool = np.concatenate(pools)
+    pool_starts = np.concatenate([[0], np.cumsum(drawn)[:-1]])
+
+    # Each column of a resample draws from its own group's slice of the pool
+    column_starts = np.repeat(pool_starts, drawn)
+    column_sizes = np.repeat(drawn, drawn)
+
+    boots = {stat: [] for stat in statistics}
+    batch_size = max(1, MAX_BATCH_ELEMENTS // len(pool))
+    for batch_start in range(0, resamples, batch_size):
+        batch = min(batch_size, resamples - batch_start)
+        draws = column_starts + (rng.random((batch, len(pool)), dtype=np.float32) * column_sizes).astype(np.int64)
+        samples = pool[draws]
+        for stat in statistics:
+            boots[stat].append(_segment_statistic(samples, pool_starts, drawn, stat))
+
+    alpha = (1 - confidence) / 2
+    result = pd.DataFrame({'count': sizes}, index=labels[present])
+    for stat in statistics:
+        point = np.array([
+            getattr(np, stat)(values[start:start + size])
+            for start, size in zip(group_starts, sizes)
+        ])
+        distribution = np.vstack(boots[stat])
+        low, high = np.quantile(distribution, [alpha, 1 - alpha], axis=0)
+        centre = distribution.mean(axis=0) if stat == 'mean' else np.median(distribution, axis=0)
+
+        # m-out-of-n rescaling for subsampled groups; a no-op when every value was resampled
+        scale = np.sqrt(drawn / sizes)
+        result[stat] = point
+        result[f'{stat}_low'] = point - (centre - low) * scale
+        result[f'{stat}_high'] = point + (high - centre) * scale
+
+    return result[columns]
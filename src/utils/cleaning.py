@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+# Textual answers in the experience columns and the number of years they stand for
+YEARS_SENTINELS = {
+    'Less than 1 year': 0.5,
+    'More than 50 years': 51.0,
+}
+
+# Plausible yearly salary range, in the answer's own currency and in USD
+SALARY_MIN = 1000
+SALARY_MAX = 10000000
+
+EXPERIENCE_BUCKETS = ['0-2 years', '3-5 years', '6-10 years', '11-20 years', '20+ years']
+EXPERIENCE_BINS = [-np.inf, 2, 5, 10, 20, np.inf]
+
+def map_unique(series, kernel):
+    """Run a vectorized kernel over the distinct values of a series and broadcast the result back"""
+    codes, uniques = pd.factorize(series)
+    values = kernel(pd.Series(uniques, dtype=object)).to_numpy()
+
+    result = np.full(len(codes), np.nan, dtype=values.dtype if values.dtype.kind == 'f' else object)
+    found = codes >= 0
+    result[found] = values[codes[found]]
+    return pd.Series(result, index=series.index, name=series.name)
+
+def _strip_to_number(values):
+    """Drop every non-numeric character with one regex and parse what is left"""
+    digits = values.astype(str).str.replace(r'[^\d.-]', '', regex=True)
+    return pd.to_numeric(digits, errors='coerce').astype('float64')
+
+def _years_to_number(values):
+    """Map the known experience sentinels, then parse the remaining answers as numbers"""
+    sentinels = values.map(YEARS_SENTINELS).astype('float64')
+    return sentinels.fillna(_strip_to_number(values))
+
+def clean_numeric(series):
+    """Convert a column of numeric answers stored as text to float"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    return map_unique(series, _strip_to_number)
+
+def clean_years(series):
+    """Convert an experience column (YearsCode, WorkExp) to float, keeping textual answers"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    return map_unique(series, _years_to_number)
+
+def clean_salary(series, lower=SALARY_MIN, upper=SALARY_MAX):
+    """Convert salary answers to float, masking values outside the plausible range"""
+    amounts = clean_numeric(series)
+    return amounts.where((amounts >= lower) & (amounts <= upper))
+
+def experience_bucket(years):
+    """Assign each numeric experience value to its dashboard bucket"""
+    return pd.cut(years, bins=EXPERIENCE_BINS, labels=EXPERIENCE_BUCKETS)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.disk_cache import disk_cache
+from utils.multiselect import encode_multiselect, load_multiselect_matrix, EXCLUDE_TERMS
+
+NORMALIZATIONS = ['count', 'lift', 'jaccard']
+
+def cooccurrence_from_matrix(matrix, labels, top_n=20):
+    """Co-occurrence counts, lift and Jaccard for the top N answers via one sparse X^T X product"""
+    respondents = matrix.shape[0]
+    item_counts = np.asarray(matrix.sum(axis=0)).ravel()
+    top = np.argsort(-item_counts, kind='stable')[:top_n]
+    top = top[item_counts[top] > 0]
+
+    sub = matrix[:, top]
+    counts = (sub.T @ sub).toarray()
+    totals = item_counts[top]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = counts * respondents / np.outer(totals, totals)
+        jaccard = counts / (totals[:, None] + totals[None, :] - counts)
+
+    index = labels[top]
+    return {
+        'count': pd.DataFrame(counts, index=index, columns=index).astype('int64'),
+        'lift': pd.DataFrame(np.nan_to_num(lift), index=index, columns=index),
+        'jaccard': pd.DataFrame(np.nan_to_num(jaccard), index=index, columns=index),
+    }
+
+@st.cache_data
+@disk_cache(depends=[load_multiselect_matrix, encode_multiselect, EXCLUDE_TERMS, cooccurrence_from_matrix])
+def compute_cooccurrence(_df, dataset_version, column, filter_key, _positions=None, top_n=20):
+    """Co-occurrence matrices for a multi-select column and cohort, cached per filter state"""
+    matrix, labels = load_multiselect_matrix(_df, dataset_version, column)
+    if _positions is not None:
+        matrix = matrix[_positions]
+    return cooccurrence_from_matrix(matrix, labels, top_n)
+
+def top_pairs(matrix_df, n=10):
+    """Strongest distinct pairs in a co-occurrence matrix"""
+    values = matrix_df.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    pairs = pd.DataFrame({
+        'First': matrix_df.index[rows],
+        'Second': matrix_df.columns[cols],
+        'Value': values[rows, cols]
+    })
+    return pairs.sort_values('Value', ascending=False).head(n).reset_index(drop=True)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.disk_cache import disk_cache
+
+NORMALIZATIONS = ['count', 'row', 'column', 'overall']
+
+# Natural order of ordinal answers; other columns keep the order of their labels
+CATEGORY_ORDERS = {
+    'OrgSize': [
+        'Just me - I am a freelancer, sole proprietor, etc.',
+        '2 to 9 employees',
+        '10 to 19 employees',
+        '20 to 99 employees',
+        '100 to 499 employees',
+        '500 to 999 employees',
+        '1,000 to 4,999 employees',
+        '5,000 to 9,999 employees',
+        '10,000 or more employees',
+        'I don’t know',
+    ],
+    'Age': [
+        'Under 18 years old',
+        '18-24 years old',
+        '25-34 years old',
+        '35-44 years old',
+        '45-54 years old',
+        '55-64 years old',
+        '65 years or older',
+        'Prefer not to say',
+    ],
+}
+
+def encode_category(series, order=None):
+    """Integer codes (-1 for no answer) and labels of a single-choice column"""
+    codes, labels = pd.factorize(series.astype(object), sort=True)
+    labels = pd.Index(labels.astype(str))
+    if order:
+        ranked = [label for label in order if label in labels] + [label for label in labels if label not in order]
+        remap = np.append(labels.get_indexer(ranked).argsort(), -1).astype(np.int32)
+        codes, labels = remap[codes], pd.Index(ranked)
+    return codes.astype(np.int32), labels
+
+@st.cache_resource
+def load_category_codes(_df, dataset_version, column):
+    """Encode a single-choice column of the full dataset once per dataset version"""
+    return encode_category(_df[column], CATEGORY_ORDERS.get(column))
+
+def crosstab_counts(row_codes, row_labels, col_codes, col_labels, positions=None):
+    """Counts for every (row, column) answer pair with one bincount on the combined code"""
+    if positions is not None:
+        row_codes, col_codes = row_codes[positions], col_codes[positions]
+    answered = (row_codes >= 0) & (col_codes >= 0)
+    combined = row_codes[answered].astype(np.int64) * len(col_labels) + col_codes[answered]
+    counts = np.bincount(combined, minlength=len(row_labels) * len(col_labels))
+    return pd.DataFrame(counts.reshape(len(row_labels), len(col_labels)), index=row_labels, columns=col_labels)
+
+def normalize_crosstab(counts, normalization='count'):
+    """Counts as-is, or as percentages of each row, each column or the whole table"""
+    if normalization == 'row':
+        return counts.div(counts.sum(axis=1).replace(0, np.nan), axis=0).fillna(0) * 100
+    if normalization == 'column':
+        return counts.div(counts.sum(axis=0).replace(0, np.nan), axis=1).fillna(0) * 100
+    if normalization == 'overall':
+        return counts / max(counts.to_numpy().sum(), 1) * 100
+    return counts
+
+@st.cache_data
+@disk_cache(depends=[load_category_codes, encode_category, CATEGORY_ORDERS, crosstab_counts])
+def compute_crosstab(_df, dataset_version, row_col, col_col, filter_key, _positions=None):
+    """Crosstab counts of two single-choice columns for a cohort, cached per filter state"""
+    if row_col not in _df.columns or col_col not in _df.columns:
+        return pd.DataFrame()
+    counts = crosstab_counts(
+        *load_category_codes(_df, dataset_version, row_col),
+        *load_category_codes(_df, dataset_version, col_col),
+        _positions
+    )
+    # Drop answers nobody in the cohort gave on either axis
+    return counts.loc[counts.sum(axis=1) > 0, counts.sum(axis=0) > 0]
+
+@st.cache_data
+@disk_cache(depends=[load_category_codes, encode_category, CATEGORY_ORDERS])
+def compute_category_counts(_df, dataset_version, column, filter_key, _positions=None):
+    """Answer counts of one single-choice column for a cohort, cached per filter state"""
+    if column not in _df.columns:
+        return pd.Series(dtype='int64')
+    codes, labels = load_category_codes(_df, dataset_version, column)
+    if _positions is not None:
+        codes = codes[_positions]
+    return pd.Series(np.bincount(codes[codes >= 0], minlength=len(labels)), index=labels)
+
+def share_matching(counts, pattern, respondents):
+    """Percentage of respondents whose answer contains the pattern"""
+    matching = counts[counts.index.str.contains(pattern, regex=False)].sum()
+    return matching / respondents * 100 if respondents else 0.0
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+@st.cache_resource
+def load_sort_index(_df, dataset_version, column):
+    """Row positions of the full dataset ordered by a column, built once per dataset version"""
+    values = _df[column]
+    if pd.api.types.is_numeric_dtype(values):
+        keys = values.to_numpy(dtype='float64', na_value=np.nan)
+    else:
+        # Category labels, not codes, decide the order
+        keys = pd.factorize(values.astype(object), sort=True)[0]
+    missing = values.isna().to_numpy()
+    return {'order': np.argsort(keys, kind='stable'), 'missing': missing}
+
+def cohort_order(sort_index, positions, ascending=True):
+    """Order a cohort's row positions with a precomputed sort index, missing values last"""
+    order = sort_index['order']
+    in_cohort = np.zeros(len(order), dtype=bool)
+    in_cohort[positions] = True
+    ordered = order[in_cohort[order]]
+
+    missing = sort_index['missing'][ordered]
+    present = ordered[~missing]
+    if not ascending:
+        present = present[::-1]
+    return np.concatenate([present, ordered[missing]])
+
+def browse_page(df, positions, columns, page=1, page_size=50, sort_index=None, ascending=True):
+    """Slice only the visible page of a cohort, optionally in sorted order"""
+    if sort_index is not None:
+        positions = cohort_order(sort_index, positions, ascending)
+    start = (max(page, 1) - 1) * page_size
+    return df.iloc[positions[start:start + page_size]][columns]
+
+def page_count(total_rows, page_size):
+    """Number of pages needed to show every row"""
+    return max((total_rows - 1) // page_size + 1, 1)
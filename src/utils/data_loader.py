@@ -1,19 +1,101 @@
+import os
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import streamlit as st
+from utils.cleaning import clean_numeric, clean_years, experience_bucket
+from utils.metrics import tracked_cache, count_rows_scanned
 
-@st.cache_data
-def load_data():
-    """Load and cache the dataset"""
+DATA_PATH = Path('/Users/sudharshan/Documents/DeepKlarity/demo_survey.csv')
+SCHEMA_PATH = Path('/Users/sudharshan/Documents/DeepKlarity/stack-overflow-developer-survey-2025/survey_results_schema.csv')
+
+# Derived artifacts (indexes, precomputed aggregates) persisted between restarts
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache'
+
+# Memory-lean mode: one shared preprocessed frame with downcast numeric columns
+MEMORY_LEAN = os.environ.get('SURVEY_MEMORY_LEAN', '1') != '0'
+
+# Columns that always hold plain numbers
+NUMERIC_COLUMNS = ['ResponseId', 'ConvertedCompYearly', 'ToolCountWork', 'ToolCountPersonal', 'JobSat']
+
+# Numeric answers that may contain text ("Less than 1 year"), parsed as text and cleaned later
+NUMERIC_TEXT_COLUMNS = ['YearsCode', 'YearsCodePro', 'WorkExp', 'CompTotal']
+
+# Schema selectors for single-choice and multi-select questions
+SINGLE_CHOICE_SELECTORS = ['SAVR', 'SAHR', 'SACOL', 'DL']
+MULTI_SELECT_SELECTORS = ['MAVR', 'MAHR', 'MACOL']
+
+def build_dtype_map(schema, columns):
+    """Derive a column -> dtype map for the survey CSV from the question schema"""
+    dtype_map = {}
+    
+    if not schema.empty and 'qname' in schema.columns:
+        types = schema['type'] if 'type' in schema.columns else pd.Series('', index=schema.index)
+        selectors = schema['selector'] if 'selector' in schema.columns else pd.Series('', index=schema.index)
+        
+        for qname, qtype, selector in zip(schema['qname'], types.astype(str), selectors.astype(str)):
+            if qname not in columns:
+                continue
+            
+            if qtype == 'Slider':
+                dtype_map[qname] = 'float64'
+            elif selector in MULTI_SELECT_SELECTORS:
+                # Multi-select answers stay semicolon-joined text
+                dtype_map[qname] = 'object'
+            elif selector in SINGLE_CHOICE_SELECTORS:
+                dtype_map[qname] = 'category'
+            elif qtype == 'TE':
+                # Free text
+                dtype_map[qname] = 'object'
+    
+    for col in NUMERIC_COLUMNS:
+        if col in columns:
+            dtype_map[col] = 'float64'
+    
+    for col in NUMERIC_TEXT_COLUMNS:
+        if col in columns:
+            dtype_map[col] = 'object'
+    
+    return dtype_map
+
+def read_survey_csv(path, dtype_map):
+    """Read the survey CSV with the multithreaded pyarrow engine, typing columns while parsing"""
     try:
-        # Try to load from data directory first
-        data_path = Path('/Users/sudharshan/Documents/DeepKlarity/demo_survey.csv')
-        if data_path.exists():
-            df = pd.read_csv('/Users/sudharshan/Documents/DeepKlarity/demo_survey.csv', low_memory=False)
-        else:
-            # If not in data directory, try current directory
-            df = pd.read_csv('/Users/sudharshan/Documents/DeepKlarity/demo_survey.csv', low_memory=False)
+        return pd.read_csv(path, engine='pyarrow', dtype=dtype_map)
+    except (ImportError, ValueError, TypeError):
+        # pyarrow missing or a column did not match its schema type
+        return pd.read_csv(path, dtype=dtype_map, low_memory=False)
+
+def strip_text_columns(df):
+    """Strip surrounding whitespace from text and categorical columns, keeping missing values"""
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        if pd.api.types.infer_dtype(df[col], skipna=True) == 'string':
+            df[col] = df[col].str.strip()
+    
+    for col in df.select_dtypes(include=['category']).columns:
+        categories = df[col].cat.categories
+        if categories.dtype == object:
+            stripped = categories.str.strip()
+            if stripped.is_unique:
+                df[col] = df[col].cat.rename_categories(stripped)
+    
+    return df
+
+def get_dataset_version():
+    """Identify the dataset file on disk so derived caches are rebuilt when it changes"""
+    try:
+        stat = DATA_PATH.stat()
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    except OSError:
+        return 'missing'
+
+def read_dataset():
+    """Read and clean the dataset from disk"""
+    try:
+        schema = load_schema()
+        header = pd.read_csv(DATA_PATH, nrows=0).columns
+        df = read_survey_csv(DATA_PATH, build_dtype_map(schema, set(header)))
+        count_rows_scanned(len(df), 'load')
         
         # Basic cleaning
         # Remove columns with >50% null values
@@ -21,44 +103,75 @@ def load_data():
         df = df.loc[:, df.isnull().sum() < threshold]
         
         # Clean up text columns
-        text_cols = df.select_dtypes(include=['object']).columns
-        for col in text_cols:
-            df[col] = df[col].astype(str).str.strip()
+        df = strip_text_columns(df)
             
         return df
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
-@st.cache_data
+@tracked_cache('load_data', st.cache_data)
+def load_data():
+    """Load and cache the dataset"""
+    return read_dataset()
+
+@tracked_cache('load_survey', st.cache_resource)
+def load_survey():
+    """Single canonical preprocessed frame shared by every page and session (treat as read-only)"""
+    if not MEMORY_LEAN:
+        return preprocess_data(load_data())
+    
+    # Skip st.cache_data (which keeps a pickled copy) and preprocess in place
+    return downcast_numeric(preprocess_data(read_dataset(), inplace=True))
+
+@tracked_cache('load_schema', st.cache_data)
 def load_schema():
     """Load column schema"""
     try:
-        schema_path = Path('/Users/sudharshan/Documents/DeepKlarity/stack-overflow-developer-survey-2025/survey_results_schema.csv')
-        if schema_path.exists():
-            schema = pd.read_csv('/Users/sudharshan/Documents/DeepKlarity/stack-overflow-developer-survey-2025/survey_results_schema.csv')
+        if SCHEMA_PATH.exists():
+            schema = pd.read_csv(SCHEMA_PATH)
         else:
             schema = pd.DataFrame()
         return schema
     except:
         return pd.DataFrame()
 
-def preprocess_data(df):
+def preprocess_data(df, inplace=False):
     """Preprocess data for visualization"""
-    # Create cleaned copy
-    df_clean = df.copy()
+    # Create cleaned copy unless the caller owns the frame
+    df_clean = df if inplace else df.copy()
     
-    # Convert numeric columns
-    numeric_cols = ['WorkExp', 'YearsCode', 'ToolCountWork', 'ToolCountPersonal', 'CompTotal']
+    # Convert numeric columns (numeric-text columns are parsed as text by load_data)
+    numeric_cols = ['ToolCountWork', 'ToolCountPersonal', 'CompTotal']
     for col in numeric_cols:
         if col in df_clean.columns:
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
+            df_clean[col] = clean_numeric(df_clean[col])
     
-    # Create YearsCodeNum column for easier filtering
-    df_clean['YearsCodeNum'] = pd.to_numeric(df_clean['YearsCode'], errors='coerce')
+    # Experience columns keep answers such as "Less than 1 year"
+    years_cols = ['WorkExp', 'YearsCode', 'YearsCodePro']
+    for col in years_cols:
+        if col in df_clean.columns:
+            df_clean[col] = clean_years(df_clean[col])
+    
+    # Create YearsCodeNum and ExpBucket columns for easier filtering
+    if 'YearsCode' in df_clean.columns:
+        df_clean['YearsCodeNum'] = df_clean['YearsCode']
+        df_clean['ExpBucket'] = experience_bucket(df_clean['YearsCodeNum'])
     
     return df_clean
 
+def downcast_numeric(df):
+    """Shrink numeric columns in place to the smallest integer type, or float32 when they hold fractions or gaps"""
+    for col in df.select_dtypes(include=['number']).columns:
+        values = df[col]
+        if pd.api.types.is_integer_dtype(values):
+            df[col] = pd.to_numeric(values, downcast='integer')
+        elif values.notna().all() and (values % 1 == 0).all():
+            df[col] = pd.to_numeric(values.astype('int64'), downcast='integer')
+        else:
+            df[col] = values.astype('float32')
+    return df
+
 def get_language_data(df, prefix='LanguageHaveWorkedWith'):
     """Extract language data from the dataset"""
     if prefix not in df.columns:
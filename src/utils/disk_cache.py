@@ -0,0 +1,205 @@
+import hashlib
+import inspect
+import json
+import os
+import re
+import time
+import uuid
+import zipfile
+from functools import wraps
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from utils import cleaning, data_loader, sampling
+from utils.data_loader import CACHE_DIR
+from utils.metrics import get_metrics
+
+# On-disk memo store, its byte budget and switch, configurable per deployment
+DISK_CACHE_ENABLED = os.environ.get('SURVEY_DISK_CACHE', '1') != '0'
+DISK_CACHE_DIR = CACHE_DIR / 'memo'
+DISK_CACHE_MAX_BYTES = int(os.environ.get('DISK_CACHE_MAX_MB', 512)) * 1024 * 1024
+
+# Temporary files older than this were left behind by a crashed writer
+STALE_PARTIAL_SECONDS = 3600
+
+# Parameter values a key may hold; anything else (frames, arrays) has to be an underscore argument
+KEY_TYPES = (str, int, float, bool, type(None))
+
+def _arrow_bytes(frame):
+    """A DataFrame as Arrow IPC file bytes, index and dtypes included"""
+    buffer = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(frame)
+    with pa.ipc.new_file(buffer, table.schema) as writer:
+        writer.write_table(table)
+    return np.frombuffer(buffer.getvalue().to_pybytes(), dtype=np.uint8)
+
+def _arrow_frame(data):
+    """DataFrame back from Arrow IPC file bytes"""
+    table = pa.ipc.open_file(pa.py_buffer(data.tobytes())).read_all()
+    frame = table.to_pandas()
+
+    # pandas with string inference reads object text back as str; keep the dtypes the result was computed with
+    metadata = table.schema.pandas_metadata or {}
+    objects = {col['field_name'] for col in metadata.get('columns', ()) if col['numpy_type'] == 'object'}
+    for col in objects.intersection(frame.columns):
+        frame[col] = frame[col].astype(object)
+    if frame.index.nlevels == 1 and metadata.get('index_columns') and metadata['index_columns'][0] in objects:
+        frame.index = frame.index.astype(object)
+    if [col['numpy_type'] for col in metadata.get('column_indexes', ())] == ['object']:
+        frame.columns = frame.columns.astype(object)
+    return frame
+
+def encode_value(value, arrays, name='value'):
+    """JSON manifest of a result, with its frames and arrays added to arrays under names derived from name"""
+    if isinstance(value, pd.DataFrame):
+        arrays[name] = _arrow_bytes(value)
+        return {'type': 'frame', 'key': name}
+    if isinstance(value, pd.Series):
+        arrays[name] = _arrow_bytes(value.to_frame(name='values'))
+        return {'type': 'series', 'key': name, 'name': value.name}
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        arrays[name] = value
+        return {'type': 'array', 'key': name}
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {'type': 'dict', 'items': {key: encode_value(item, arrays, f'{name}.{key}') for key, item in value.items()}}
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        value = value.item()
+    if isinstance(value, KEY_TYPES):
+        return {'type': 'json', 'value': value}
+    raise TypeError(f"Can't persist a {type(value).__name__} result")
+
+def decode_value(manifest, arrays):
+    """A result back from its manifest and the stored arrays"""
+    kind = manifest['type']
+    if kind == 'frame':
+        return _arrow_frame(arrays[manifest['key']])
+    if kind == 'series':
+        return _arrow_frame(arrays[manifest['key']])['values'].rename(manifest['name'])
+    if kind == 'array':
+        return arrays[manifest['key']]
+    if kind == 'dict':
+        return {key: decode_value(item, arrays) for key, item in manifest['items'].items()}
+    return manifest['value']
+
+def _check_key_value(name, value):
+    """Reject key parameters that would need hashing beyond their repr"""
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            _check_key_value(name, item)
+    elif not isinstance(value, KEY_TYPES):
+        raise TypeError(f"Key parameter '{name}' is a {type(value).__name__}; pass it as an underscore argument")
+
+def source_hash(depends):
+    """Digest of the source code of functions and modules results depend on; constants count by their repr"""
+    digest = hashlib.sha1()
+    for item in depends:
+        if inspect.isroutine(item) or inspect.ismodule(item):
+            item = inspect.getsource(inspect.unwrap(item))
+        digest.update(repr(item).encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+# The dataset version only identifies the CSV, so the code that loads, cleans, preprocesses and samples it
+# (and the memory-lean switch, which changes dtypes) is part of every fingerprint too
+DATASET_CODE = source_hash([data_loader, cleaning, sampling, data_loader.MEMORY_LEAN])
+
+def entry_path(func_name, dataset_version, code, params):
+    """Store file of one result: per function, named by dataset fingerprint, code hash and parameter digest"""
+    version = re.sub(r'[^\w.-]+', '_', str(dataset_version)).strip('_')
+    fingerprint = f"{version}-{DATASET_CODE}"
+    digest = hashlib.sha1(repr(params).encode('utf-8')).hexdigest()[:16]
+    return DISK_CACHE_DIR / func_name / f"{fingerprint}-{code}-{digest}.npz"
+
+def read_entry(path):
+    """A stored result, refreshing its LRU position; (False, None) when missing or unreadable"""
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            arrays = {name: stored[name] for name in stored.files}
+        value = decode_value(json.loads(str(arrays.pop('__manifest__'))), arrays)
+    except FileNotFoundError:
+        return False, None
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile, pa.ArrowException):
+        path.unlink(missing_ok=True)
+        return False, None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return True, value
+
+def write_entry(path, value):
+    """Store a result; a temporary name and an atomic rename keep concurrent processes from reading half a file"""
+    arrays = {}
+    manifest = encode_value(value, arrays)
+    arrays['__manifest__'] = np.array(json.dumps(manifest))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.partial")
+    try:
+        with open(partial, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+def prune_store(max_bytes=DISK_CACHE_MAX_BYTES):
+    """Delete the least recently used results beyond the byte budget, and abandoned temporary files"""
+    entries, total, now = [], 0, time.time()
+    for path in DISK_CACHE_DIR.glob('*/*'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.suffix == '.partial':
+            if now - stat.st_mtime > STALE_PARTIAL_SECONDS:
+                path.unlink(missing_ok=True)
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+def disk_cache(depends=()):
+    """Persist a function's results on disk across restarts and processes.
+
+    Results are keyed by the dataset_version argument with a hash of the dataset loading code, a hash
+    of the function's source (and of every helper and constant in depends) and the other non-underscore
+    arguments. Underscore arguments such as _df are never hashed, so they must be determined by the rest,
+    as with st.cache_data; a cohort's _positions need the filter_key that identifies them.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+        if 'dataset_version' not in signature.parameters:
+            raise TypeError(f"{func.__name__} needs a dataset_version argument to be disk cached")
+        code = source_hash([func, *depends])
+
+        @wraps(func)
+        def cached(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if bound.arguments.get('_positions') is not None and bound.arguments.get('filter_key') is None:
+                raise TypeError(f"{func.__name__} got _positions without the filter_key that identifies them")
+            if not DISK_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            params = tuple((name, value) for name, value in bound.arguments.items() if not name.startswith('_'))
+            for name, value in params:
+                _check_key_value(name, value)
+
+            path = entry_path(func.__name__, bound.arguments['dataset_version'], code, params)
+            found, value = read_entry(path)
+            get_metrics().inc('survey_cache_hits_total' if found else 'survey_cache_misses_total', cache=f'disk:{func.__name__}')
+            if found:
+                return value
+
+            value = func(*args, **kwargs)
+            try:
+                write_entry(path, value)
+                prune_store()
+            except OSError:
+                # Read-only deployments keep computing in memory
+                pass
+            return value
+        return cached
+    return decorate
@@ -0,0 +1,116 @@
+import gzip
+import hashlib
+import os
+import uuid
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from utils.data_loader import CACHE_DIR
+
+EXPORT_FORMATS = {
+    'Parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'CSV (gzip)': {'extension': 'csv.gz', 'mime': 'application/gzip'},
+}
+
+EXPORT_DIR = CACHE_DIR / 'exports'
+
+# Rows converted per chunk, and how many finished exports to keep on disk
+CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS', 50000))
+MAX_EXPORT_FILES = int(os.environ.get('EXPORT_MAX_FILES', 20))
+
+# zlib's default level; 9 is about twice as slow for a few percent smaller files
+GZIP_LEVEL = int(os.environ.get('EXPORT_GZIP_LEVEL', 6))
+
+def iter_row_chunks(df, positions, columns, chunk_rows=CHUNK_ROWS):
+    """Slices of the selected rows and columns, chunk_rows at a time, without copying the whole cohort.
+
+    An empty cohort still yields one empty slice, so the writers get the columns to build a schema from.
+    """
+    column_positions = [df.columns.get_loc(col) for col in columns]
+    for start in range(0, max(len(positions), 1), chunk_rows):
+        yield df.iloc[positions[start:start + chunk_rows], column_positions]
+
+def _arrow_schema(chunk):
+    """Arrow schema of the first chunk, with all-empty columns widened to strings"""
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+    return schema
+
+def write_parquet(chunks, sink):
+    """Write frame chunks as row groups of one Parquet file"""
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                schema = _arrow_schema(chunk)
+                writer = pq.ParquetWriter(sink, schema, compression='zstd')
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def write_csv_gz(chunks, sink):
+    """Write frame chunks into one gzip-compressed CSV, header first"""
+    writer = None
+    target = {'fileobj': sink} if hasattr(sink, 'write') else {'filename': sink}
+    with gzip.GzipFile(mode='wb', compresslevel=GZIP_LEVEL, **target) as stream:
+        try:
+            for chunk in chunks:
+                if writer is None:
+                    schema = _arrow_schema(chunk)
+                    writer = pacsv.CSVWriter(stream, schema)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        finally:
+            if writer is not None:
+                writer.close()
+
+WRITERS = {'Parquet': write_parquet, 'CSV (gzip)': write_csv_gz}
+
+def export_name(parts, fmt):
+    """Stable file name for an export, derived from everything that determines its contents"""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:16]
+    return f"survey_{digest}.{EXPORT_FORMATS[fmt]['extension']}"
+
+def _prune_exports(keep=MAX_EXPORT_FILES, served=None):
+    """Delete the least recently used exports beyond the limit, never the one just served"""
+    files = []
+    for path in EXPORT_DIR.glob('survey_*'):
+        if path.suffix == '.partial' or path == served:
+            continue
+        try:
+            files.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            # Pruned by another session meanwhile
+            continue
+    files.sort(reverse=True)
+    for _, path in files[max(keep - 1, 0):]:
+        path.unlink(missing_ok=True)
+
+def export_rows(df, positions, columns, fmt, parts):
+    """Stream the selected rows to a file on disk once per distinct export and return its path"""
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    path = EXPORT_DIR / export_name(parts, fmt)
+    try:
+        # Reuse counts as use, so a file other sessions keep asking for isn't the next one pruned
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    # Write under a temporary name so concurrent sessions never serve a half-written file
+    partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.partial")
+    try:
+        WRITERS[fmt](iter_row_chunks(df, positions, columns), partial)
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+    _prune_exports(served=path)
+    return path
+
+def export_table(table, fmt):
+    """Encode a small aggregate table in memory"""
+    buffer = pa.BufferOutputStream()
+    WRITERS[fmt]([table], buffer)
+    return buffer.getvalue().to_pybytes()
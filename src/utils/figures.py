@@ -0,0 +1,146 @@
+from functools import lru_cache
+import numpy as np
+import plotly.colors as pc
+import plotly.graph_objects as go
+import plotly.io as pio
+
+ORANGE = '#F48024'
+
+# Trace types the factory draws; the template keeps only their defaults
+TRACE_TYPES = ['bar', 'pie']
+
+# Subplot types no chart uses, dropped from the template so every figure serializes smaller
+UNUSED_LAYOUT = ['polar', 'ternary', 'scene', 'geo', 'mapbox']
+
+def _base_template():
+    """The default plotly template, trimmed to the 2D layout and the trace types the factory draws"""
+    default = pio.templates[pio.templates.default or 'plotly']
+    layout = default.layout.to_plotly_json()
+    for key in UNUSED_LAYOUT:
+        layout.pop(key, None)
+    return go.layout.Template(layout=layout, data={trace: default.data[trace] for trace in TRACE_TYPES})
+
+TEMPLATE = _base_template()
+
+# Shared layouts per chart kind, built once and shallow-copied per figure
+LAYOUTS = {
+    'bar': {'template': TEMPLATE, 'height': 500, 'showlegend': False},
+    'hbar': {'template': TEMPLATE, 'height': 400, 'showlegend': False},
+    'pie': {'template': TEMPLATE},
+}
+
+@lru_cache(maxsize=None)
+def resolve_colorscale(name):
+    """Explicit colour stops of a named scale; plotly.js itself only knows a handful of names"""
+    return pc.get_colorscale(name)
+
+def chart_layout(kind, **overrides):
+    """Copy of a shared layout with per-chart settings merged in, one level deep"""
+    layout = {key: dict(value) if isinstance(value, dict) else value for key, value in LAYOUTS[kind].items()}
+    for key, value in overrides.items():
+        if key == 'title' and isinstance(value, str):
+            value = {'text': value}
+        if isinstance(value, dict) and isinstance(layout.get(key), dict):
+            layout[key].update(value)
+        else:
+            layout[key] = value
+    return layout
+
+def make_figure(traces, kind='bar', **layout):
+    """go.Figure from plain trace dicts and a shared layout, without plotly's per-property validation"""
+    return go.Figure(data=traces, layout=chart_layout(kind, **layout), _validate=False)
+
+def _axis_title(text):
+    """Axis (or colour bar) settings carrying just a title"""
+    return {'title': {'text': text}}
+
+def _hover_label(name, value):
+    """One hover line, without the 'name=' prefix for unlabelled axes"""
+    return f'{name}={value}' if name else value
+
+def bar_chart(x, y, title, x_title, y_title, orientation='v', color=ORANGE, colorscale=None, text=None,
+              textposition='auto', error=None, hover=None, kind=None, sort=True, **layout):
+    """Single-series bar chart; a colorscale shades the bars by value with a colour bar, as px.bar(color=values) does.
+
+    Horizontal bars are ordered by value, largest on top, unless sort is off (charts with a fixed category order).
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    horizontal = orientation == 'h'
+    value_title = x_title if horizontal else y_title
+    trace = {
+        'type': 'bar',
+        'x': x,
+        'y': y,
+        'orientation': orientation,
+        'hovertemplate': f"{_hover_label(x_title, '%{x}')}<br>{_hover_label(y_title, '%{y}')}",
+    }
+
+    if colorscale:
+        trace['marker'] = {'color': x if horizontal else y, 'coloraxis': 'coloraxis'}
+        layout['coloraxis'] = {'colorscale': resolve_colorscale(colorscale), 'colorbar': _axis_title(value_title)}
+    else:
+        trace['marker'] = {'color': color}
+    if text is not None:
+        trace['text'] = np.asarray(text)
+        trace['textposition'] = textposition
+    # Error bar lengths (above, below) along the value axis
+    if error is not None:
+        above, below = error
+        trace['error_x' if horizontal else 'error_y'] = {'type': 'data', 'array': np.asarray(above), 'arrayminus': np.asarray(below)}
+    # Extra hover lines, as {label: (values, d3 format)}
+    if hover:
+        trace['customdata'] = np.column_stack([np.asarray(values) for values, _ in hover.values()])
+        trace['hovertemplate'] += ''.join(
+            f"<br>{name}=%{{customdata[{i}]{':' + fmt if fmt else ''}}}" for i, (name, (_, fmt)) in enumerate(hover.items())
+        )
+    trace['hovertemplate'] += '<extra></extra>'
+
+    axes = {'xaxis': _axis_title(x_title), 'yaxis': _axis_title(y_title)}
+    if horizontal and sort:
+        axes['yaxis']['categoryorder'] = 'total ascending'
+    for axis in axes:
+        axes[axis].update(layout.pop(axis, {}))
+    return make_figure([trace], kind or ('hbar' if horizontal else 'bar'), title=title, **axes, **layout)
+
+def pie_chart(values, names, title, hole=0.0, colors=None, sort=True, **layout):
+    """Pie or donut chart labelled inside the slices with percent and name"""
+    trace = {
+        'type': 'pie',
+        'values': np.asarray(values),
+        'labels': np.asarray(names),
+        'hole': hole,
+        'sort': sort,
+        'textposition': 'inside',
+        'textinfo': 'percent+label',
+        'hovertemplate': '%{label}: %{value}<extra></extra>',
+    }
+    if colors:
+        trace['marker'] = {'colors': list(colors)}
+    return make_figure([trace], 'pie', title=title, **layout)
+
+def vline(x, color, text, position='top right'):
+    """Dashed vertical line across the plot, labelled at the top, as a layout shape and annotation"""
+    shape = {'type': 'line', 'xref': 'x', 'yref': 'paper', 'x0': x, 'x1': x, 'y0': 0, 'y1': 1, 'line': {'color': color, 'dash': 'dash'}}
+    annotation = {
+        'x': x, 'xref': 'x', 'y': 1, 'yref': 'paper', 'text': text, 'showarrow': False,
+        'xanchor': 'left' if position.endswith('right') else 'right', 'yanchor': 'top',
+    }
+    return shape, annotation
+
+def histogram_chart(values, title, x_title, y_title, bins=30, color=ORANGE, vlines=(), **layout):
+    """Histogram binned with numpy, so the browser gets the bin counts rather than every value"""
+    values = np.asarray(values, dtype='float64')
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=bins)
+    trace = {
+        'type': 'bar',
+        'x': (edges[:-1] + edges[1:]) / 2,
+        'y': counts,
+        'marker': {'color': color},
+        'customdata': np.column_stack([edges[:-1], edges[1:]]),
+        'hovertemplate': f'{x_title}=%{{customdata[0]:,.0f}} - %{{customdata[1]:,.0f}}<br>{y_title}=%{{y}}<extra></extra>',
+    }
+    lines = [vline(*line) for line in vlines]
+    return make_figure(
+        [trace], 'bar', title=title, bargap=0.1, xaxis=_axis_title(x_title), yaxis=_axis_title(y_title),
+        shapes=[shape for shape, _ in lines], annotations=[annotation for _, annotation in lines], **layout
+    )
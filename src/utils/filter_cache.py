@@ -0,0 +1,109 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+import streamlit as st
+from utils.memory import object_size
+
+# Byte budget and time-to-live for cached filter results, configurable per deployment
+DEFAULT_MAX_BYTES = int(os.environ.get('FILTER_CACHE_MAX_MB', 256)) * 1024 * 1024
+DEFAULT_TTL_SECONDS = int(os.environ.get('FILTER_CACHE_TTL_SECONDS', 3600))
+
+class FilterResultCache:
+    """Cross-session LRU/TTL cache of filtered row positions and their aggregates, bounded by bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key, name):
+        """Return (found, value) for one aggregate of a filter state, refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry['created'] > self.ttl_seconds:
+                self._drop(key)
+                self.evictions += 1
+                entry = None
+            if entry is None or name not in entry['values']:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry['values'][name]
+
+    def _store(self, key, name, value):
+        """Add one aggregate to a filter state and evict least recently used states over budget"""
+        size = object_size(value)
+        with self._lock:
+            entry = self._entries.setdefault(key, {'created': time.monotonic(), 'values': {}, 'bytes': 0})
+            if name in entry['values']:
+                return
+            entry['values'][name] = value
+            entry['bytes'] += size
+            self.bytes += size
+            self._entries.move_to_end(key)
+
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key):
+        """Remove a filter state (caller holds the lock)"""
+        entry = self._entries.pop(key)
+        self.bytes -= entry['bytes']
+
+    def get_or_compute(self, key, name, compute):
+        """Return a cached aggregate for a filter state, computing and storing it on a miss"""
+        found, value = self._lookup(key, name)
+        if found:
+            return value
+        value = compute()
+        self._store(key, name, value)
+        return value
+
+    def get(self, key, name):
+        """Return a cached aggregate for a filter state, or None without computing it"""
+        return self._lookup(key, name)[1]
+
+    def contains(self, key, name):
+        """Whether an aggregate is cached, without touching the statistics"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and name in entry['values']
+
+    def clear(self):
+        """Drop every cached filter state"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Hit/miss/eviction counters and current footprint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+@st.cache_resource
+def get_filter_cache():
+    """Process-wide filter result cache shared by every session"""
+    return FilterResultCache()
+
+def filter_key(dataset_version, country, experience, role, expression=None):
+    """Cache key of a sidebar filter state, including the canonical filter expression if there is one"""
+    key = (dataset_version, country, experience, role)
+    return key + (str(expression),) if expression is not None else key
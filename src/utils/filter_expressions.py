@@ -0,0 +1,439 @@
+import os
+import re
+from dataclasses import dataclass
+from difflib import get_close_matches
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.crosstab import load_category_codes
+from utils.filter_cache import FilterResultCache
+from utils.metrics import count_rows_scanned
+from utils.multiselect import load_multiselect_matrix, cohort_counts
+
+# Operators per kind of column; list operators take one value or a parenthesized list
+NUMERIC_OPERATORS = ['=', '!=', '<', '<=', '>', '>=', 'in', 'not in']
+TEXT_OPERATORS = ['=', '!=', 'in', 'not in', 'contains', 'has', 'has all']
+LIST_OPERATORS = ['in', 'not in', 'has', 'has all']
+
+# Byte budget of the whole-dataset term masks, kept apart from the filter states, configurable per deployment
+TERM_MASK_MAX_BYTES = int(os.environ.get('TERM_MASK_CACHE_MAX_MB', 64)) * 1024 * 1024
+
+FILTER_SYNTAX = (
+    "Combine `Column operator value` terms with AND, OR, NOT and parentheses, e.g. "
+    "`Country in (Germany, Poland) AND LanguageHaveWorkedWith has Rust AND RemoteWork = Remote`. "
+    "Operators: = != < <= > >= in, not in, contains, has (any of), has all (multi-select answers). "
+    "Quote values that contain commas, parentheses or the words and/or."
+)
+
+TOKEN_PATTERN = re.compile(r"""\s*(?:
+    (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<op>!=|>=|<=|=|>|<)
+  | (?P<punct>[(),])
+  | (?P<word>[^\s(),=!<>'"]+)
+)""", re.VERBOSE)
+
+class FilterExpressionError(ValueError):
+    """A filter expression that doesn't parse or doesn't fit the dataset"""
+
+def _quote(value):
+    """Value as a literal: plain numbers bare, anything else single-quoted"""
+    if re.fullmatch(r'-?\d+(\.\d+)?', value):
+        return value
+    return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+@dataclass(frozen=True)
+class Term:
+    """One column test, e.g. Country in ('Germany', 'Poland')"""
+    column: str
+    op: str
+    values: tuple
+
+    def __str__(self):
+        if self.op in LIST_OPERATORS and len(self.values) > 1:
+            return f"{self.column} {self.op} ({', '.join(_quote(v) for v in self.values)})"
+        return f"{self.column} {self.op} {_quote(self.values[0])}"
+
+@dataclass(frozen=True)
+class Not:
+    """Negation of a subexpression"""
+    child: object
+
+    def __str__(self):
+        return f"NOT ({self.child})"
+
+@dataclass(frozen=True)
+class And:
+    """Subexpressions that must all match"""
+    children: tuple
+
+    def __str__(self):
+        return ' AND '.join(f"({child})" if isinstance(child, Or) else str(child) for child in self.children)
+
+@dataclass(frozen=True)
+class Or:
+    """Subexpressions of which at least one must match"""
+    children: tuple
+
+    def __str__(self):
+        return ' OR '.join(str(child) for child in self.children)
+
+def tokenize(text):
+    """(kind, text) tokens of an expression"""
+    tokens, position = [], 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise FilterExpressionError(f"Unexpected character at position {position + 1}: {text[position:position + 10]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+class _Parser:
+    """Recursive descent over the tokens; AND binds tighter than OR"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.index = 0
+
+    def peek(self, offset=0):
+        """The token offset places ahead, or (None, None) past the end"""
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def keyword(self, *words):
+        """Consume the next word if it is one of the keywords, case-insensitively"""
+        kind, value = self.peek()
+        if kind == 'word' and value.lower() in words:
+            self.index += 1
+            return value.lower()
+        return None
+
+    def expect(self, punct):
+        """Consume a required bracket or comma"""
+        kind, value = self.peek()
+        if kind != 'punct' or value != punct:
+            raise FilterExpressionError(f"Expected '{punct}' but found {value!r}" if value else f"Expected '{punct}' at the end")
+        self.index += 1
+
+    def parse(self):
+        """The whole expression, which must use up every token"""
+        if not self.tokens:
+            raise FilterExpressionError("Empty filter expression")
+        node = self.parse_or()
+        if self.index < len(self.tokens):
+            raise FilterExpressionError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.keyword('or'):
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self):
+        children = [self.parse_unary()]
+        while self.keyword('and'):
+            children.append(self.parse_unary())
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_unary(self):
+        if self.keyword('not'):
+            return Not(self.parse_unary())
+        if self.peek() == ('punct', '('):
+            self.index += 1
+            node = self.parse_or()
+            self.expect(')')
+            return node
+        return self.parse_term()
+
+    def parse_term(self):
+        """Column, operator and value or value list"""
+        kind, column = self.peek()
+        if kind != 'word':
+            raise FilterExpressionError(f"Expected a column name but found {column!r}" if column else "Expected a column name at the end")
+        self.index += 1
+
+        kind, value = self.peek()
+        if kind == 'op':
+            self.index += 1
+            op = value
+        elif self.keyword('in'):
+            op = 'in'
+        elif self.keyword('not'):
+            if not self.keyword('in'):
+                raise FilterExpressionError(f"Expected 'in' after '{column} not'")
+            op = 'not in'
+        elif self.keyword('has'):
+            op = 'has all' if self.keyword('all') else 'has'
+            self.keyword('any')
+        elif self.keyword('contains'):
+            op = 'contains'
+        else:
+            raise FilterExpressionError(f"Expected an operator after {column!r}")
+
+        if op in LIST_OPERATORS and self.peek() == ('punct', '('):
+            self.index += 1
+            values = [self.parse_value()]
+            while self.peek() == ('punct', ','):
+                self.index += 1
+                values.append(self.parse_value())
+            self.expect(')')
+        else:
+            values = [self.parse_value()]
+        return Term(column, op, tuple(values))
+
+    def parse_value(self):
+        """A quoted string, or consecutive bare words up to a delimiter or AND/OR"""
+        kind, value = self.peek()
+        if kind == 'string':
+            self.index += 1
+            return value
+        words = []
+        while kind == 'word' and value.lower() not in ('and', 'or'):
+            words.append(value)
+            self.index += 1
+            kind, value = self.peek()
+        if not words:
+            raise FilterExpressionError(f"Expected a value but found {value!r}" if value else "Expected a value at the end")
+        return ' '.join(words)
+
+def _canonical(node):
+    """Same expression with nested AND/OR flattened and their terms in a fixed order, for cache keys"""
+    if isinstance(node, Not):
+        return Not(_canonical(node.child))
+    if isinstance(node, (And, Or)):
+        children = []
+        for child in map(_canonical, node.children):
+            children.extend(child.children if type(child) is type(node) else [child])
+        children = sorted(set(children), key=str)
+        return children[0] if len(children) == 1 else type(node)(tuple(children))
+    return node
+
+def parse_filter(text):
+    """Parse a filter expression into its canonical syntax tree"""
+    return _canonical(_Parser(tokenize(text)).parse())
+
+def _terms(node):
+    """Every column test in a syntax tree"""
+    if isinstance(node, Term):
+        return [node]
+    if isinstance(node, Not):
+        return _terms(node.child)
+    return [term for child in node.children for term in _terms(child)]
+
+@st.cache_resource
+def load_answer_counts(_df, dataset_version, column):
+    """Respondents per answer of a column, for selectivity estimates"""
+    codes, labels = load_category_codes(_df, dataset_version, column)
+    return np.bincount(codes[codes >= 0], minlength=len(labels))
+
+@st.cache_resource
+def load_multiselect_counts(_df, dataset_version, column):
+    """Respondents picking each answer of a multi-select column, for selectivity estimates"""
+    return cohort_counts(*load_multiselect_matrix(_df, dataset_version, column))
+
+@st.cache_resource
+def load_sorted_values(_df, dataset_version, column):
+    """Sorted non-missing values of a numeric column, for selectivity estimates"""
+    values = _df[column].to_numpy(dtype='float64')
+    return np.sort(values[~np.isnan(values)])
+
+@st.cache_resource
+def get_term_mask_cache():
+    """Process-wide cache of whole-dataset term masks shared by every session, separate from the filter states"""
+    return FilterResultCache(max_bytes=TERM_MASK_MAX_BYTES)
+
+class CompiledFilter:
+    """A filter expression bound to one dataset version, evaluated most selective term first"""
+
+    def __init__(self, df, dataset_version, node, term_cache=None, validate=True):
+        self.df = df
+        self.dataset_version = dataset_version
+        self.node = node
+        self.term_cache = term_cache if term_cache is not None else get_term_mask_cache()
+        self._selectivity = {}
+        if validate:
+            for term in _terms(node):
+                self._validate(term)
+
+    def __str__(self):
+        return str(self.node)
+
+    def _is_numeric(self, column):
+        """Whether a column is compared as numbers rather than answers"""
+        return pd.api.types.is_numeric_dtype(self.df[column])
+
+    def _validate(self, term):
+        """Reject unknown columns, operators that don't fit the column and answers nobody gave"""
+        if term.column not in self.df.columns:
+            close = get_close_matches(term.column, self.df.columns.tolist(), n=1)
+            hint = f" Did you mean {close[0]}?" if close else ""
+            raise FilterExpressionError(f"Unknown column {term.column!r}.{hint}")
+
+        numeric = self._is_numeric(term.column)
+        if term.op not in (NUMERIC_OPERATORS if numeric else TEXT_OPERATORS):
+            kind = 'numeric' if numeric else 'text'
+            raise FilterExpressionError(f"'{term.op}' doesn't apply to the {kind} column {term.column}")
+
+        if numeric:
+            for value in term.values:
+                try:
+                    float(value)
+                except ValueError:
+                    raise FilterExpressionError(f"{term.column} is numeric, but {value!r} is not a number") from None
+            return
+        if term.op == 'contains':
+            return
+
+        if term.op in ('has', 'has all'):
+            labels = load_multiselect_matrix(self.df, self.dataset_version, term.column)[1]
+        else:
+            labels = load_category_codes(self.df, self.dataset_version, term.column)[1]
+        for value in term.values:
+            if value not in labels:
+                close = get_close_matches(value, labels.tolist(), n=1)
+                hint = f" Did you mean {close[0]!r}?" if close else ""
+                raise FilterExpressionError(f"No respondent answered {value!r} to {term.column}.{hint}")
+
+    def _answer_lookup(self, term, labels):
+        """Which answers of a single-choice column the term matches, with a trailing False for no answer"""
+        if term.op == 'contains':
+            matched = np.asarray(labels.str.contains(term.values[0], case=False, regex=False), dtype=bool)
+        else:
+            matched = np.isin(np.arange(len(labels)), labels.get_indexer(list(term.values)))
+        return np.append(matched, False)
+
+    def _compute(self, term, positions):
+        """Match of one term for the rows at positions (every row when None)"""
+        column = term.column
+        count_rows_scanned(len(self.df) if positions is None else len(positions), 'expression')
+        if self._is_numeric(column):
+            values = self.df[column].to_numpy(dtype='float64')
+            values = values if positions is None else values[positions]
+            targets = np.array([float(value) for value in term.values])
+            answered = ~np.isnan(values)
+            if term.op in ('in', 'not in'):
+                hit = np.isin(values, targets)
+                return answered & (hit if term.op == 'in' else ~hit)
+            comparisons = {'=': np.equal, '!=': np.not_equal, '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+            return answered & comparisons[term.op](values, targets[0])
+
+        if term.op in ('has', 'has all'):
+            matrix, labels = load_multiselect_matrix(self.df, self.dataset_version, column)
+            answers = labels.get_indexer(list(term.values))
+            size = matrix.shape[0] if positions is None else len(positions)
+            if (term.op == 'has all' and (answers < 0).any()) or (answers < 0).all():
+                return np.zeros(size, dtype=bool)
+            rows = matrix if positions is None else matrix[positions]
+            picked = np.asarray(rows[:, answers[answers >= 0]].sum(axis=1)).ravel()
+            return picked >= ((answers >= 0).sum() if term.op == 'has all' else 1)
+
+        codes, labels = load_category_codes(self.df, self.dataset_version, column)
+        codes = codes if positions is None else codes[positions]
+        lookup = self._answer_lookup(term, labels)
+        if term.op in ('!=', 'not in'):
+            return (codes >= 0) & ~lookup[codes]
+        return lookup[codes]
+
+    def _term_mask(self, term, positions):
+        """Term match for the rows at positions; whole-dataset masks are cached per term across sessions"""
+        key = (self.dataset_version, str(term))
+        if positions is None:
+            return self.term_cache.get_or_compute(key, 'mask', lambda: self._compute(term, None))
+        # Narrowed candidates reuse a cached whole-dataset mask, otherwise only the candidates are evaluated
+        mask = self.term_cache.get(key, 'mask')
+        return self._compute(term, positions) if mask is None else mask[positions]
+
+    def _term_selectivity(self, term):
+        """Estimated share of all respondents matching a term, from cached answer counts"""
+        column, total = term.column, max(len(self.df), 1)
+        if self._is_numeric(column):
+            values = load_sorted_values(self.df, self.dataset_version, column)
+            targets = [float(value) for value in term.values]
+            equal = sum(np.searchsorted(values, t, 'right') - np.searchsorted(values, t, 'left') for t in targets)
+            matches = {
+                '=': equal, 'in': equal, '!=': len(values) - equal, 'not in': len(values) - equal,
+                '<': np.searchsorted(values, targets[0], 'left'), '<=': np.searchsorted(values, targets[0], 'right'),
+                '>': len(values) - np.searchsorted(values, targets[0], 'right'), '>=': len(values) - np.searchsorted(values, targets[0], 'left'),
+            }[term.op]
+            return matches / total
+
+        if term.op in ('has', 'has all'):
+            counts = load_multiselect_counts(self.df, self.dataset_version, column)
+            picked = counts.reindex(list(term.values), fill_value=0).to_numpy()
+            return (picked.min() if term.op == 'has all' else min(picked.sum(), total)) / total
+
+        counts = load_answer_counts(self.df, self.dataset_version, column)
+        matched = counts[self._answer_lookup(term, load_category_codes(self.df, self.dataset_version, column)[1])[:-1]].sum()
+        return (counts.sum() - matched if term.op in ('!=', 'not in') else matched) / total
+
+    def selectivity(self, node=None):
+        """Estimated share of all respondents matching a (sub)expression, treating terms as independent"""
+        node = self.node if node is None else node
+        if isinstance(node, Term):
+            if node not in self._selectivity:
+                self._selectivity[node] = self._term_selectivity(node)
+            return self._selectivity[node]
+        if isinstance(node, Not):
+            return 1 - self.selectivity(node.child)
+        shares = [self.selectivity(child) for child in node.children]
+        if isinstance(node, And):
+            return float(np.prod(shares))
+        return 1 - float(np.prod([1 - share for share in shares]))
+
+    def _match(self, node, positions):
+        """Indexes into positions (row positions when None) of the rows matching a node"""
+        if isinstance(node, Term):
+            return np.flatnonzero(self._term_mask(node, positions))
+        size = len(self.df) if positions is None else len(positions)
+        if isinstance(node, Not):
+            excluded = np.zeros(size, dtype=bool)
+            excluded[self._match(node.child, positions)] = True
+            return np.flatnonzero(~excluded)
+
+        if isinstance(node, And):
+            # Most selective first, so each later term only looks at the rows still in the running
+            survivors = None
+            for child in sorted(node.children, key=self.selectivity):
+                if survivors is None:
+                    survivors = self._match(child, positions)
+                else:
+                    candidates = survivors if positions is None else positions[survivors]
+                    survivors = survivors[self._match(child, candidates)]
+                if len(survivors) == 0:
+                    break
+            return survivors
+
+        # OR: broadest first, so later terms only look at the rows not yet matched
+        matched = np.zeros(size, dtype=bool)
+        undecided = None
+        for child in sorted(node.children, key=self.selectivity, reverse=True):
+            if undecided is None:
+                hits = self._match(child, positions)
+            else:
+                candidates = undecided if positions is None else positions[undecided]
+                hits = undecided[self._match(child, candidates)]
+            matched[hits] = True
+            undecided = np.flatnonzero(~matched)
+            if len(undecided) == 0:
+                break
+        return np.flatnonzero(matched)
+
+    def positions(self, candidates=None):
+        """Row positions matching the expression, among the candidate positions when given"""
+        if candidates is None:
+            return self._match(self.node, None)
+        return candidates[self._match(self.node, candidates)]
+
+def compile_filter(df, dataset_version, expression, term_cache=None, validate=True):
+    """Parse and validate a filter expression (text or syntax tree) against a dataset; None for a blank expression"""
+    if isinstance(expression, str):
+        if not expression.strip():
+            return None
+        expression = parse_filter(expression)
+    return CompiledFilter(df, dataset_version, expression, term_cache, validate)
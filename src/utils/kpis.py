@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+import streamlit as st
+from utils.ai_metrics import POSITIVE_ANSWERS, load_ai_encoding
+from utils.crosstab import load_category_codes
+from utils.multiselect import load_multiselect_matrix, cohort_counts
+
+# Single-choice columns the headline metrics count answers of
+KPI_COLUMNS = ['Country', 'AISelect', 'RemoteWork']
+
+@dataclass(frozen=True)
+class CohortKPIs:
+    """Headline metrics of one cohort, shared by the metric cards, insight cards and footer"""
+    respondents: int
+    countries: Optional[int] = None
+    avg_experience: Optional[float] = None
+    ai_percentage: Optional[float] = None
+    remote_percentage: Optional[float] = None
+    hybrid_percentage: Optional[float] = None
+    top_language: Optional[str] = None
+
+@st.cache_resource
+def load_kpi_encoding(_df, dataset_version):
+    """Stack the KPI columns' category codes into one respondent x column array, with per-column bin offsets"""
+    columns = [col for col in KPI_COLUMNS if col in _df.columns]
+    ai_encoding = load_ai_encoding(_df, dataset_version)
+    labels, blocks, offset = {}, [], 0
+    for col in columns:
+        if col in ai_encoding['offsets']:
+            # AI questions reuse the AI page's encoding, whose blocks already end with the no-answer bin
+            ai_codes = ai_encoding['codes'][:, ai_encoding['columns'].index(col)]
+            blocks.append(ai_codes - ai_encoding['offsets'][col] + offset)
+            col_labels = ai_encoding['categories'][col]
+        else:
+            codes, col_labels = load_category_codes(_df, dataset_version, col)
+            # No answer goes to the last bin of the column's block
+            blocks.append(np.where(codes >= 0, codes, len(col_labels)) + offset)
+        labels[col] = (offset, col_labels)
+        offset += len(col_labels) + 1
+
+    return {
+        'codes': np.column_stack(blocks).astype(np.int32) if blocks else np.empty((len(_df), 0), dtype=np.int32),
+        'labels': labels,
+        'bins': offset,
+        'experience': _df['YearsCodeNum'].to_numpy(dtype='float64') if 'YearsCodeNum' in _df.columns else None,
+    }
+
+def _share(counts, labels, pattern, respondents, case=True):
+    """Percentage of respondents whose answer matches the pattern"""
+    matching = labels.str.contains(pattern, case=case, regex=True)
+    return float(counts[:len(labels)][matching].sum()) / respondents * 100 if respondents else 0.0
+
+def summarize_kpis(encoding, respondents, counts, experience_total=0.0, experience_count=0, languages=None):
+    """Headline metrics from a cohort's answer bin counts, experience total and language counts"""
+    blocks = {col: (counts[offset:offset + len(labels) + 1], labels) for col, (offset, labels) in encoding['labels'].items()}
+
+    metrics = {'respondents': respondents}
+    if 'Country' in blocks:
+        country_counts, labels = blocks['Country']
+        metrics['countries'] = int(np.count_nonzero(country_counts[:len(labels)]))
+    if experience_count:
+        metrics['avg_experience'] = float(experience_total / experience_count)
+    if 'AISelect' in blocks:
+        metrics['ai_percentage'] = _share(*blocks['AISelect'], POSITIVE_ANSWERS['AISelect'], respondents, case=False)
+    if 'RemoteWork' in blocks:
+        metrics['remote_percentage'] = _share(*blocks['RemoteWork'], 'Remote', respondents, case=False)
+        metrics['hybrid_percentage'] = _share(*blocks['RemoteWork'], 'Hybrid', respondents, case=False)
+    if languages is not None and len(languages) > 0 and languages.max() > 0:
+        metrics['top_language'] = languages.idxmax()
+
+    return CohortKPIs(**metrics)
+
+def compute_kpis(df, dataset_version, positions=None):
+    """Every headline metric of a cohort from one gather and one bincount over the encoded columns"""
+    encoding = load_kpi_encoding(df, dataset_version)
+    codes, experience = encoding['codes'], encoding['experience']
+    if positions is not None:
+        codes = codes[positions]
+        experience = experience[positions] if experience is not None else None
+    counts = np.bincount(codes.ravel(), minlength=encoding['bins'])
+
+    experience = experience[~np.isnan(experience)] if experience is not None else np.empty(0)
+    languages = None
+    if 'LanguageHaveWorkedWith' in df.columns:
+        languages = cohort_counts(*load_multiselect_matrix(df, dataset_version, 'LanguageHaveWorkedWith'), positions)
+
+    return summarize_kpis(encoding, len(codes), counts, experience.sum(), len(experience), languages)
@@ -0,0 +1,39 @@
+import sys
+import numpy as np
+import pandas as pd
+from scipy.sparse import issparse
+
+def frame_footprint(df):
+    """Per-column memory of a frame (memory_usage(deep=True)), largest first"""
+    usage = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'Column': usage.index,
+        'Dtype': [str(df[col].dtype) for col in usage.index],
+        'MB': usage.to_numpy() / 1024 / 1024,
+    })
+    return report.sort_values('MB', ascending=False).reset_index(drop=True)
+
+def object_size(value):
+    """Approximate memory held by a cached object, in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if issparse(value):
+        value = value.tocsr()
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(object_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(object_size(item) for item in value)
+    return sys.getsizeof(value)
+
+def cache_footprint(caches):
+    """Memory per named cache; values are cached objects or byte counts"""
+    rows = [
+        {'Cache': name, 'MB': (value if isinstance(value, (int, float)) else object_size(value)) / 1024 / 1024}
+        for name, value in caches.items()
+    ]
+    return pd.DataFrame(rows, columns=['Cache', 'MB']).sort_values('MB', ascending=False).reset_index(drop=True)
@@ -0,0 +1,262 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.filter_cache import get_filter_cache
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Local Prometheus endpoint, configurable per deployment
+METRICS_ENABLED = os.environ.get('SURVEY_METRICS', '1') != '0'
+METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.environ.get('METRICS_PORT', 9464))
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (0, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Instrumented metrics: (type, help, histogram buckets)
+METRICS = {
+    'survey_rerun_seconds': ('histogram', 'Wall time of a page rerun', LATENCY_BUCKETS),
+    'survey_rerun_rows_scanned': ('histogram', 'Survey rows scanned while serving a page rerun', ROW_BUCKETS),
+    'survey_rows_scanned_total': ('counter', 'Survey rows scanned, by what scanned them', None),
+    'survey_cache_hits_total': ('counter', 'Calls of a st.cache_* function answered from the cache', None),
+    'survey_cache_misses_total': ('counter', 'Calls of a st.cache_* function that ran it', None),
+    'survey_section_seconds': ('histogram', 'Time to compute a Dashboard section on a filter cache miss', LATENCY_BUCKETS),
+    'survey_chart_seconds': ('histogram', 'Time to build a chart', LATENCY_BUCKETS),
+}
+
+def _escape(value):
+    """Label value escaped for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs):
+    """{name="value",...} for sorted label pairs, or nothing without labels"""
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}' if pairs else ''
+
+def _number(value):
+    """Sample value as Prometheus writes it"""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms of the app, rendered in the Prometheus text format"""
+
+    def __init__(self, definitions=METRICS):
+        self.definitions = definitions
+        self._values = {name: {} for name in definitions}
+        self._session_rows = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, **labels):
+        """Add to a counter"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[name][key] = self._values[name].get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record one observation in a histogram"""
+        buckets = self.definitions[name][2]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = self._values[name].setdefault(key, {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0})
+            histogram['buckets'][bisect_left(buckets, value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def add_session_rows(self, session, rows):
+        """Count scanned rows towards a session's current rerun"""
+        if session is None:
+            return
+        with self._lock:
+            self._session_rows[session] = self._session_rows.get(session, 0) + rows
+
+    def pop_session_rows(self, session):
+        """Rows scanned for a session since its last rerun finished"""
+        with self._lock:
+            return self._session_rows.pop(session, 0)
+
+    def render(self, collected=()):
+        """Every metric in the Prometheus text exposition format, plus (name, type, help, value) samples read at scrape time"""
+        with self._lock:
+            values = {name: {key: (dict(value, buckets=list(value['buckets'])) if isinstance(value, dict) else value)
+                             for key, value in samples.items()}
+                      for name, samples in self._values.items()}
+
+        lines = []
+        for name, (kind, help_text, buckets) in self.definitions.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            for key, value in sorted(values[name].items()):
+                if kind != 'histogram':
+                    lines.append(f'{name}{_labels(key)} {_number(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip((*buckets, float('inf')), value['buckets']):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(key + (("le", _number(float(bound))),))} {cumulative}')
+                lines.append(f'{name}_sum{_labels(key)} {_number(value["sum"])}')
+                lines.append(f'{name}_count{_labels(key)} {value["count"]}')
+        for name, kind, help_text, value in collected:
+            if value is not None:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {_number(value)}']
+        return '\n'.join(lines) + '\n'
+
+@st.cache_resource
+def get_metrics():
+    """Process-wide metrics registry shared by every session"""
+    return MetricsRegistry()
+
+def _session_id():
+    """Id of the browser session the current thread works for, if any"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+def count_rows_scanned(rows, source):
+    """Record rows read or filtered, towards the total and the current session's rerun"""
+    metrics = get_metrics()
+    metrics.inc('survey_rows_scanned_total', rows, source=source)
+    metrics.add_session_rows(_session_id(), rows)
+
+def tracked_cache(name, cache=st.cache_data):
+    """Wrap a function in a st.cache_* decorator, counting calls served from the cache as hits and the rest as misses"""
+    calls = threading.local()
+
+    def decorate(func):
+        @wraps(func)
+        def compute(*args, **kwargs):
+            calls.stack[-1] = True
+            return func(*args, **kwargs)
+
+        cached = cache(compute)
+
+        @wraps(func)
+        def call(*args, **kwargs):
+            stack = calls.__dict__.setdefault('stack', [])
+            stack.append(False)
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                get_metrics().inc('survey_cache_misses_total' if stack.pop() else 'survey_cache_hits_total', cache=name)
+
+        call.clear = cached.clear
+        return call
+    return decorate
+
+def timed_chart(func):
+    """Record how long a chart function takes, labelled with its name"""
+    @wraps(func)
+    def build(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            get_metrics().observe('survey_chart_seconds', time.perf_counter() - started, chart=func.__name__)
+    return build
+
+def timed_section(name, task, rows):
+    """Wrap a section computation to record its time and the cohort rows it goes through"""
+    def run():
+        started = time.perf_counter()
+        result = task()
+        get_metrics().observe('survey_section_seconds', time.perf_counter() - started, section=name)
+        count_rows_scanned(rows, 'sections')
+        return result
+    return run
+
+def start_rerun(page):
+    """Start timing a page rerun (and the metrics endpoint on the first one); reruns ended by st.stop() aren't recorded"""
+    start_metrics_server()
+    session = _session_id()
+    get_metrics().pop_session_rows(session)
+    return page, session, time.perf_counter()
+
+def finish_rerun(rerun):
+    """Record a page rerun's wall time and the rows scanned while serving it"""
+    page, session, started = rerun
+    metrics = get_metrics()
+    metrics.observe('survey_rerun_seconds', time.perf_counter() - started, page=page)
+    metrics.observe('survey_rerun_rows_scanned', metrics.pop_session_rows(session), page=page)
+
+def resident_memory_bytes():
+    """Current resident set size from /proc, or the peak from getrusage where there's no /proc (macOS)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+def active_sessions():
+    """Browser sessions connected to this server, or None outside a running Streamlit server"""
+    if not Runtime.exists():
+        return None
+    try:
+        return Runtime.instance()._session_mgr.num_active_sessions()
+    except AttributeError:
+        return None
+
+def scrape_metrics(filter_cache):
+    """(name, type, help, value) samples read when the endpoint is scraped"""
+    stats = filter_cache.stats()
+    return [
+        ('survey_filter_cache_hits_total', 'counter', 'Filter cache lookups answered from the cache', stats['hits']),
+        ('survey_filter_cache_misses_total', 'counter', 'Filter cache lookups that had to compute', stats['misses']),
+        ('survey_filter_cache_evictions_total', 'counter', 'Filter states evicted for space or age', stats['evictions']),
+        ('survey_filter_cache_bytes', 'gauge', 'Approximate memory held by the filter cache', stats['bytes']),
+        ('survey_filter_cache_entries', 'gauge', 'Filter states in the filter cache', stats['entries']),
+        ('process_resident_memory_bytes', 'gauge', 'Resident memory of the server process', resident_memory_bytes()),
+        ('survey_active_sessions', 'gauge', 'Browser sessions connected to the server', active_sessions()),
+    ]
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics in the Prometheus text format"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep scrapes out of the app's log"""
+
+class MetricsServer(ThreadingHTTPServer):
+    """HTTP server rendering one registry and filter cache"""
+    daemon_threads = True
+
+    def __init__(self, address, registry, filter_cache):
+        super().__init__(address, MetricsHandler)
+        self.registry = registry
+        self.filter_cache = filter_cache
+
+    def render(self):
+        """Current metrics as the endpoint serves them"""
+        return self.registry.render(scrape_metrics(self.filter_cache))
+
+@st.cache_resource
+def start_metrics_server():
+    """Serve /metrics on a local port once per server process; None if disabled or the port is taken"""
+    if not METRICS_ENABLED:
+        return None
+    try:
+        server = MetricsServer((METRICS_HOST, METRICS_PORT), get_metrics(), get_filter_cache())
+    except OSError:
+        return None
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
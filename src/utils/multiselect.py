@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy.sparse import csr_matrix
+
+# Answers that carry no technology information
+EXCLUDE_TERMS = ['unknown', 'none', 'nan', '', 'null', 'na', 'n/a', 'other']
+
+HAVE_SUFFIX = 'HaveWorkedWith'
+WANT_SUFFIX = 'WantToWorkWith'
+
+def find_have_want_pairs(columns):
+    """Map each technology category (Language, Database, ...) to its Have/Want column pair"""
+    pairs = {}
+    for col in columns:
+        if col.endswith(HAVE_SUFFIX):
+            category = col[:-len(HAVE_SUFFIX)]
+            want_col = category + WANT_SUFFIX
+            if want_col in columns:
+                pairs[category] = (col, want_col)
+    return pairs
+
+def encode_multiselect(series):
+    """Encode a semicolon-separated column as a sparse respondent x answer 0/1 matrix"""
+    # Split each distinct answer combination once, then map respondents onto combinations
+    respondent_codes, combinations = pd.factorize(series)
+    answers = pd.Series(combinations, dtype=object).astype(str).str.split(';')
+    lengths = answers.str.len().to_numpy()
+    combination_rows = np.repeat(np.arange(len(answers)), lengths)
+
+    items = pd.Series(np.concatenate(answers.to_numpy()) if len(answers) else [], dtype=object).str.strip()
+    keep = ~items.str.lower().isin(EXCLUDE_TERMS).to_numpy()
+    codes, labels = pd.factorize(items[keep])
+
+    combination_matrix = csr_matrix(
+        (np.ones(len(codes), dtype=np.float32), (combination_rows[keep], codes)),
+        shape=(len(answers), len(labels))
+    )
+    # Repeated answers within one response count once
+    combination_matrix.sum_duplicates()
+    combination_matrix.data[:] = 1
+
+    answered = np.flatnonzero(respondent_codes >= 0)
+    selector = csr_matrix(
+        (np.ones(len(answered), dtype=np.float32), (answered, respondent_codes[answered])),
+        shape=(len(series), len(answers))
+    )
+    matrix = (selector @ combination_matrix).tocsr()
+
+    return matrix, pd.Index(labels)
+
+@st.cache_resource
+def load_multiselect_matrix(_df, dataset_version, column):
+    """Encode a multi-select column of the full dataset once per dataset version"""
+    return encode_multiselect(_df[column])
+
+def cohort_positions(df, df_filtered):
+    """Row positions of a filtered cohort within the full dataset"""
+    return df.index.get_indexer(df_filtered.index)
+
+def cohort_counts(matrix, labels, positions=None):
+    """Count how many respondents in the cohort picked each answer"""
+    if positions is not None:
+        matrix = matrix[positions]
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    return pd.Series(counts, index=labels).astype('int64')
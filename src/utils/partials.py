@@ -0,0 +1,173 @@
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy.sparse import csr_matrix
+from utils.aggregates import ALL_COUNTRIES, ALL_EXPERIENCE, ALL_ROLES, cached_positions, rank_roles
+from utils.crosstab import load_category_codes
+from utils.filter_cache import filter_key
+from utils.kpis import load_kpi_encoding, summarize_kpis
+from utils.metrics import count_rows_scanned
+from utils.multiselect import find_have_want_pairs, load_multiselect_matrix
+from utils.scheduler import submit_concurrently
+from utils.tech_rankings import rank_table
+
+# Serve single-filter changes from per-value partial aggregates, configurable per deployment
+INCREMENTAL_ENABLED = os.environ.get('SURVEY_INCREMENTAL', '1') != '0'
+
+# Sidebar filter dimensions: the column each one filters on and its "everything" value
+DIMENSIONS = {
+    'country': ('Country', ALL_COUNTRIES),
+    'experience': ('ExpBucket', ALL_EXPERIENCE),
+    'role': ('DevType', ALL_ROLES),
+}
+
+def filter_state(country=ALL_COUNTRIES, experience=ALL_EXPERIENCE, role=ALL_ROLES):
+    """Sidebar filter values by dimension"""
+    return {'country': country, 'experience': experience, 'role': role}
+
+def changed_dimension(previous, current):
+    """The one dimension two filter states differ in, or None"""
+    if previous is None:
+        return None
+    changed = [dimension for dimension in DIMENSIONS if previous.get(dimension) != current[dimension]]
+    return changed[0] if len(changed) == 1 else None
+
+def slice_state(state, dimension):
+    """Filter state with one dimension opened up to every value"""
+    return {**state, dimension: DIMENSIONS[dimension][1]}
+
+def partial_columns(columns):
+    """Multi-select columns the additive sections count answers of"""
+    wanted = ['LanguageHaveWorkedWith', *find_have_want_pairs(columns).get('Language', ()), 'DevType']
+    return [col for col in dict.fromkeys(wanted) if col in columns]
+
+@st.cache_resource
+def load_dimension_groups(_df, dataset_version, dimension):
+    """Respondent x value membership matrix of a filter dimension, once per dataset version"""
+    column = DIMENSIONS[dimension][0]
+    codes, answers = load_category_codes(_df, dataset_version, column)
+    answered = np.flatnonzero(codes >= 0)
+    selector = csr_matrix(
+        (np.ones(len(answered), dtype=np.float32), (answered, codes[answered])),
+        shape=(len(_df), len(answers))
+    )
+    if dimension != 'role':
+        return selector, answers
+
+    # The role filter matches answers containing the role, so a respondent belongs to every role they mention
+    _, roles = load_multiselect_matrix(_df, dataset_version, column)
+    answer_roles = np.zeros((len(answers), len(roles)), dtype=np.float32)
+    for i, role in enumerate(roles):
+        answer_roles[:, i] = answers.str.contains(role, regex=False)
+    return (selector @ csr_matrix(answer_roles)).tocsr(), roles
+
+def build_partials(df, dataset_version, positions, dimension):
+    """Additive section inputs of a slice summed per value of a dimension; the extra last row is the whole slice"""
+    groups, labels = load_dimension_groups(df, dataset_version, dimension)
+    count_rows_scanned(len(positions), 'partials')
+    members = groups[positions].T.tocsr()
+    members.sort_indices()
+
+    def per_value(feature):
+        """Feature sums for every value of the dimension, then for the whole slice"""
+        grouped = members @ feature
+        grouped = grouped.toarray() if hasattr(grouped, 'toarray') else np.asarray(grouped)
+        return np.vstack([grouped, np.asarray(feature.sum(axis=0)).reshape(1, -1)])
+
+    # One indicator per answered KPI bin, so a value's bin counts are a matrix product away
+    encoding = load_kpi_encoding(df, dataset_version)
+    codes = encoding['codes'][positions]
+    rows, width = codes.shape
+    bins = csr_matrix(
+        (np.ones(rows * width, dtype=np.float32), codes.ravel(), np.arange(0, rows * width + 1, width)),
+        shape=(rows, encoding['bins'])
+    )
+
+    partials = {
+        'labels': labels,
+        'positions': positions,
+        'members': members,
+        'kpi_counts': np.rint(per_value(bins)).astype('int64'),
+        'counts': {
+            col: np.rint(per_value(load_multiselect_matrix(df, dataset_version, col)[0][positions])).astype('int64')
+            for col in partial_columns(df.columns)
+        },
+    }
+    if encoding['experience'] is not None:
+        years = encoding['experience'][positions]
+        answered = ~np.isnan(years)
+        partials['experience'] = per_value(np.column_stack([np.where(answered, years, 0.0), answered]))
+    return partials
+
+def sections_from_partials(df, dataset_version, partials, value):
+    """Row positions and additive Dashboard sections of one dimension value; None if the partials don't know it"""
+    labels, members = partials['labels'], partials['members']
+    if value in (ALL_COUNTRIES, ALL_EXPERIENCE, ALL_ROLES):
+        row, positions = len(labels), partials['positions']
+    else:
+        row = labels.get_indexer([value])[0]
+        if row < 0:
+            return None
+        positions = partials['positions'][members.indices[members.indptr[row]:members.indptr[row + 1]]]
+    respondents = len(positions)
+
+    counts = {
+        col: pd.Series(value_counts[row], index=load_multiselect_matrix(df, dataset_version, col)[1])
+        for col, value_counts in partials['counts'].items()
+    }
+    sections = {'positions': positions}
+    if 'DevType' in counts:
+        sections['role_counts'] = rank_roles(counts['DevType'])
+    if 'LanguageHaveWorkedWith' in counts:
+        pair = find_have_want_pairs(df.columns).get('Language')
+        sections['language_ranks'] = rank_table(*(counts[col] for col in pair), respondents) if pair else pd.DataFrame()
+
+    experience_total, experience_count = partials['experience'][row] if 'experience' in partials else (0.0, 0)
+    sections['kpis'] = summarize_kpis(
+        load_kpi_encoding(df, dataset_version), respondents, partials['kpi_counts'][row],
+        experience_total, int(experience_count), counts.get('LanguageHaveWorkedWith')
+    )
+    return sections
+
+def slice_partials(df, dataset_version, filter_cache, state, dimension, expression=None):
+    """Partials of the slice a filter state sits in along one dimension, cached under the slice's filter key"""
+    released = slice_state(state, dimension)
+    key = filter_key(dataset_version, expression=expression, **released)
+    return filter_cache.get_or_compute(key, f'partials:{dimension}', lambda: build_partials(
+        df, dataset_version, cached_positions(df, filter_cache, key, expression=expression, **released), dimension
+    ))
+
+def has_partials(dataset_version, filter_cache, state, dimension, expression=None):
+    """Whether the partials of a filter state's slice along one dimension are cached"""
+    key = filter_key(dataset_version, expression=expression, **slice_state(state, dimension))
+    return filter_cache.contains(key, f'partials:{dimension}')
+
+def fill_from_partials(df, dataset_version, filter_cache, state, previous=None, expression=None):
+    """Cache a filter state's positions and additive sections from the partials of any one dimension.
+
+    Returns the dimension the sections were read from, or None. After a change along one dimension
+    whose partials aren't cached yet, they're built in the background for the next change along it.
+    """
+    key = filter_key(dataset_version, expression=expression, **state)
+    if not INCREMENTAL_ENABLED or filter_cache.contains(key, 'kpis'):
+        return None
+
+    changed = changed_dimension(previous, state)
+    dimensions = [dimension for dimension, (column, _) in DIMENSIONS.items() if column in df.columns]
+    for dimension in sorted(dimensions, key=lambda dimension: dimension != changed):
+        if not has_partials(dataset_version, filter_cache, state, dimension, expression):
+            continue
+        partials = slice_partials(df, dataset_version, filter_cache, state, dimension, expression)
+        sections = sections_from_partials(df, dataset_version, partials, state[dimension])
+        if sections is None:
+            continue
+        for name, value in sections.items():
+            filter_cache.get_or_compute(key, name, lambda value=value: value)
+        return dimension
+
+    if changed in dimensions:
+        submit_concurrently({
+            changed: lambda: slice_partials(df, dataset_version, filter_cache, state, changed, expression)
+        })
+    return None
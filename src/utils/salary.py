@@ -0,0 +1,267 @@
+import numpy as np
+import pandas as pd
+import re
+import streamlit as st
+from utils.cleaning import clean_numeric, clean_salary, map_unique, SALARY_MIN, SALARY_MAX
+from utils.disk_cache import disk_cache
+
+CURRENCY_RATES = {
+    'USD': 1.0,
+    'EUR': 1.08,      # European Euro
+    'UAH': 0.026,     # Ukrainian hryvnia
+    'INR': 0.012,     # Indian rupee
+    'AUD': 0.65,      # Australian dollar
+    'BDT': 0.0091,    # Bangladeshi taka
+    'BRL': 0.20,      # Brazilian real
+    'GBP': 1.25,      # Pound sterling
+    'SEK': 0.095,     # Swedish krona
+    'CZK': 0.044,     # Czech koruna
+    'PLN': 0.25,      # Polish zloty
+    'HUF': 0.0028,    # Hungarian forint
+    'MYR': 0.21,      # Malaysian ringgit
+    'CHF': 1.12,      # Swiss franc
+    'EGP': 0.032,     # Egyptian pound
+    'LKR': 0.0033,    # Sri Lankan rupee
+    'RUB': 0.011,     # Russian ruble
+    'RSD': 0.0095,    # Serbian dinar
+    'JPY': 0.0067,    # Japanese yen
+    'RON': 0.22,      # Romanian leu
+    'CAD': 0.73,      # Canadian dollar
+    'UYU': 0.026,     # Uruguayan peso
+    'AED': 0.27,      # United Arab Emirates dirham
+    'ARS': 0.0012,    # Argentine peso (hyperinflation adjusted)
+    'NOK': 0.095,     # Norwegian krone
+    'CRC': 0.0019,    # Costa Rican colon
+    'PHP': 0.018,     # Philippine peso
+    'CNY': 0.14,      # Chinese Yuan Renminbi
+    'ILS': 0.27,      # Israeli new shekel
+    'BGN': 0.55,      # Bulgarian lev
+    'MAD': 0.10,      # Moroccan dirham
+    'MXN': 0.058,     # Mexican peso
+    'TRY': 0.033,     # Turkish lira
+    'BOB': 0.14,      # Bolivian boliviano
+    'NPR': 0.0075,    # Nepalese rupee
+    'ZAR': 0.053,     # South African rand
+    'TND': 0.32,      # Tunisian dinar
+    'PKR': 0.0036,    # Pakistani rupee
+    'SGD': 0.74,      # Singapore dollar
+    'PYG': 0.00014,   # Paraguayan guarani
+    'AZN': 0.59,      # Azerbaijan manat
+    'DKK': 0.14,      # Danish krone
+    'NGN': 0.00066,   # Nigerian naira
+    'IRR': 0.000024,  # Iranian rial
+    'HKD': 0.13,      # Hong Kong dollar
+    'TWD': 0.031,     # New Taiwan dollar
+    'VND': 0.000041,  # Vietnamese dong
+    'CLP': 0.0011,    # Chilean peso
+    'KRW': 0.00075,   # South Korean won
+    'COP': 0.00026,   # Colombian peso
+    'UGX': 0.00027,   # Ugandan shilling
+    'JOD': 1.41,      # Jordanian dinar
+    'IDR': 0.000064,  # Indonesian rupiah
+    'ANG': 0.56,      # Netherlands Antillean guilder
+    'MGA': 0.00022,   # Malagasy ariary
+    'DOP': 0.018,     # Dominican peso
+    'GTQ': 0.13,      # Guatemalan quetzal
+    'QAR': 0.27,      # Qatari riyal
+    'THB': 0.028,     # Thai baht
+    'BAM': 0.55,      # Bosnia and Herzegovina convertible mark
+    'AMD': 0.0025,    # Armenian dram
+    'MZN': 0.016,     # Mozambican metical
+    'KZT': 0.0021,    # Kazakhstani tenge
+    'HNL': 0.040,     # Honduran lempira
+    'GEL': 0.37,      # Georgian lari
+    'KGS': 0.011,     # Kyrgyzstani som
+    'MDL': 0.056,     # Moldovan leu
+    'GHS': 0.081,     # Ghanaian cedi
+    'DZD': 0.0074,    # Algerian dinar
+    'KES': 0.0074,    # Kenyan shilling
+    'NZD': 0.61,      # New Zealand dollar
+    'IMP': 1.25,      # Manx pound (same as GBP)
+    'XPF': 0.0094,    # CFP franc
+    'FJD': 0.45,      # Fijian dollar
+    'XCD': 0.37,      # East Caribbean dollar
+    'PEN': 0.27,      # Peruvian sol
+    'HTG': 0.0078,    # Haitian gourde
+    'BHD': 2.65,      # Bahraini dinar
+    'IQD': 0.00068,   # Iraqi dinar
+    'KHR': 0.00025,   # Cambodian riel
+    'UZS': 0.000081,  # Uzbekistani som
+    'TJS': 0.091,     # Tajikistani somoni
+    'ZMW': 0.040,     # Zambian kwacha
+    'YER': 0.0040,    # Yemeni rial
+    'ALL': 0.010,     # Albanian lek
+    'MUR': 0.022,     # Mauritian rupee
+    'LBP': 0.00066,   # Lebanese pound
+    'BYN': 0.31,      # Belarusian ruble
+    'TTD': 0.15,      # Trinidad and Tobago dollar
+    'XOF': 0.0016,    # West African CFA franc
+    'MVR': 0.065,     # Maldivian rufiyaa
+    'BWP': 0.074,     # Botswana pula
+    'RWF': 0.00081,   # Rwandan franc
+    'XAF': 0.0016,    # Central African CFA franc
+    'SAR': 0.27,      # Saudi Arabian riyal
+    'MMK': 0.00048,   # Myanmar kyat
+    'NAD': 0.053,     # Namibian dollar (same as ZAR)
+    'AFN': 0.014,     # Afghan afghani
+    'VES': 0.000036,  # Venezuelan bolivar (hyperinflation)
+    'LYD': 0.21,      # Libyan dinar
+    'CDF': 0.00037,   # Congolese franc
+    'ETB': 0.018,     # Ethiopian birr
+    'OMR': 2.60,      # Omani rial
+    'BTN': 0.012,     # Bhutanese ngultrum (same as INR)
+    'MRU': 0.027,     # Mauritanian ouguiya
+    'SYP': 0.00040,   # Syrian pound
+    'GYD': 0.0048,    # Guyanese dollar
+    'KWD': 3.25,      # Kuwaiti dinar
+    'GIP': 1.25,      # Gibraltar pound (same as GBP)
+    'MOP': 0.12,      # Macanese pataca
+    'ISK': 0.0072,    # Icelandic krona
+    'JMD': 0.0064,    # Jamaican dollar
+    'MKD': 0.018,     # Macedonian denar
+    'CUP': 0.042,     # Cuban peso
+    'LAK': 0.000048,  # Lao kip
+    'TMT': 0.29,      # Turkmen manat
+    'SZL': 0.053,     # Swazi lilangeni (same as ZAR)
+    'BBD': 0.50,      # Barbadian dollar
+    'MNT': 0.00029,   # Mongolian tugrik
+    'TZS': 0.00039,   # Tanzanian shilling
+    'BND': 0.74,      # Brunei dollar (same as SGD)
+    'SRD': 0.029,     # Surinamese dollar
+    'KPW': 0.0011,    # North Korean won
+    'BSD': 1.0,       # Bahamian dollar (same as USD)
+    'NIO': 0.027,     # Nicaraguan cordoba
+    'GMD': 0.018,     # Gambian dalasi
+    'MWK': 0.00059,   # Malawian kwacha
+    'LSL': 0.053,     # Lesotho loti (same as ZAR)
+    'AOA': 0.0012,    # Angolan kwanza
+    'SDG': 0.0017,    # Sudanese pound
+    'WST': 0.37,      # Samoan tala
+    'KYD': 1.20,      # Cayman Islands dollar
+    'PGK': 0.27,      # Papua New Guinean kina
+    'DJF': 0.0056,    # Djiboutian franc
+    'BIF': 0.00035,   # Burundi franc
+    'BZD': 0.50,      # Belize dollar
+    'HRK': 0.14,      # Croatian kuna
+    'SLL': 0.000048,  # Sierra Leonean leone
+    'CVE': 0.0098,    # Cape Verdean escudo
+    'GNF': 0.00012,   # Guinean franc
+    'Unknown': 1.0,   # Unknown currency (assume USD)
+    'none': 1.0,      # No currency specified (assume USD)
+}
+
+def extract_currency_code(currency_text):
+    """Extract 3-letter currency code from currency description"""
+    if pd.isna(currency_text) or currency_text is None:
+        return 'Unknown'
+    
+    currency_text = str(currency_text).strip()
+    
+    if currency_text == 'Unknown' or currency_text == 'none':
+        return 'Unknown'
+    
+    currency_text = currency_text.replace('\t', ' ')
+    
+    match = re.match(r'^([A-Z]{3})\b', currency_text)
+    if match:
+        code = match.group(1)
+        if code in CURRENCY_RATES:
+            return code
+    
+    for code in CURRENCY_RATES.keys():
+        if code in currency_text and code != 'Unknown' and code != 'none':
+            return code
+    
+    if 'dollar' in currency_text.lower():
+        if 'US' in currency_text or 'United States' in currency_text:
+            return 'USD'
+        elif 'Canada' in currency_text or 'Canadian' in currency_text:
+            return 'CAD'
+        elif 'Australia' in currency_text or 'Australian' in currency_text:
+            return 'AUD'
+        elif 'New Zealand' in currency_text:
+            return 'NZD'
+        elif 'Singapore' in currency_text:
+            return 'SGD'
+        else:
+            return 'USD' 
+    
+    elif 'euro' in currency_text.lower():
+        return 'EUR'
+    elif 'pound' in currency_text.lower() or 'sterling' in currency_text.lower():
+        return 'GBP'
+    elif 'yen' in currency_text.lower():
+        return 'JPY'
+    elif 'rupee' in currency_text.lower():
+        if 'India' in currency_text or 'Indian' in currency_text:
+            return 'INR'
+        elif 'Pakistan' in currency_text:
+            return 'PKR'
+        elif 'Sri Lanka' in currency_text:
+            return 'LKR'
+        elif 'Nepal' in currency_text:
+            return 'NPR'
+        else:
+            return 'INR' 
+    
+    return 'Unknown'
+
+# Salaries further than this many scaled MADs (of log salary) from their group's median are trimmed
+OUTLIER_MADS = 3.0
+# Groups smaller than this borrow the global median and MAD
+MIN_GROUP_SIZE = 10
+# Scales the MAD to a standard deviation for normally distributed data
+MAD_SCALE = 1.4826
+
+def salary_inlier_mask(salaries, groups, k=OUTLIER_MADS, min_group_size=MIN_GROUP_SIZE):
+    """Flag salaries within median ± k·MAD of their group, computed on log salaries"""
+    log_salaries = np.log10(salaries)
+    grouped = log_salaries.groupby(groups, observed=True)
+    median = grouped.transform('median')
+    size = grouped.transform('size')
+    deviation = (log_salaries - median).abs()
+    mad = deviation.groupby(groups, observed=True).transform('median') * MAD_SCALE
+    
+    global_median = log_salaries.median()
+    global_mad = (log_salaries - global_median).abs().median() * MAD_SCALE
+    
+    small = size.isna() | (size < min_group_size)
+    median = median.mask(small, global_median)
+    mad = mad.mask(small | (mad <= 0), global_mad)
+    
+    return (log_salaries - median).abs() <= k * mad
+
+def convert_all_salaries_to_usd(df, salary_col, currency_col, group_col='Country'):
+    """Convert all salaries in dataframe to USD"""
+    currency_codes = map_unique(df[currency_col], lambda values: values.map(extract_currency_code))
+    amounts = clean_salary(df[salary_col])
+    rates = currency_codes.map(CURRENCY_RATES).fillna(1.0).astype('float64')
+    # Salaries without a stated currency can't be converted, so they drop out like missing amounts
+    known = amounts.notna() & df[currency_col].notna()
+    usd_salaries = (amounts * rates).where(known)
+    usd_salaries = usd_salaries.where((usd_salaries >= SALARY_MIN) & (usd_salaries <= SALARY_MAX))
+    
+    df_usd = df.copy()
+    df_usd['Salary_USD'] = usd_salaries
+    df_usd['Currency_Code'] = currency_codes.where(known)
+    
+    df_usd = df_usd.dropna(subset=['Salary_USD'])
+    
+    if len(df_usd) > 10:
+        # Trim outliers per country (or per currency) instead of against the global mean
+        if group_col not in df_usd.columns:
+            group_col = 'Currency_Code'
+        df_usd = df_usd[salary_inlier_mask(df_usd['Salary_USD'], df_usd[group_col])]
+    
+    return df_usd
+
+@st.cache_data
+@disk_cache(depends=[
+    convert_all_salaries_to_usd, salary_inlier_mask, extract_currency_code, map_unique, clean_salary,
+    clean_numeric, CURRENCY_RATES, SALARY_MIN, SALARY_MAX, OUTLIER_MADS, MIN_GROUP_SIZE, MAD_SCALE
+])
+def load_usd_salaries(_df, dataset_version, salary_col, currency_col, group_col='Country'):
+    """Convert and trim every salary in the dataset once per dataset version"""
+    columns = [col for col in [salary_col, currency_col, group_col] if col in _df.columns]
+    df_usd = convert_all_salaries_to_usd(_df[columns], salary_col, currency_col, group_col)
+    return df_usd[['Salary_USD', 'Currency_Code']]
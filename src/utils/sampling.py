@@ -0,0 +1,70 @@
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Preview sample size, and the cohort size above which the Dashboard previews before computing exactly
+PREVIEW_ENABLED = os.environ.get('SURVEY_PROGRESSIVE', '1') != '0'
+PREVIEW_SAMPLE_SIZE = int(os.environ.get('PREVIEW_SAMPLE_SIZE', 20000))
+PREVIEW_MIN_ROWS = int(os.environ.get('PREVIEW_MIN_ROWS', 100000))
+
+STRATA = ['Country', 'ExpBucket']
+
+# Two-sided 95% normal quantile for the error margins
+Z_95 = 1.96
+
+def stratified_positions(df, size, strata=STRATA, seed=0):
+    """Row positions of a proportional stratified sample, so every stratum keeps its share of the data"""
+    if size >= len(df):
+        return np.arange(len(df))
+
+    strata = [col for col in strata if col in df.columns]
+    if strata:
+        stratum = df.groupby(strata, observed=True, dropna=False, sort=False).ngroup().to_numpy()
+    else:
+        stratum = np.zeros(len(df), dtype=np.int64)
+    sizes = np.bincount(stratum)
+
+    # Largest-remainder allocation keeps the total at exactly `size`
+    quotas = sizes * size / len(df)
+    allocation = np.floor(quotas).astype(np.int64)
+    shortfall = size - allocation.sum()
+    allocation[np.argsort(-(quotas - allocation), kind='stable')[:shortfall]] += 1
+
+    # Shuffle once, then keep the first `allocation` rows of each stratum
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(df))
+    order = order[np.argsort(stratum[order], kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(len(df)) - np.repeat(starts, sizes)
+    keep = rank < np.repeat(allocation, sizes)
+    return np.sort(order[keep])
+
+@st.cache_resource
+def load_stratified_sample(_df, dataset_version, size=PREVIEW_SAMPLE_SIZE):
+    """Stratified sample of the full dataset, drawn once per dataset version"""
+    return _df.iloc[stratified_positions(_df, size)]
+
+def sample_version(dataset_version):
+    """Dataset version key of the preview sample, so per-version caches can build on it separately"""
+    return (dataset_version, 'sample')
+
+def proportion_margin(percentage, sample_size, population_size):
+    """95% margin of error, in percentage points, of a share estimated from a simple random sample"""
+    if percentage is None or sample_size == 0:
+        return None
+    p = percentage / 100
+    fpc = (population_size - sample_size) / max(population_size - 1, 1)
+    return Z_95 * np.sqrt(p * (1 - p) / sample_size * max(fpc, 0)) * 100
+
+def mean_margin(values, population_size):
+    """95% margin of error of a mean estimated from a sample"""
+    values = pd.Series(values).dropna()
+    if len(values) < 2:
+        return None
+    fpc = (population_size - len(values)) / max(population_size - 1, 1)
+    return Z_95 * values.std() / np.sqrt(len(values)) * np.sqrt(max(fpc, 0))
+
+def scale_counts(counts, sample_size, population_size):
+    """Scale counts observed in a sample up to the population"""
+    return (counts * (population_size / max(sample_size, 1))).round().astype('int64')
@@ -0,0 +1,32 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Section computations are mostly pandas/numpy work that releases the GIL
+MAX_WORKERS = int(os.environ.get('AGGREGATE_WORKERS', min(8, (os.cpu_count() or 1) + 2)))
+
+@st.cache_resource
+def get_executor():
+    """Process-wide thread pool for section aggregates"""
+    return ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='aggregates')
+
+def _with_script_context(task, ctx):
+    """Let a worker thread use st.cache_* on behalf of the session that scheduled it"""
+    def run():
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return task()
+    return run
+
+def submit_concurrently(tasks, executor=None):
+    """Start independent zero-argument tasks on the pool and return their futures by name"""
+    executor = executor or get_executor()
+    ctx = get_script_run_ctx()
+    return {name: executor.submit(_with_script_context(task, ctx)) for name, task in tasks.items()}
+
+def run_concurrently(tasks, executor=None):
+    """Run independent zero-argument tasks on the pool and return their results by name"""
+    futures = submit_concurrently(tasks, executor)
+    return {name: future.result() for name, future in futures.items()}
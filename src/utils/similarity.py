@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+import uuid
+import zipfile
+import streamlit as st
+from scipy.sparse import hstack, diags, load_npz, save_npz
+from utils.data_loader import CACHE_DIR
+from utils.disk_cache import DATASET_CODE, source_hash
+from utils.multiselect import encode_multiselect, EXCLUDE_TERMS
+
+# Multi-select answers that make up a developer's tech profile
+PROFILE_COLUMNS = {
+    'Language': 'LanguageHaveWorkedWith',
+    'Database': 'DatabaseHaveWorkedWith',
+    'Platform': 'PlatformHaveWorkedWith',
+    'Webframe': 'WebframeHaveWorkedWith',
+}
+
+def build_profile_index(df):
+    """Stack the profile columns into one row-normalized sparse matrix for cosine similarity"""
+    blocks = []
+    labels = []
+    for category, column in PROFILE_COLUMNS.items():
+        if column in df.columns:
+            matrix, answers = encode_multiselect(df[column])
+            blocks.append(matrix)
+            labels.extend(f"{category}: {answer}" for answer in answers)
+
+    matrix = hstack(blocks, format='csr', dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix = (diags(1 / norms) @ matrix).tocsr().astype(np.float32)
+
+    return {'matrix': matrix, 'labels': pd.Index(labels)}
+
+def _write_atomically(path, write):
+    """Write a file under a temporary name and rename it into place, so readers never see half of it"""
+    partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.partial")
+    try:
+        write(partial)
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+def _save_matrix(path, matrix):
+    """save_npz through a file handle, since it would append .npz to a temporary name"""
+    with open(path, 'wb') as f:
+        save_npz(f, matrix)
+
+@st.cache_resource
+def load_profile_index(_df, dataset_version):
+    """Load the profile index for this dataset version from disk, building and persisting it if missing"""
+    # The code that builds the index is part of the name, so a changed encoder never reads an old index
+    code = source_hash([build_profile_index, encode_multiselect, PROFILE_COLUMNS, EXCLUDE_TERMS])
+    stem = f"profiles-{dataset_version}-{DATASET_CODE}-{code}"
+    matrix_path = CACHE_DIR / f"{stem}.npz"
+    labels_path = CACHE_DIR / f"{stem}.json"
+
+    if matrix_path.exists() and labels_path.exists():
+        try:
+            index = {
+                'matrix': load_npz(matrix_path).tocsr(),
+                'labels': pd.Index(json.loads(labels_path.read_text()))
+            }
+            if index['matrix'].shape[1] == len(index['labels']):
+                return index
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Unreadable, so rebuild and overwrite it
+            pass
+
+    index = build_profile_index(_df)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Labels first: a matrix on disk always has its labels next to it
+        _write_atomically(labels_path, lambda path: path.write_text(json.dumps(index['labels'].tolist())))
+        _write_atomically(matrix_path, lambda path: _save_matrix(path, index['matrix']))
+    except OSError:
+        # Read-only deployments keep the in-memory index only
+        pass
+    return index
+
+def find_similar_developers(df, index, stack, country=None, experience=None, k=50):
+    """Return the k respondents whose tech profile is most similar to the given stack"""
+    positions = index['labels'].get_indexer(stack)
+    query = np.zeros(len(index['labels']), dtype=np.float32)
+    query[positions[positions >= 0]] = 1
+    if not query.any():
+        return df.iloc[0:0].assign(Similarity=pd.Series(dtype='float32'))
+    query /= np.linalg.norm(query)
+
+    scores = index['matrix'] @ query
+
+    # Restrict candidates to the requested country and experience bucket
+    candidates = np.ones(len(df), dtype=bool)
+    if country and 'Country' in df.columns:
+        candidates &= (df['Country'] == country).to_numpy()
+    if experience and 'ExpBucket' in df.columns:
+        candidates &= (df['ExpBucket'] == experience).to_numpy()
+    scores = np.where(candidates, scores, -1)
+
+    k = min(k, int(candidates.sum()))
+    if k == 0:
+        return df.iloc[0:0].assign(Similarity=pd.Series(dtype='float32'))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+
+    return df.iloc[top].assign(Similarity=scores[top])
+
+def summarize_neighbours(neighbours, salaries):
+    """Salary quantiles and AI-usage distribution of a set of similar respondents"""
+    summary = {'count': len(neighbours)}
+
+    neighbour_salaries = salaries.reindex(neighbours.index).dropna() if salaries is not None else pd.Series(dtype='float64')
+    summary['salary'] = neighbour_salaries.quantile([0.25, 0.5, 0.75]) if len(neighbour_salaries) else pd.Series(dtype='float64')
+    summary['salary_count'] = len(neighbour_salaries)
+
+    if 'AISelect' in neighbours.columns:
+        summary['ai_usage'] = neighbours['AISelect'].value_counts(normalize=True).loc[lambda s: s > 0] * 100
+    else:
+        summary['ai_usage'] = pd.Series(dtype='float64')
+
+    return summary
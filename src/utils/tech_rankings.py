@@ -0,0 +1,50 @@
+import pandas as pd
+from utils.multiselect import find_have_want_pairs, load_multiselect_matrix, cohort_counts
+
+def rank_table(have_counts, want_counts, cohort_size):
+    """Build have/want ranks, rank delta and share delta for every technology at once"""
+    table = pd.DataFrame({'have_count': have_counts, 'want_count': want_counts}).fillna(0).astype('int64')
+    table = table[(table['have_count'] > 0) | (table['want_count'] > 0)]
+
+    denominator = max(cohort_size, 1)
+    table['have_share'] = table['have_count'] / denominator * 100
+    table['want_share'] = table['want_count'] / denominator * 100
+    table['have_rank'] = table['have_count'].rank(method='min', ascending=False).astype('int64')
+    table['want_rank'] = table['want_count'].rank(method='min', ascending=False).astype('int64')
+
+    # Positive deltas: ranked higher in the wanted list than in current use
+    table['rank_delta'] = table['have_rank'] - table['want_rank']
+    table['share_delta'] = table['want_share'] - table['have_share']
+
+    return table.sort_values(['have_rank', 'want_rank'])
+
+def compute_tech_rankings(df, dataset_version, category, positions=None):
+    """Rank table for one technology category (Language, Database, ...) and cohort"""
+    pairs = find_have_want_pairs(df.columns)
+    if category not in pairs:
+        return pd.DataFrame()
+
+    have_col, want_col = pairs[category]
+    have_counts = cohort_counts(*load_multiselect_matrix(df, dataset_version, have_col), positions)
+    want_counts = cohort_counts(*load_multiselect_matrix(df, dataset_version, want_col), positions)
+    cohort_size = len(df) if positions is None else len(positions)
+
+    return rank_table(have_counts, want_counts, cohort_size)
+
+def compute_all_tech_rankings(df, dataset_version, positions=None):
+    """Rank tables for every Have/Want column pair in the dataset"""
+    return {
+        category: compute_tech_rankings(df, dataset_version, category, positions)
+        for category in find_have_want_pairs(df.columns)
+    }
+
+def trending_technologies(table, top_n=10):
+    """Technologies in the top N of both lists that rank higher in the wanted list"""
+    if table.empty:
+        return table
+    trending = table[
+        (table['have_rank'] <= top_n) &
+        (table['want_rank'] <= top_n) &
+        (table['rank_delta'] > 0)
+    ]
+    return trending.sort_values('want_rank')
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Free-text answer columns
+TEXT_COLUMN_SUFFIX = 'Open'
+
+SEARCH_MODES = ['ranked', 'keyword']
+
+def find_text_columns(columns):
+    """Free-text answer columns (AIOpen, ...)"""
+    return [col for col in columns if col.endswith(TEXT_COLUMN_SUFFIX)]
+
+def build_text_index(series):
+    """Build a TF-IDF matrix and an inverted (term -> documents) index over the non-empty answers"""
+    answers = series.dropna().astype(str)
+    answers = answers[answers.str.len() > 0]
+
+    vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True, min_df=1, dtype=np.float32)
+    tfidf = vectorizer.fit_transform(answers.to_numpy()).tocsr()
+
+    # Column-major copy: each term's column lists the documents that contain it
+    inverted = (tfidf > 0).tocsc()
+
+    return {
+        'vectorizer': vectorizer,
+        'analyzer': vectorizer.build_analyzer(),
+        'tfidf': tfidf,
+        'inverted': inverted,
+        'terms': vectorizer.get_feature_names_out(),
+        'positions': series.index.get_indexer(answers.index),
+        'texts': answers.to_numpy(),
+    }
+
+@st.cache_resource
+def load_text_index(_df, dataset_version, column):
+    """Build the text index for a column of the full dataset once per dataset version"""
+    return build_text_index(_df[column])
+
+def _cohort_documents(index, positions):
+    """Boolean mask over documents whose respondent belongs to the cohort"""
+    if positions is None:
+        return np.ones(len(index['positions']), dtype=bool)
+    return np.isin(index['positions'], positions)
+
+def cohort_documents(index, positions=None):
+    """Document numbers of the cohort's answers, in survey order"""
+    return np.flatnonzero(_cohort_documents(index, positions))
+
+def search_text(index, query, mode='ranked', positions=None):
+    """Return matching document numbers and scores, best first, without scanning the raw strings"""
+    empty = (np.array([], dtype=np.int64), np.array([], dtype=np.float32))
+    terms = [index['vectorizer'].vocabulary_.get(term) for term in index['analyzer'](query)]
+    if not terms:
+        return empty
+
+    cohort = _cohort_documents(index, positions)
+
+    if mode == 'keyword':
+        # Every query term must appear: intersect the posting lists
+        if any(term is None for term in terms):
+            return empty
+        inverted = index['inverted']
+        matches = None
+        for term in set(terms):
+            postings = inverted.indices[inverted.indptr[term]:inverted.indptr[term + 1]]
+            matches = postings if matches is None else np.intersect1d(matches, postings, assume_unique=True)
+        matches = matches[cohort[matches]]
+        scores = np.asarray(index['tfidf'][matches][:, list(set(terms))].sum(axis=1)).ravel()
+    else:
+        query_vector = index['vectorizer'].transform([query])
+        scores = (index['tfidf'] @ query_vector.T).toarray().ravel()
+        matches = np.flatnonzero((scores > 0) & cohort)
+        scores = scores[matches]
+
+    order = np.argsort(-scores, kind='stable')
+    return matches[order], scores[order]
+
+def top_terms(index, positions=None, n=20):
+    """Highest total TF-IDF weight terms among the cohort's answers"""
+    cohort = _cohort_documents(index, positions)
+    weights = np.asarray(index['tfidf'][np.flatnonzero(cohort)].sum(axis=0)).ravel()
+    top = np.argsort(-weights, kind='stable')[:n]
+    top = top[weights[top] > 0]
+    return pd.Series(weights[top], index=index['terms'][top])
+
+def paginate(index, documents, scores, page=1, page_size=10):
+    """Slice one page of search results into a small frame of answers"""
+    start = (max(page, 1) - 1) * page_size
+    page_documents = documents[start:start + page_size]
+    return pd.DataFrame({
+        'Response': index['texts'][page_documents],
+        'Score': scores[start:start + page_size],
+    }, index=np.arange(start + 1, start + 1 + len(page_documents)))
@@ -1,8 +1,12 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 import streamlit as st
 from plotly.subplots import make_subplots
+from utils.cleaning import experience_bucket
+from utils.figures import bar_chart, pie_chart
+from utils.metrics import timed_chart
 
 def extract_tech_data(df, column_name):
     """Extract technology data from a column with semicolon-separated values"""
@@ -17,6 +21,7 @@ def extract_tech_data(df, column_name):
     
     return tech_series.value_counts()
 
+@timed_chart
 def plot_top_tech(df, column_name, title, top_n=10):
     """Plot top technologies from a column"""
     tech_counts = extract_tech_data(df, column_name).head(top_n)
@@ -24,24 +29,12 @@ def plot_top_tech(df, column_name, title, top_n=10):
     if len(tech_counts) == 0:
         return None
     
-    fig = px.bar(
-        x=tech_counts.values,
-        y=tech_counts.index,
-        orientation='h',
-        title=title,
-        labels={'x': 'Count', 'y': 'Technology'},
-        color=tech_counts.values,
-        color_continuous_scale='viridis'
+    return bar_chart(
+        tech_counts.values, tech_counts.index, title, 'Count', 'Technology',
+        orientation='h', colorscale='viridis'
     )
-    
-    fig.update_layout(
-        height=400,
-        yaxis={'categoryorder': 'total ascending'},
-        showlegend=False
-    )
-    
-    return fig
 
+@timed_chart
 def plot_tech_comparison(df, have_col, want_col, title):
     """Compare technologies between have and want columns"""
     if have_col not in df.columns or want_col not in df.columns:
@@ -89,136 +82,251 @@ def plot_tech_comparison(df, have_col, want_col, title):
     
     return fig
 
-def plot_age_distribution(df):
-    """Plot age distribution"""
-    if 'Age' not in df.columns:
+@timed_chart
+def plot_tech_usage(df, title, column_name, top_n=15):
+    """Plot the share of developers using each of the top N technologies"""
+    tech_counts = extract_tech_data(df, column_name).head(top_n)
+    
+    if len(tech_counts) == 0:
         return None
     
-    age_counts = df['Age'].value_counts()
+    percentages = (tech_counts / max(len(df), 1) * 100).round(1)
     
-    # Define age order
-    age_order = [
-        '18-24 years old',
-        '25-34 years old', 
-        '35-44 years old',
-        '45-54 years old',
-        '55-64 years old',
-        '65 years or older'
-    ]
+    return bar_chart(
+        percentages.values, percentages.index, title, '% of Developers', 'Technology',
+        orientation='h', text=[f"{p}%" for p in percentages], height=500
+    )
+
+@timed_chart
+def plot_have_vs_want(rankings, title, top_n=15):
+    """Compare current use and desire to use from a rank table (see utils.tech_rankings)"""
+    if rankings is None or rankings.empty:
+        return None
     
-    # Reorder based on age order
-    age_counts = age_counts.reindex(age_order).dropna()
+    top = rankings.head(top_n)
     
-    fig = px.pie(
-        values=age_counts.values,
-        names=age_counts.index,
-        title='Age Distribution of Developers',
-        hole=0.3
-    )
+    fig = go.Figure()
     
-    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.add_trace(go.Bar(
+        x=top.index,
+        y=top['have_share'],
+        name='Currently Use',
+        marker_color='#F48024'
+    ))
+    
+    fig.add_trace(go.Bar(
+        x=top.index,
+        y=top['want_share'],
+        name='Want to Use',
+        marker_color='#7C3AED',
+        customdata=top['rank_delta'],
+        hovertemplate='%{x}: %{y:.1f}% (rank change %{customdata:+d})<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        barmode='group',
+        height=500,
+        xaxis_tickangle=-45,
+        yaxis_title='% of Developers'
+    )
     
     return fig
 
-def plot_experience_distribution(df):
-    """Plot coding experience distribution"""
-    if 'YearsCodeNum' not in df.columns:
+@timed_chart
+def plot_cooccurrence_heatmap(matrix_df, title, hide_diagonal=True):
+    """Plot a technology co-occurrence matrix (see utils.cooccurrence) as a heatmap"""
+    if matrix_df is None or matrix_df.empty:
         return None
     
-    # Create experience groups
-    df_copy = df.copy()
-    df_copy['ExpGroup'] = pd.cut(
-        df_copy['YearsCodeNum'],
-        bins=[0, 2, 5, 10, 20, 100],
-        labels=['0-2 years', '3-5 years', '6-10 years', '11-20 years', '20+ years'],
-        include_lowest=True
+    values = matrix_df.to_numpy(dtype='float64')
+    if hide_diagonal:
+        values = values.copy()
+        np.fill_diagonal(values, np.nan)
+    
+    fig = go.Figure(go.Heatmap(
+        z=values,
+        x=matrix_df.columns,
+        y=matrix_df.index,
+        colorscale='Oranges',
+        hovertemplate='%{y} + %{x}: %{z:.2f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        height=600,
+        xaxis_tickangle=-45,
+        yaxis={'autorange': 'reversed'}
     )
     
-    exp_counts = df_copy['ExpGroup'].value_counts().sort_index()
+    return fig
+
+@timed_chart
+def plot_crosstab_heatmap(table, title, value_label='%'):
+    """Plot a crosstab (see utils.crosstab) as a heatmap"""
+    if table is None or table.empty:
+        return None
     
-    fig = px.bar(
-        x=exp_counts.index,
-        y=exp_counts.values,
-        title='Years of Coding Experience',
-        labels={'x': 'Experience Range', 'y': 'Number of Developers'},
-        text=exp_counts.values
-    )
+    fig = go.Figure(go.Heatmap(
+        z=table.to_numpy(dtype='float64'),
+        x=table.columns,
+        y=table.index,
+        colorscale='Oranges',
+        hovertemplate=f'%{{y}} / %{{x}}: %{{z:.1f}} {value_label}<extra></extra>'
+    ))
     
-    fig.update_traces(
-        marker_color='#F48024',
-        textposition='outside'
+    fig.update_layout(
+        title=title,
+        height=500,
+        xaxis_tickangle=-45,
+        yaxis={'autorange': 'reversed'}
     )
     
+    return fig
+
+@timed_chart
+def plot_remote_work_by_orgsize(table):
+    """Plot the remote/hybrid/in-person split per organization size from a row-normalized crosstab"""
+    if table is None or table.empty:
+        return None
+    
+    fig = go.Figure()
+    
+    for arrangement in table.columns:
+        fig.add_trace(go.Bar(
+            x=table[arrangement],
+            y=table.index,
+            orientation='h',
+            name=arrangement,
+            hovertemplate='%{y}: %{x:.1f}%<extra></extra>'
+        ))
+    
     fig.update_layout(
+        title='Work Arrangement by Organization Size',
+        barmode='stack',
         height=500,
-        xaxis_tickangle=-45
+        xaxis_title='% of Developers',
+        yaxis={'autorange': 'reversed'},
+        colorway=['#F48024', '#7C3AED', '#10B981', '#6B7280']
     )
     
     return fig
 
+@timed_chart
+def plot_ai_adoption_by_experience(metrics):
+    """Plot the share of AI tool and agent users per experience bucket (see utils.ai_metrics)"""
+    by_experience = metrics['by_experience']
+    if by_experience.empty or 'AISelect' not in by_experience.columns:
+        return None
+    
+    names = {'AISelect': 'Use AI tools', 'AIAgents': 'Use AI agents', 'AIAcc': 'Trust AI accuracy'}
+    fig = go.Figure()
+    
+    for col, name in names.items():
+        if col in by_experience.columns:
+            fig.add_trace(go.Bar(
+                x=by_experience.index,
+                y=by_experience[col],
+                name=name,
+                hovertemplate='%{x}: %{y:.1f}%<extra></extra>'
+            ))
+    
+    fig.update_layout(
+        title='AI Adoption by Years of Coding Experience',
+        barmode='group',
+        height=500,
+        yaxis_title='% of Developers',
+        colorway=['#F48024', '#7C3AED', '#10B981']
+    )
+    
+    return fig
 
-    """Plot top countries by developer count (excluding 'Unknown')"""
-
-    filtered_df = df[
-        df['Country'].notna() &
-        (df['Country'].str.strip().str.lower() != 'unknown')
-    ]
-
-    country_counts = filtered_df['Country'].value_counts().head(top_n)
-
-    fig = px.bar(
-        country_counts,
-        x=country_counts.values,
-        y=country_counts.index,
-        orientation='h',
-        title=f'Top {top_n} Countries by Developer Count',
-        labels={'x': 'Number of Developers', 'y': 'Country'},
-        color=country_counts.values,
-        color_continuous_scale='viridis'
+@timed_chart
+def plot_ai_sentiment(metrics):
+    """Plot the distribution of sentiment toward AI tools"""
+    sentiment = metrics['sentiment']
+    if len(sentiment) == 0:
+        return None
+    
+    return pie_chart(
+        sentiment.values, sentiment.index, 'Sentiment Toward AI Tools',
+        hole=0.4, colors=px.colors.diverging.RdYlGn[::-1], sort=False
     )
 
+def _plot_matrix_question(counts, title, top_n=10):
+    """Stacked bars of answer levels for the top N items of a matrix question"""
+    if counts is None or counts.empty:
+        return None
+    
+    top = counts.loc[counts.sum(axis=1).sort_values(ascending=False).index[:top_n]]
+    fig = go.Figure()
+    
+    for level in top.columns:
+        fig.add_trace(go.Bar(
+            x=top[level],
+            y=top.index,
+            orientation='h',
+            name=level
+        ))
+    
     fig.update_layout(
+        title=title,
+        barmode='stack',
         height=500,
-        xaxis_title="Number of Developers",
-        yaxis_title="Country",
-        showlegend=False
+        xaxis_title='Number of Developers',
+        yaxis={'categoryorder': 'total ascending'}
     )
-
+    
     return fig
 
+@timed_chart
+def plot_ai_workflow_integration(metrics, top_n=10):
+    """Plot how AI is used across development tasks"""
+    return _plot_matrix_question(metrics['workflow'], 'AI Use Across the Development Workflow', top_n)
 
+@timed_chart
+def plot_ai_agent_impact(metrics, top_n=10):
+    """Plot developers' views on the impact of AI agents"""
+    return _plot_matrix_question(metrics['agent_impact'], 'Impact of AI Agents on Developer Work', top_n)
 
-    """Plot coding experience distribution"""
-    # Clean and categorize experience
-    df_exp = df.copy()
-    df_exp['YearsCodeGroup'] = pd.cut(
-        pd.to_numeric(df_exp['YearsCode'], errors='coerce'),
-        bins=[0, 2, 5, 10, 20, 50],
-        labels=['0-2 years', '3-5 years', '6-10 years', '11-20 years', '20+ years']
-    )
+@timed_chart
+def plot_age_distribution(df):
+    """Plot age distribution"""
+    if 'Age' not in df.columns:
+        return None
     
-    exp_counts = df_exp['YearsCodeGroup'].value_counts().sort_index()
+    age_counts = df['Age'].value_counts()
     
-    fig = px.bar(
-        x=exp_counts.index,
-        y=exp_counts.values,
-        title='Years of Coding Experience',
-        labels={'x': 'Experience Range', 'y': 'Number of Developers'},
-        text=exp_counts.values
-    )
+    # Define age order
+    age_order = [
+        '18-24 years old',
+        '25-34 years old', 
+        '35-44 years old',
+        '45-54 years old',
+        '55-64 years old',
+        '65 years or older'
+    ]
     
-    fig.update_traces(
-        marker_color='#F48024',
-        textposition='outside'
-    )
+    # Reorder based on age order
+    age_counts = age_counts.reindex(age_order).dropna()
     
-    fig.update_layout(
-        height=400,
-        xaxis_tickangle=-45
-    )
+    return pie_chart(age_counts.values, age_counts.index, 'Age Distribution of Developers', hole=0.3)
+
+@timed_chart
+def plot_experience_distribution(df):
+    """Plot coding experience distribution"""
+    if 'YearsCodeNum' not in df.columns:
+        return None
     
-    return fig
+    # Create experience groups
+    exp_counts = experience_bucket(df['YearsCodeNum']).value_counts().sort_index()
+    
+    return bar_chart(
+        exp_counts.index, exp_counts.values, 'Years of Coding Experience', 'Experience Range', 'Number of Developers',
+        text=exp_counts.values, textposition='outside', xaxis={'tickangle': -45}
+    )
 
+@timed_chart
 def plot_country_distribution(df, top_n=10):
     """Plot top countries with correct Stack Overflow percentage logic"""
 
@@ -236,27 +344,13 @@ def plot_country_distribution(df, top_n=10):
 
     percentages = (country_counts / total_respondents * 100).round(1)
 
-    fig = px.bar(
-        country_counts,
-        x=country_counts.values,
-        y=country_counts.index,
-        orientation='h',
-        title=f'Top {top_n} Countries by Developer Count',
-        labels={'x': 'Number of Developers', 'y': 'Country'},
-        text=[f"{p}%" for p in percentages],
-        color=country_counts.values,
-        color_continuous_scale='viridis'
-    )
-
-    fig.update_traces(textposition='auto')
-
-    fig.update_layout(
-        height=500,
-        showlegend=False
+    return bar_chart(
+        country_counts.values, country_counts.index, f'Top {top_n} Countries by Developer Count',
+        'Number of Developers', 'Country', orientation='h', text=[f"{p}%" for p in percentages],
+        colorscale='viridis', height=500, sort=False
     )
 
-    return fig
-
+@timed_chart
 def plot_education_distribution(df):
     """Plot education level breakdown"""
 
@@ -272,8 +366,7 @@ def plot_education_distribution(df):
         'Something else': 'Other'
     }
 
-    df = df.copy()
-    df['EdLevelClean'] = df['EdLevel'].map(education_map).fillna('Other')
+    ed_level_clean = df['EdLevel'].astype(object).map(education_map).fillna('Other')
 
     education_order = [
         'Associate degree',
@@ -286,18 +379,9 @@ def plot_education_distribution(df):
         'Other'
     ]
 
-    edu_counts = df['EdLevelClean'].value_counts().reindex(education_order)
+    edu_counts = ed_level_clean.value_counts().reindex(education_order)
 
-    fig = px.bar(
-        y=edu_counts.index,
-        x=edu_counts.values,
-        orientation='h',
-        title='Education Level Distribution',
-        labels={'x': 'Number of Developers', 'y': 'Education Level'},
-        color=edu_counts.values,
-        color_continuous_scale='blues'
+    return bar_chart(
+        edu_counts.values, edu_counts.index, 'Education Level Distribution', 'Number of Developers', 'Education Level',
+        orientation='h', colorscale='blues', sort=False
     )
-
-    fig.update_layout(height=400)
-
-    return fig
@@ -0,0 +1,160 @@
+import os
+import time
+import threading
+import pandas as pd
+import streamlit as st
+from utils.aggregates import (
+    ALL_COUNTRIES, ALL_EXPERIENCE, ALL_ROLES,
+    cohort_frame, offered_roles, role_options, select_salary_columns, dashboard_tasks, split_roles,
+)
+from utils.filter_cache import get_filter_cache, filter_key
+from utils.multiselect import cohort_positions
+
+# Warm-up size and budget, configurable per deployment
+WARMUP_ENABLED = os.environ.get('SURVEY_WARMUP', '1') != '0'
+WARMUP_TOP_COUNTRIES = int(os.environ.get('WARMUP_TOP_COUNTRIES', 10))
+WARMUP_TOP_ROLES = int(os.environ.get('WARMUP_TOP_ROLES', 5))
+WARMUP_MAX_STATES = int(os.environ.get('WARMUP_MAX_STATES', 60))
+WARMUP_SECONDS = float(os.environ.get('WARMUP_SECONDS', 300))
+WARMUP_CPU_FRACTION = float(os.environ.get('WARMUP_CPU_FRACTION', 0.5))
+
+def popular_filter_states(df, top_countries=WARMUP_TOP_COUNTRIES, top_roles=WARMUP_TOP_ROLES, max_states=WARMUP_MAX_STATES):
+    """(country, experience, role) filter states over the top countries and the top roles the sidebar offers, most respondents first"""
+    if 'Country' not in df.columns or 'ExpBucket' not in df.columns:
+        return [(ALL_COUNTRIES, ALL_EXPERIENCE, ALL_ROLES)]
+
+    countries = df['Country'].value_counts().head(top_countries).index
+    frame = pd.DataFrame({
+        'Country': df['Country'].astype(object),
+        'ExpBucket': df['ExpBucket'].astype(object),
+    })
+    frame = frame[frame['Country'].isin(countries)]
+
+    levels = [frame.assign(Role=ALL_ROLES)]
+    if 'DevType' in df.columns:
+        roles = split_roles(df['DevType'])
+        # Only roles the sidebar lists can be selected, however many respondents pick the others
+        roles = roles[roles.isin(offered_roles(roles)[1:])]
+        top = roles.value_counts().head(top_roles).index
+        roles = roles[roles.isin(top)]
+        levels.append(frame.join(roles.rename('Role'), how='inner'))
+
+    # Count every state, including the "All ..." wildcard at each level
+    counts = []
+    for rows in levels:
+        for country in [True, False]:
+            for experience in [True, False]:
+                keys = rows.assign(
+                    Country=rows['Country'] if country else ALL_COUNTRIES,
+                    ExpBucket=rows['ExpBucket'] if experience else ALL_EXPERIENCE,
+                )
+                counts.append(keys.groupby(['Country', 'ExpBucket', 'Role']).size())
+
+    ranked = pd.concat(counts)
+    ranked = ranked[~ranked.index.duplicated()].sort_values(ascending=False, kind='stable')
+    return list(ranked.index[:max_states])
+
+class WarmupJob:
+    """Background thread that fills the filter cache for popular filter states within a time and CPU budget"""
+
+    def __init__(self, df, dataset_version, states, filter_cache,
+                 time_budget=WARMUP_SECONDS, cpu_fraction=WARMUP_CPU_FRACTION):
+        self.df = df
+        self.dataset_version = dataset_version
+        self.states = states
+        self.filter_cache = filter_cache
+        self.time_budget = time_budget
+        self.cpu_fraction = min(max(cpu_fraction, 0.01), 1.0)
+        self.completed = 0
+        self.skipped = 0
+        self.status = 'pending'
+        self.current = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='cache-warmup', daemon=True)
+
+    def start(self):
+        """Start warming in the background"""
+        self.started = time.monotonic()
+        self.status = 'running'
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the job to stop after the current filter state"""
+        self._stop.set()
+
+    def warm_state(self, country, experience, role):
+        """Compute and cache what the Dashboard needs for one filter state; False if its role can't be selected"""
+        df, cache = self.df, self.filter_cache
+        base_key = filter_key(self.dataset_version, country, experience, ALL_ROLES)
+        options = cache.get_or_compute(
+            base_key, 'role_options',
+            lambda: role_options(cohort_frame(df, cache, base_key, country, experience, ALL_ROLES))
+        )
+        # A smaller cohort's sidebar may list other roles than the whole dataset's
+        if role not in options:
+            return False
+
+        key = filter_key(self.dataset_version, country, experience, role)
+        df_filtered = cohort_frame(df, cache, key, country, experience, role)
+        salary_col, currency_col = select_salary_columns(df_filtered.columns)
+        tasks = dashboard_tasks(df, df_filtered, self.dataset_version, cohort_positions(df, df_filtered), salary_col, currency_col)
+        for name, task in tasks.items():
+            cache.get_or_compute(key, name, task)
+        return True
+
+    def _run(self):
+        try:
+            for state in self.states:
+                if self._stop.is_set():
+                    self.status = 'stopped'
+                    break
+                if time.monotonic() - self.started > self.time_budget:
+                    self.status = 'out of time'
+                    break
+
+                self.current = state
+                work_started = time.monotonic()
+                if self.warm_state(*state):
+                    self.completed += 1
+                else:
+                    self.skipped += 1
+
+                # Stay under the CPU share by idling in proportion to the work just done
+                busy = time.monotonic() - work_started
+                self._stop.wait(busy * (1 - self.cpu_fraction) / self.cpu_fraction)
+            else:
+                self.status = 'done'
+        except Exception as exc:
+            self.status = 'failed'
+            self.error = repr(exc)
+        finally:
+            self.current = None
+            self.finished = time.monotonic()
+
+    def progress(self):
+        """Snapshot of how far the warm-up has got"""
+        end = self.finished or time.monotonic()
+        # Skipped states can't be warmed, so they don't count towards the states left to warm
+        warmable = len(self.states) - self.skipped
+        return {
+            'status': self.status,
+            'completed': self.completed,
+            'skipped': self.skipped,
+            'total': len(self.states),
+            'fraction': self.completed / warmable if warmable else 1.0,
+            'current': self.current,
+            'elapsed_seconds': end - self.started if self.started else 0.0,
+            'error': self.error,
+        }
+
+@st.cache_resource
+def start_warmup(_df, dataset_version):
+    """Start the cache warm-up once per server process and dataset version"""
+    if not WARMUP_ENABLED:
+        return None
+    states = popular_filter_states(_df)
+    return WarmupJob(_df, dataset_version, states, get_filter_cache()).start()